@@ -17,6 +17,12 @@ import easyocr
 from google.cloud import vision
 from dotenv import load_dotenv
 
+# 포스트잇 검출 (server.py, utils/imageProcessServer.py와 같은 모듈)
+from postit_detection import (
+    DetectionCache, detection_cache_key, detection_params,
+    locate_postit, locate_postit_bytes, prepare_postit_mask, refine_bbox, score_contours, to_full_bbox,
+)
+
 # ──────────────────────  Pillow 10 대응 몽키패치  ─────────────────────
 if not hasattr(Image, "ANTIALIAS"):  # Pillow ≥10
     Image.ANTIALIAS = Image.Resampling.LANCZOS
@@ -59,6 +65,14 @@ UPPER_YELLOW = (
 MIN_AREA    = st.sidebar.number_input("최소 면적(px)", 1000, 500000, 8000, step=1000)  # 포스트잇 크기에 맞춤
 MAX_AR_DIFF = st.sidebar.slider("가로/세로 비율 허용편차(%)", 0, 100, 50)  # 정사각형에 가깝게
 
+# --- 피라미드 검출 (축소 이미지에서 검출 후 원본 좌표로 변환)
+PYRAMID_MODE = st.sidebar.checkbox("⚡ 피라미드 검출 (긴 변 1000px로 축소 후 검출)", value=True)
+REFINE_BBOX  = st.sidebar.checkbox("🎯 원본 해상도에서 BBox 경계 보정", value=True)
+
+# 검출 함수/캐시 키에 넘기는 설정 (최소 점수는 공용 모듈 기본값)
+DETECTION_PARAMS = detection_params(LOWER_YELLOW, UPPER_YELLOW, MIN_AREA, MAX_AR_DIFF,
+                                    pyramid=PYRAMID_MODE, refine=REFINE_BBOX)
+
 show_debug = st.sidebar.checkbox("🩺 디버그 모드 (Raw JSON / 마스크 출력)")
 st.sidebar.markdown("---\nMade with ❤️ 2025")
 
@@ -68,172 +82,78 @@ def pil_to_bytes(pil_img: Image.Image, fmt="JPEG") -> bytes:
     pil_img.save(buf, format=fmt)
     return buf.getvalue()
 
-# ---------- Adaptive HSV 마스크 ----------
-def adaptive_inrange(hsv_img, base_low, base_up):
-    """다양한 HSV 범위를 시도하여 최적의 마스크 확보"""
-    low = list(base_low)
-    up  = list(base_up)
-    
-    # 1단계: Saturation 하한을 단계적으로 낮춤
-    for sat in (low[1], 40, 25, 10, 5):
-        low[1] = sat
-        mask = cv2.inRange(
-            hsv_img, np.array(low, np.uint8), np.array(up, np.uint8)
-        )
-        if cv2.countNonZero(mask) > 2000:   # 2k 픽셀 이상이면 성공
-            return mask
-    
-    # 2단계: Value 하한도 낮춰보기
-    low = list(base_low)
-    for val in (30, 20, 10):
-        for sat in (5, 3, 1):
-            low[1] = sat
-            low[2] = val
-            mask = cv2.inRange(
-                hsv_img, np.array(low, np.uint8), np.array(up, np.uint8)
-            )
-            if cv2.countNonZero(mask) > 1000:   # 1k 픽셀 이상이면 성공
-                return mask
-    
-    return mask  # 마지막 결과 반환
-
 # ---------- Post-it 탐지 ----------
-def find_postit(pil_img: Image.Image, debug=False):
-    """노란 포스트잇 ROI 반환, debug=True면 (roi, mask, bbox_img)"""
-    bgr = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
-    hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
-
-    mask = adaptive_inrange(hsv, LOWER_YELLOW, UPPER_YELLOW)
-
-    # 노이즈 제거를 위한 모폴로지 연산
-    kernel = np.ones((3, 3), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=1)  # 작은 노이즈 제거
-    kernel = np.ones((7, 7), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=3)  # 더 강한 구멍 메우기
+def find_postit(pil_img: Image.Image, debug=False, pyramid=None, refine=None):
+    """
+    노란 포스트잇 ROI 반환, debug=True면 (roi, mask, bbox_img)
+    pyramid: 긴 변을 PYRAMID_MAX_SIDE로 줄인 이미지에서 검출 후 원본 좌표로 변환 (기본값 PYRAMID_MODE)
+    refine: 피라미드 모드에서 원본 해상도의 ROI 안에서 경계를 다시 맞춤 (기본값 REFINE_BBOX)
+    """
+    if not debug:
+        # 디버그 출력이 필요 없으면 후보별 상세 정보 없이 최고점만 계산
+        best, _ = locate_postit(pil_img, pyramid, refine, DETECTION_PARAMS)
+        if best is None:
+            return None
+        x, y, cw, ch = best
+        return pil_img.crop((x, y, x + cw, y + ch))
     
-    # 추가: 더 큰 커널로 한 번 더 정리
-    kernel_large = np.ones((10, 10), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel_large, iterations=1)
-
-    cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    pyramid = PYRAMID_MODE if pyramid is None else pyramid
+    refine = REFINE_BBOX if refine is None else refine
+    
+    rgb = np.array(pil_img)
+    full_h, full_w = rgb.shape[:2]
+    scale, img_w, img_h, low, mask, cnts = prepare_postit_mask(rgb, pyramid, params=DETECTION_PARAMS)
     if not cnts:
-        if debug:
-            st.warning(f"윤곽선을 찾지 못했습니다. 마스크 픽셀 수: {cv2.countNonZero(mask)}")
-        return (None, mask, None) if debug else None
+        st.warning(f"윤곽선을 찾지 못했습니다. 마스크 픽셀 수: {cv2.countNonZero(mask)}")
+        return None, mask, None
 
-    best, best_score = None, 0
-    candidates = []
+    best, best_score, candidates = score_contours(cnts, mask, img_w, img_h, scale, DETECTION_PARAMS)
     
-    for i, c in enumerate(cnts):
-        # 기본 바운딩 박스
-        x, y, cw, ch = cv2.boundingRect(c)
-        area = cw * ch
-        ar_diff = abs(cw - ch) / max(cw, ch) * 100
-        
-        # 윤곽선 approximation으로 사각형성 검사
-        epsilon = 0.02 * cv2.arcLength(c, True)
-        approx = cv2.approxPolyDP(c, epsilon, True)
-        rect_score = len(approx)  # 4에 가까울수록 사각형
-        
-        # 컨벡스 헐과의 비교로 모양 검사
-        hull = cv2.convexHull(c)
-        hull_area = cv2.contourArea(hull)
-        solidity = area / hull_area if hull_area > 0 else 0
-        
-        # 이미지 중앙에서의 거리 (포스트잇은 보통 중앙 근처에 있음)
-        img_h, img_w = pil_img.size[1], pil_img.size[0]
-        center_x, center_y = x + cw//2, y + ch//2
-        center_dist = np.sqrt((center_x - img_w//2)**2 + (center_y - img_h//2)**2)
-        normalized_center_dist = center_dist / np.sqrt(img_w**2 + img_h**2)
-        
-        # 마스크에서 실제 채워진 비율
-        mask_roi = mask[y:y+ch, x:x+cw]
-        fill_ratio = cv2.countNonZero(mask_roi) / (cw * ch) if cw * ch > 0 else 0
-        
-        # 종합 점수 계산 (포스트잇 특징에 맞춰 가중치 조정)
-        score = 0
-        if area >= MIN_AREA:
-            # 1. 기본 면적 점수 (크기가 적당해야 함)
-            ideal_area = 50000  # 대략적인 포스트잇 이상적 크기
-            area_score = max(0, 100 - abs(area - ideal_area) / ideal_area * 50)
-            score += area_score
-            
-            # 2. 정사각형 점수 (가장 중요한 요소)
-            square_score = max(0, 80 - ar_diff * 2)  # 가중치 증가
-            score += square_score
-            
-            # 3. 사각형 모양 점수
-            rect_shape_score = min(40, (8 - abs(rect_score - 4)) * 10)  # 가중치 증가
-            score += rect_shape_score
-            
-            # 4. 채움 비율 점수 (매우 중요)
-            fill_score = fill_ratio * 60  # 가중치 증가
-            score += fill_score
-            
-            # 5. 볼록도 점수
-            solidity_score = solidity * 25
-            score += solidity_score
-            
-            # 6. 중앙 위치 보너스 (포스트잇은 보통 중앙 근처)
-            center_score = max(0, 15 - normalized_center_dist * 30)
-            score += center_score
-            
-            # 7. 크기 비율 보너스 (이미지 대비 적당한 크기)
-            img_area = img_w * img_h
-            size_ratio = area / img_area
-            if 0.02 < size_ratio < 0.3:  # 이미지의 2%~30% 크기가 적당
-                score += 20
-        
-        candidates.append({
-            'bbox': (x, y, cw, ch),
-            'area': area,
-            'ar_diff': ar_diff,
-            'rect_score': rect_score,
-            'solidity': solidity,
-            'center_dist': normalized_center_dist,
-            'fill_ratio': fill_ratio if 'fill_ratio' in locals() else 0,
-            'total_score': score,
-            'valid': area >= MIN_AREA and ar_diff <= MAX_AR_DIFF
-        })
-        
-        if score > best_score:
-            best_score = score
-            best = (x, y, cw, ch)
+    if scale != 1.0:
+        # 축소 이미지 좌표 → 원본 좌표
+        for cand in candidates:
+            cand['bbox'] = to_full_bbox(cand['bbox'], scale, full_w, full_h)
+        if best is not None:
+            best = to_full_bbox(best, scale, full_w, full_h)
+            if refine and best_score >= DETECTION_PARAMS['min_score']:
+                best = refine_bbox(rgb, best, low, UPPER_YELLOW, scale)
 
     # 후보들을 점수순으로 정렬
     candidates.sort(key=lambda x: x['total_score'], reverse=True)
 
-    if debug:
-        st.write(f"총 {len(candidates)}개 윤곽선 발견 (점수순 정렬):")
-        for i, cand in enumerate(candidates[:5]):  # 상위 5개만 표시
-            st.write(f"  {i+1}: 면적={cand['area']}, 비율차이={cand['ar_diff']:.1f}%, "
-                    f"사각형점수={cand['rect_score']}, 볼록도={cand['solidity']:.2f}, "
-                    f"중심거리={cand['center_dist']:.2f}, 채움비율={cand['fill_ratio']:.2f}, "
-                    f"**총점={cand['total_score']:.1f}**, 유효={cand['valid']}")
+    st.write(f"총 {len(candidates)}개 윤곽선 발견 (점수순 정렬):")
+    for i, cand in enumerate(candidates[:5]):  # 상위 5개만 표시
+        st.write(f"  {i+1}: 면적={cand['area']}, 비율차이={cand['ar_diff']:.1f}%, "
+                f"사각형점수={cand['rect_score']}, 볼록도={cand['solidity']:.2f}, "
+                f"중심거리={cand['center_dist']:.2f}, 채움비율={cand['fill_ratio']:.2f}, "
+                f"**총점={cand['total_score']:.1f}**, 유효={cand['valid']}")
 
-    if best is None or best_score < 50:  # 최소 점수 기준
-        if debug:
-            st.warning(f"조건을 만족하는 포스트잇을 찾지 못했습니다. (최고점수: {best_score:.1f})")
-        return (None, mask, None) if debug else None
+    if best is None or best_score < DETECTION_PARAMS['min_score']:  # 최소 점수 기준
+        st.warning(f"조건을 만족하는 포스트잇을 찾지 못했습니다. (최고점수: {best_score:.1f})")
+        return None, mask, None
 
     x, y, cw, ch = best
     roi = pil_img.crop((x, y, x + cw, y + ch))
 
-    if debug:
-        bbox_img = bgr.copy()
-        # 모든 후보를 연한 색으로 표시
-        for i, cand in enumerate(candidates[:3]):
-            cx, cy, ccw, cch = cand['bbox']
-            color = (100, 100, 255) if i > 0 else (0, 0, 255)  # 최고점수는 빨간색, 나머지는 연한 파란색
-            thickness = 3 if i == 0 else 1
-            cv2.rectangle(bbox_img, (cx, cy), (cx + ccw, cy + cch), color, thickness)
-            cv2.putText(bbox_img, f"{cand['total_score']:.0f}", 
-                       (cx, cy-10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
-        
-        bbox_img = cv2.cvtColor(bbox_img, cv2.COLOR_BGR2RGB)
-        st.success(f"포스트잇 검출 성공! 점수: {best_score:.1f}, 크기: {cw}×{ch}")
-        return roi, mask, bbox_img
-    return roi
+    bbox_img = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+    # 모든 후보를 연한 색으로 표시
+    for i, cand in enumerate(candidates[:3]):
+        cx, cy, ccw, cch = cand['bbox']
+        color = (100, 100, 255) if i > 0 else (0, 0, 255)  # 최고점수는 빨간색, 나머지는 연한 파란색
+        thickness = 3 if i == 0 else 1
+        cv2.rectangle(bbox_img, (cx, cy), (cx + ccw, cy + cch), color, thickness)
+        cv2.putText(bbox_img, f"{cand['total_score']:.0f}", 
+                   (cx, cy-10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    
+    bbox_img = cv2.cvtColor(bbox_img, cv2.COLOR_BGR2RGB)
+    st.success(f"포스트잇 검출 성공! 점수: {best_score:.1f}, 크기: {cw}×{ch}")
+    return roi, mask, bbox_img
+
+# ---------- 검출 결과 캐시 ----------
+@st.cache_resource(show_spinner=False)
+def get_detection_cache():
+    # 위젯 변경으로 스크립트가 다시 실행되어도 유지
+    return DetectionCache(256)
 
 # ---------- ROI 업스케일 ----------
 def upscale(pil_img: Image.Image, factor: int):
@@ -358,7 +278,19 @@ if uploaded:
     # ───── 포스트잇 탐지 ─────
     roi = None
     if use_postit:
-        res = find_postit(pil_img, debug=show_debug)
+        if show_debug:
+            res = find_postit(pil_img, debug=True)
+        else:
+            # 같은 이미지/설정이면 이전 검출 결과(bbox) 재사용
+            cache = get_detection_cache()
+            image_bytes = uploaded.getvalue()
+            cache_key = detection_cache_key(image_bytes, params=DETECTION_PARAMS)
+            located = cache.get(cache_key)
+            if located is None:
+                located = locate_postit_bytes(image_bytes, pil_img=pil_img, params=DETECTION_PARAMS)
+                cache.set(cache_key, located)
+            bbox = located[0]
+            res = pil_img.crop((bbox[0], bbox[1], bbox[0] + bbox[2], bbox[1] + bbox[3])) if bbox else None
         if isinstance(res, tuple):
             roi, mask_img, bbox_img = res
             if show_debug and mask_img is not None:
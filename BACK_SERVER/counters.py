@@ -0,0 +1,157 @@
+"""
+집계 카운터 관리
+목록 API마다 COUNT(...) GROUP BY로 계산하던 값을 컬럼에 저장해 둡니다.
+- challenges.submission_count : 도전과제별 제출물 수
+- tags.challenge_count        : 태그별 도전과제 수
+
+쓰기 API는 같은 트랜잭션 안에서 아래 함수로 카운터를 함께 갱신하고,
+혹시 어긋난 값은 rebuild_counters()가 주기적으로 다시 계산해 바로잡습니다.
+
+필요한 컬럼:
+ALTER TABLE challenges ADD COLUMN submission_count INT NOT NULL DEFAULT 0;
+ALTER TABLE tags ADD COLUMN challenge_count INT NOT NULL DEFAULT 0;
+"""
+import os
+import threading
+
+
+def add_submission_count(cursor, challenge_id, delta):
+    cursor.execute(
+        "UPDATE challenges SET submission_count = GREATEST(submission_count + %s, 0) WHERE id = %s",
+        (delta, challenge_id)
+    )
+
+
+def add_tag_challenge_counts(cursor, tag_ids, delta):
+    if not tag_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(tag_ids))
+    cursor.execute(
+        f"UPDATE tags SET challenge_count = GREATEST(challenge_count + %s, 0) WHERE id IN ({placeholders})",
+        [delta] + list(tag_ids)
+    )
+
+
+def release_challenge_tag_counts(cursor, challenge_id):
+    """도전과제 삭제 전에 호출: 연결된 태그들의 challenge_count를 1씩 감소"""
+    cursor.execute("""
+        UPDATE tags t
+        JOIN challenge_tags ct ON ct.tag_id = t.id
+        SET t.challenge_count = GREATEST(t.challenge_count - 1, 0)
+        WHERE ct.challenge_id = %s
+    """, (challenge_id,))
+
+
+def release_user_counts(cursor, user_email):
+    """
+    사용자 삭제 전에 호출
+    1. 사용자가 제출한 제출물 수만큼 각 도전과제의 submission_count 감소
+    2. 사용자가 만든 도전과제에 걸린 태그들의 challenge_count 감소
+    """
+    cursor.execute("""
+        UPDATE challenges c
+        JOIN (
+            SELECT challenge_id, COUNT(*) AS n
+            FROM challenge_submissions
+            WHERE user_email = %s
+            GROUP BY challenge_id
+        ) s ON s.challenge_id = c.id
+        SET c.submission_count = GREATEST(c.submission_count - s.n, 0)
+    """, (user_email,))
+    cursor.execute("""
+        UPDATE tags t
+        JOIN (
+            SELECT ct.tag_id, COUNT(*) AS n
+            FROM challenge_tags ct
+            JOIN challenges c ON c.id = ct.challenge_id
+            WHERE c.creator = %s
+            GROUP BY ct.tag_id
+        ) x ON x.tag_id = t.id
+        SET t.challenge_count = GREATEST(t.challenge_count - x.n, 0)
+    """, (user_email,))
+
+
+def rebuild_counters(cursor):
+    """
+    원본 테이블에서 모든 카운터를 다시 계산
+    반환: 값이 바뀐(어긋나 있던) 행 수
+    """
+    cursor.execute("""
+        UPDATE challenges c
+        LEFT JOIN (
+            SELECT challenge_id, COUNT(*) AS n
+            FROM challenge_submissions
+            GROUP BY challenge_id
+        ) s ON s.challenge_id = c.id
+        SET c.submission_count = COALESCE(s.n, 0)
+    """)
+    fixed_challenges = cursor.rowcount
+    cursor.execute("""
+        UPDATE tags t
+        LEFT JOIN (
+            SELECT tag_id, COUNT(DISTINCT challenge_id) AS n
+            FROM challenge_tags
+            GROUP BY tag_id
+        ) x ON x.tag_id = t.id
+        SET t.challenge_count = COALESCE(x.n, 0)
+    """)
+    fixed_tags = cursor.rowcount
+    return {'challenges': fixed_challenges, 'tags': fixed_tags}
+
+
+def reconcile_once(connection_factory, on_fixed=None):
+    """
+    rebuild_counters()를 한 번 실행하고 커밋 → 보정된 행 수 {'challenges', 'tags'} (연결 실패 시 None)
+    connection_factory: with connection_factory() as connection: 형태로 연결을 주는 함수
+    on_fixed: 보정된 행이 있을 때 커밋 후 on_fixed(fixed)를 호출 (ETag/응답 캐시 무효화용)
+    """
+    with connection_factory() as connection:
+        if connection is None:
+            return None
+        cursor = connection.cursor()
+        fixed = rebuild_counters(cursor)
+        connection.commit()
+        cursor.close()
+    if fixed['challenges'] or fixed['tags']:
+        print(f"🔧 카운터 재계산: 도전과제 {fixed['challenges']}개, 태그 {fixed['tags']}개 보정")
+        if on_fixed is not None:
+            on_fixed(fixed)
+    return fixed
+
+
+def start_reconciler(connection_factory, interval, on_fixed=None, stop_event=None):
+    """
+    시작 시 1회 + interval초마다 reconcile_once()를 실행하는 백그라운드 스레드 시작
+    stop_event: set()하면 다음 대기에서 스레드 종료
+    """
+    stop_event = stop_event or threading.Event()
+
+    def run():
+        while not stop_event.is_set():
+            try:
+                reconcile_once(connection_factory, on_fixed)
+            except Exception as e:
+                print(f"❌ 카운터 재계산 오류: {e}")
+            stop_event.wait(interval)
+
+    thread = threading.Thread(target=run, name='counter-reconciler', daemon=True)
+    thread.start()
+    return thread
+
+
+_reconciler_lock = threading.Lock()
+_reconciler = {'pid': None, 'thread': None}
+
+
+def ensure_reconciler(connection_factory, interval, on_fixed=None, stop_event=None):
+    """
+    프로세스당 재계산 스레드를 하나만 시작 (모듈 로드 시 호출, gunicorn 등 WSGI 서버에서도 동작)
+    이미 실행 중이면 그 스레드를 반환하고, fork된 워커 프로세스에서는 새로 시작
+    """
+    with _reconciler_lock:
+        thread = _reconciler['thread']
+        if _reconciler['pid'] == os.getpid() and thread is not None and thread.is_alive():
+            return thread
+        thread = start_reconciler(connection_factory, interval, on_fixed, stop_event)
+        _reconciler.update(pid=os.getpid(), thread=thread)
+        return thread
@@ -0,0 +1,214 @@
+"""
+MySQL 커넥션 풀
+요청마다 pymysql.connect()로 새 연결을 맺고 끊던 것을 대신합니다.
+- 최대 연결 수 제한 (max_size)
+- 연결 대여 대기 시간 제한 (acquire_timeout)
+- 오래 놀고 있던 연결은 ping으로 생존 확인, 너무 오래된 연결은 교체 (recycle)
+- with pool.connection() as connection: 형태의 대여/반납
+- 풀 통계 (stats)
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pymysql
+from pymysql.constants import SERVER_STATUS
+
+
+class PoolTimeout(Exception):
+    """acquire_timeout 안에 연결을 빌리지 못했을 때 발생"""
+
+
+class PooledConnection:
+    """
+    풀에서 빌려준 연결 래퍼
+    기존 코드처럼 connection.close()를 호출하면 실제로 끊지 않고 풀에 반납합니다.
+    나머지 속성(cursor, commit, rollback, begin ...)은 원래 연결로 위임합니다.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._returned = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    @property
+    def returned(self):
+        return self._returned
+
+    def close(self):
+        if self._returned:
+            return
+        self._returned = True
+        self._pool._release(self._raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    def __init__(self, connect_kwargs, max_size=10, acquire_timeout=5.0,
+                 ping_interval=30.0, recycle=3600.0):
+        self.connect_kwargs = connect_kwargs
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.ping_interval = ping_interval  # 이 시간 이상 놀던 연결은 빌려주기 전에 ping
+        self.recycle = recycle              # 이 시간 이상 된 연결은 닫고 새로 연결
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (raw, created_at, last_used_at) - LIFO로 사용
+        self._meta = {}       # id(raw) -> created_at (대여 중인 연결 포함)
+        self._size = 0        # 현재 열려 있는 연결 수 (놀고 있는 것 + 대여 중)
+
+        # 통계
+        self._created = 0
+        self._closed = 0
+        self._acquired = 0
+        self._timeouts = 0
+        self._ping_failures = 0
+        self._recycled = 0
+        self._waiting = 0
+        self._wait_time_total = 0.0
+
+    def _connect(self):
+        raw = pymysql.connect(**self.connect_kwargs)
+        with self._cond:
+            self._created += 1
+            self._meta[id(raw)] = time.monotonic()
+        return raw
+
+    def _discard(self, raw):
+        """연결을 실제로 닫고 자리를 비움"""
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._meta.pop(id(raw), None)
+            self._size -= 1
+            self._closed += 1
+            self._cond.notify()
+
+    def _is_healthy(self, raw, created_at, last_used_at):
+        now = time.monotonic()
+        if self.recycle and now - created_at > self.recycle:
+            with self._cond:
+                self._recycled += 1
+            return False
+        if not raw.open:
+            return False
+        if self.ping_interval is not None and now - last_used_at > self.ping_interval:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                with self._cond:
+                    self._ping_failures += 1
+                return False
+        return True
+
+    def acquire(self, timeout=None):
+        """
+        풀에서 연결 하나를 빌림
+        남는 연결이 없고 max_size에 도달했다면 반납될 때까지 timeout초 대기 후 PoolTimeout
+        """
+        if timeout is None:
+            timeout = self.acquire_timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            raw = None
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(f"{timeout}초 안에 DB 연결을 얻지 못했습니다 (max_size={self.max_size})")
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+                if self._idle:
+                    raw, created_at, last_used_at = self._idle.pop()
+                else:
+                    # 새 연결을 만들 자리를 먼저 확보해 둠
+                    self._size += 1
+
+            if raw is None:
+                try:
+                    raw = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(raw, created_at, last_used_at):
+                self._discard(raw)
+                continue
+
+            with self._cond:
+                self._acquired += 1
+                self._wait_time_total += time.monotonic() - started
+            return PooledConnection(self, raw)
+
+    def _release(self, raw):
+        """빌려간 연결을 반납 (PooledConnection.close()에서 호출)"""
+        try:
+            if not raw.open:
+                self._discard(raw)
+                return
+            # autocommit=False 이므로 SELECT만 해도 트랜잭션이 열려 있을 수 있음
+            # 다음 사용자가 이전 스냅샷/락을 물려받지 않도록 정리
+            if raw.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+                raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+
+        with self._cond:
+            created_at = self._meta.get(id(raw), time.monotonic())
+            self._idle.append((raw, created_at, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """with pool.connection() as connection: 블록이 끝나면 자동 반납"""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def stats(self):
+        with self._cond:
+            acquired = self._acquired
+            return {
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'waiting': self._waiting,
+                'created': self._created,
+                'closed': self._closed,
+                'acquired': acquired,
+                'timeouts': self._timeouts,
+                'ping_failures': self._ping_failures,
+                'recycled': self._recycled,
+                'avg_wait_ms': round(self._wait_time_total / acquired * 1000, 3) if acquired else 0.0
+            }
+
+    def close_all(self):
+        """놀고 있는 연결을 모두 닫음 (서버 종료 시)"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for raw, _, _ in idle:
+            self._discard(raw)
@@ -0,0 +1,121 @@
+"""
+알림 발송(fan-out) 전용 작업 실행기
+도전과제마다 새 스레드를 만들던 방식 대신 고정 개수의 워커 스레드가 제한된 크기의 큐에서 작업을 꺼내 처리합니다.
+- 큐가 가득 차면 submit()이 submit_timeout초까지 기다림 (backpressure), 그래도 자리가 없으면 거절
+- 워커는 batch_window초 동안 들어온 작업을 최대 max_batch개까지 모아 handler(jobs)를 한 번 호출
+  (가까운 시점에 생성된 도전과제들의 수신자 조회를 한 번에 처리)
+- handler가 예외를 던지면 retry_delay초부터 두 배씩 늘려가며 최대 retries번 다시 호출
+  (handler는 알림을 보내기 전에 실패하도록 조회를 먼저 끝내야 중복 알림이 생기지 않음)
+- 큐 길이, 배치 크기, 대기~처리 완료까지의 지연 시간 통계 제공
+"""
+import queue
+import threading
+import time
+
+
+class FanoutExecutor:
+    def __init__(self, handler, name='fanout', workers=2, queue_size=1000,
+                 batch_window=0.2, max_batch=50, submit_timeout=2.0, retries=0, retry_delay=0.5):
+        self.handler = handler
+        self.name = name
+        self.workers = workers
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.submit_timeout = submit_timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+
+        self._stats_lock = threading.Lock()
+        self._submitted = 0
+        self._rejected = 0
+        self._completed = 0
+        self._errors = 0
+        self._retried = 0
+        self._batches = 0
+        self._max_batch_seen = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, job):
+        """작업 등록. 큐가 가득 차 submit_timeout초 안에 넣지 못하면 False"""
+        try:
+            self._queue.put((time.monotonic(), job), timeout=self.submit_timeout)
+        except queue.Full:
+            with self._stats_lock:
+                self._rejected += 1
+            print(f"❌ {self.name} 큐가 가득 차 작업을 거절했습니다 (대기 {self._queue.qsize()}개)")
+            return False
+        with self._stats_lock:
+            self._submitted += 1
+        return True
+
+    def _take_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            jobs = [job for _, job in batch]
+            delay = self.retry_delay
+            for attempt in range(self.retries + 1):
+                try:
+                    self.handler(jobs)
+                    break
+                except Exception as e:
+                    if attempt < self.retries:
+                        with self._stats_lock:
+                            self._retried += 1
+                        print(f"⚠️  {self.name} 작업 처리 오류 ({len(jobs)}개, {delay}초 후 재시도): {e}")
+                        time.sleep(delay)
+                        delay *= 2
+                    else:
+                        with self._stats_lock:
+                            self._errors += 1
+                        print(f"❌ {self.name} 작업 처리 오류 ({len(jobs)}개): {e}")
+
+            now = time.monotonic()
+            latencies = [now - enqueued_at for enqueued_at, _ in batch]
+            with self._stats_lock:
+                self._batches += 1
+                self._completed += len(batch)
+                self._max_batch_seen = max(self._max_batch_seen, len(batch))
+                self._latency_total += sum(latencies)
+                self._latency_max = max(self._latency_max, max(latencies))
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'workers': self.workers,
+                'queue_depth': self._queue.qsize(),
+                'queue_size': self._queue.maxsize,
+                'submitted': self._submitted,
+                'rejected': self._rejected,
+                'completed': self._completed,
+                'retried': self._retried,
+                'errors': self._errors,
+                'batches': self._batches,
+                'avg_batch_size': round(self._completed / self._batches, 2) if self._batches else 0.0,
+                'max_batch_size': self._max_batch_seen,
+                'avg_latency_ms': round(self._latency_total / self._completed * 1000, 1) if self._completed else 0.0,
+                'max_latency_ms': round(self._latency_max * 1000, 1)
+            }
@@ -0,0 +1,51 @@
+"""
+도전과제 목록에 태그 정보를 붙여주는 공통 모듈
+도전과제마다 태그 쿼리를 따로 실행하던 방식(N+1) 대신
+한 페이지의 도전과제 id를 모아 IN (...) 쿼리 한 번으로 태그를 가져와 메모리에서 붙입니다.
+"""
+
+# IN (...) 에 한 번에 넣을 최대 id 개수 (너무 긴 쿼리 방지)
+CHUNK_SIZE = 1000
+
+
+def load_tags_for_challenges(cursor, challenge_ids):
+    """
+    도전과제 id 목록의 태그를 한꺼번에 조회
+    반환: {challenge_id: [{'id': tag_id, 'name': tag_name}, ...]}
+    """
+    tags_by_challenge = {}
+    ids = list(dict.fromkeys(challenge_ids))  # 중복 제거 (순서 유지)
+
+    for start in range(0, len(ids), CHUNK_SIZE):
+        chunk = ids[start:start + CHUNK_SIZE]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"""
+            SELECT ct.challenge_id, t.id, t.name
+            FROM challenge_tags ct
+            JOIN tags t ON t.id = ct.tag_id
+            WHERE ct.challenge_id IN ({placeholders})
+        """, chunk)
+        for row in cursor.fetchall():
+            tags_by_challenge.setdefault(row['challenge_id'], []).append({
+                'id': row['id'],
+                'name': row['name']
+            })
+
+    return tags_by_challenge
+
+
+def attach_tags(cursor, challenges, id_key='_id', names_only=True):
+    """
+    challenges의 각 항목에 'tags' 키를 채워 넣음 (쿼리는 CHUNK_SIZE당 1번)
+    names_only=True 이면 ['태그1', '태그2'], False 이면 [{'id': 1, 'name': '태그1'}, ...]
+    """
+    if not challenges:
+        return challenges
+
+    tags_by_challenge = load_tags_for_challenges(cursor, [c[id_key] for c in challenges])
+
+    for challenge in challenges:
+        tags = tags_by_challenge.get(challenge[id_key], [])
+        challenge['tags'] = [tag['name'] for tag in tags] if names_only else tags
+
+    return challenges
@@ -0,0 +1,194 @@
+"""
+사진 축소본(derivative) 생성/선택
+- 원본 옆에 정해진 너비(160/480/1080px)의 JPEG, WebP 축소본을 저장: ab/cd/<hash>.jpg -> ab/cd/<hash>_w480.webp
+- 업로드 직후 또는 처음 요청될 때 고정 개수의 워커 스레드(제한된 큐)에서 생성 → 요청 스레드는 기다리지 않음
+- 아직 만들어지지 않았으면 원본을 그대로 제공하고 생성만 예약
+- ?w= 값 이상인 가장 작은 크기를 고르고, Accept 헤더에 image/webp가 있으면 WebP 사용
+"""
+import os
+import re
+import tempfile
+import threading
+
+from PIL import Image, ImageOps
+
+from fanout import FanoutExecutor
+
+SIZES = (160, 480, 1080)
+FORMATS = {
+    'jpeg': ('jpg', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('webp', 'image/webp', {'quality': 80, 'method': 4}),
+}
+# 애니메이션 GIF 등은 축소본을 만들지 않고 원본만 제공
+SOURCE_EXTENSIONS = {'jpg', 'jpeg', 'png'}
+DERIVATIVE_SUFFIX = re.compile(r'_w\d+$')
+
+
+class UndecodableImage(Exception):
+    """원본 파일 자체를 이미지로 읽을 수 없음 (다시 시도해도 같은 결과)"""
+
+
+def derivative_path(relative, width, fmt):
+    base = relative.rsplit('.', 1)[0]
+    return f"{base}_w{width}.{FORMATS[fmt][0]}"
+
+
+def pick_width(requested):
+    """요청 너비 이상인 가장 작은 크기 (없으면 가장 큰 크기)"""
+    for width in SIZES:
+        if width >= requested:
+            return width
+    return SIZES[-1]
+
+
+class DerivativeGenerator:
+    def __init__(self, root, workers=2, queue_size=200):
+        self.root = root
+        self._pending = set()
+        self._broken = set()  # 디코딩할 수 없는 원본 (다시 시도하지 않음)
+        self._lock = threading.Lock()
+        self._generated = 0
+        self._failed = 0
+        # 요청 스레드가 막히지 않도록 큐가 가득 차면 기다리지 않고 거절 (다음 요청 때 다시 예약)
+        self.executor = FanoutExecutor(
+            self._run, name='photo-derivatives', workers=workers, queue_size=queue_size,
+            batch_window=0, max_batch=1, submit_timeout=0
+        )
+
+    def start(self):
+        self.executor.start()
+
+    def _path(self, relative):
+        """root 아래의 실제 경로 (../ 나 심볼릭 링크로 root 밖을 가리키면 None)"""
+        root = os.path.realpath(self.root)
+        path = os.path.realpath(os.path.join(root, relative))
+        if os.path.commonpath([root, path]) != root:
+            return None
+        return path
+
+    @staticmethod
+    def supports(relative):
+        """축소본을 만들 수 있는 원본인지 (축소본 파일 자체는 제외)"""
+        if '.' not in relative:
+            return False
+        base, ext = relative.rsplit('.', 1)
+        return ext.lower() in SOURCE_EXTENSIONS and not DERIVATIVE_SUFFIX.search(base)
+
+    def submit(self, relative):
+        """축소본 생성 예약 (이미 예약되어 있으면 무시)"""
+        if not self.supports(relative) or self._path(relative) is None:
+            return False
+        with self._lock:
+            if relative in self._broken:
+                return False
+            if relative in self._pending:
+                return True
+            self._pending.add(relative)
+        if not self.executor.submit(relative):
+            with self._lock:
+                self._pending.discard(relative)
+            return False
+        return True
+
+    def resolve(self, relative, requested_width, accept_mimetypes):
+        """
+        제공할 축소본의 (상대 경로, mimetype)을 반환
+        아직 없으면 생성을 예약하고 None (원본 제공)
+        """
+        if not self.supports(relative) or self._path(relative) is None:
+            return None
+        # */* 만 보내는 클라이언트는 WebP 지원 여부를 알 수 없으므로 명시한 경우에만 WebP
+        accepted = {mimetype for mimetype, quality in accept_mimetypes if quality > 0}
+        fmt = 'webp' if 'image/webp' in accepted else 'jpeg'
+        variant = derivative_path(relative, pick_width(requested_width), fmt)
+        variant_path = self._path(variant)
+        if variant_path is not None and os.path.exists(variant_path):
+            return variant, FORMATS[fmt][1]
+        if os.path.exists(self._path(relative)):
+            self.submit(relative)
+        return None
+
+    def generate(self, relative):
+        """원본 하나에 대해 모든 크기/형식의 축소본 생성 (이미 있는 것은 건너뜀)"""
+        source = self._path(relative)
+        if source is None:
+            raise ValueError(f'사진 폴더 밖의 경로입니다: {relative}')
+        targets = []
+        for width in SIZES:
+            for fmt in FORMATS:
+                final_path = self._path(derivative_path(relative, width, fmt))
+                if final_path is None:
+                    raise ValueError(f'사진 폴더 밖의 경로입니다: {relative}')
+                if not os.path.exists(final_path):
+                    targets.append((width, fmt, final_path))
+        if not targets:
+            return 0
+
+        # 파일 열기 실패(EMFILE 등)는 일시적인 오류로 그대로 올리고,
+        # 연 파일을 이미지로 해석하지 못한 경우만 UndecodableImage로 구분
+        with open(source, 'rb') as fp:
+            try:
+                with Image.open(fp) as original:
+                    # 휴대폰 사진의 EXIF 회전 정보를 반영한 뒤 RGB로 변환 (JPEG는 알파 채널 미지원)
+                    image = ImageOps.exif_transpose(original).convert('RGB')
+            except (Image.UnidentifiedImageError, Image.DecompressionBombError, SyntaxError, ValueError) as e:
+                raise UndecodableImage(str(e)) from e
+            except OSError as e:
+                # 잘린 파일/손상된 데이터는 errno 없는 OSError, 읽기 중 I/O 오류는 errno가 있음
+                if e.errno is not None:
+                    raise
+                raise UndecodableImage(str(e)) from e
+
+        count = 0
+        for width, fmt, final_path in targets:
+            resized = image
+            if image.width > width:
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.LANCZOS)
+            options = FORMATS[fmt][2]
+            # 완성된 파일만 보이도록 임시 파일에 저장 후 rename
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(final_path), suffix='.part')
+            try:
+                with os.fdopen(fd, 'wb') as out:
+                    resized.save(out, format=fmt.upper(), **options)
+                os.replace(tmp_path, final_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            count += 1
+        return count
+
+    def _run(self, jobs):
+        for relative in jobs:
+            try:
+                count = self.generate(relative)
+                with self._lock:
+                    self._generated += count
+                if count:
+                    print(f"🖼️  축소본 {count}개 생성: {relative}")
+            except UndecodableImage as e:
+                with self._lock:
+                    self._failed += 1
+                    self._broken.add(relative)
+                print(f"❌ 축소본 생성 불가, 원본을 읽을 수 없음 ({relative}): {e}")
+            except Exception as e:
+                # 디스크 부족(ENOSPC), 파일 핸들 부족(EMFILE) 등은 다음 요청 때 다시 예약
+                with self._lock:
+                    self._failed += 1
+                print(f"❌ 축소본 생성 오류, 다음 요청 때 재시도 ({relative}): {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(relative)
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'sizes': list(SIZES),
+                'pending': len(self._pending),
+                'generated': self._generated,
+                'failed': self._failed,
+                'broken': len(self._broken)
+            }
+        stats['queue'] = self.executor.stats()
+        return stats
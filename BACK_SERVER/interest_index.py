@@ -0,0 +1,202 @@
+"""
+관심 태그 역색인 (tag_id -> 관심 있는 사용자들)
+새 도전과제 알림을 보낼 때마다 users / user_interests / tags를 JOIN하던 대신
+서버 시작 시 user_interests를 한 번 읽어 메모리에 두고,
+관심 태그 추가/삭제와 사용자 삭제 시 바로 갱신합니다.
+다른 워커에서 바뀐 내용은 verify()가 주기적으로 DB와 비교해 바로잡습니다.
+"""
+import os
+import threading
+
+
+class InterestIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._verify_lock = threading.Lock()  # verify()는 한 번에 하나만
+        self._by_tag = {}   # tag_id -> {user_id}
+        self._users = {}    # user_id -> {'email': str, 'name': str, 'tags': {tag_id}}
+        self._journal = None  # verify()가 DB를 읽는 동안 들어온 변경 [(op, args), ...]
+        self._verifier = None   # (pid, thread)
+        self.loaded = False
+        self._verifications = 0
+        self._last_diff = None
+
+    @staticmethod
+    def _read(cursor):
+        cursor.execute("""
+            SELECT ui.user_id, ui.tag_id, u.email, u.name
+            FROM user_interests ui
+            JOIN users u ON u.id = ui.user_id
+        """)
+        by_tag, users = {}, {}
+        for row in cursor.fetchall():
+            by_tag.setdefault(row['tag_id'], set()).add(row['user_id'])
+            user = users.setdefault(row['user_id'], {'email': row['email'], 'name': row['name'], 'tags': set()})
+            user['tags'].add(row['tag_id'])
+        return by_tag, users
+
+    def load(self, cursor):
+        by_tag, users = self._read(cursor)
+        with self._lock:
+            self._by_tag, self._users = by_tag, users
+            self.loaded = True
+        return sum(len(user['tags']) for user in users.values())
+
+    def ensure_loaded(self, connection_factory):
+        if self.loaded:
+            return
+        try:
+            with connection_factory() as connection:
+                if connection is None:
+                    return
+                cursor = connection.cursor()
+                count = self.load(cursor)
+                cursor.close()
+            print(f"🔎 관심 태그 색인 로드 완료: {count}건")
+        except Exception as e:
+            print(f"❌ 관심 태그 색인 로드 오류: {e}")
+
+    # 변경은 _lock 안에서 _apply_*로 반영하고, verify() 중이면 저널에도 기록
+    def _mutate(self, op, *args):
+        with self._lock:
+            getattr(self, f'_apply_{op}')(*args)
+            if self._journal is not None:
+                self._journal.append((op, args))
+
+    def _apply_add(self, user_id, email, name, tag_id):
+        user = self._users.setdefault(user_id, {'email': email, 'name': name, 'tags': set()})
+        user['tags'].add(tag_id)
+        self._by_tag.setdefault(tag_id, set()).add(user_id)
+
+    def _apply_remove(self, user_id, tag_id):
+        user = self._users.get(user_id)
+        if user is not None:
+            user['tags'].discard(tag_id)
+            if not user['tags']:
+                del self._users[user_id]
+        followers = self._by_tag.get(tag_id)
+        if followers is not None:
+            followers.discard(user_id)
+            if not followers:
+                del self._by_tag[tag_id]
+
+    def _apply_remove_user(self, user_id):
+        user = self._users.pop(user_id, None)
+        if user is None:
+            return
+        for tag_id in user['tags']:
+            followers = self._by_tag.get(tag_id)
+            if followers is not None:
+                followers.discard(user_id)
+                if not followers:
+                    del self._by_tag[tag_id]
+
+    def add(self, user_id, email, name, tag_id):
+        self._mutate('add', user_id, email, name, tag_id)
+
+    def remove(self, user_id, tag_id):
+        self._mutate('remove', user_id, tag_id)
+
+    def remove_user(self, user_id):
+        self._mutate('remove_user', user_id)
+
+    def recipients(self, tag_ids):
+        """
+        tag_ids 중 하나라도 관심 있는 사용자들 (합집합)
+        반환: {email: {'email', 'name', 'tag_id'(처음 일치한 태그)}}
+        """
+        result = {}
+        with self._lock:
+            for tag_id in tag_ids:
+                for user_id in self._by_tag.get(tag_id, ()):
+                    user = self._users[user_id]
+                    if user['email'] not in result:
+                        result[user['email']] = {'email': user['email'], 'name': user['name'], 'tag_id': tag_id}
+        return result
+
+    def _pairs(self):
+        return {(user_id, tag_id) for tag_id, user_ids in self._by_tag.items() for user_id in user_ids}
+
+    def verify(self, cursor):
+        """
+        DB와 비교해 어긋난 항목 수를 세고, 색인을 DB 내용으로 교체
+        DB를 읽는 동안 add/remove/remove_user로 들어온 변경은 저널에 모아 두었다가 교체 후 다시 적용
+        (읽기 결과에 포함됐는지 알 수 없으므로 멱등한 변경을 한 번 더 적용, 해당 항목은 어긋남 집계에서 제외)
+        반환: {'missing': 색인에 없던 (user, tag) 수, 'extra': DB에 없는데 색인에 있던 수}
+        """
+        with self._verify_lock:
+            with self._lock:
+                self._journal = []
+            try:
+                by_tag, users = self._read(cursor)
+            except Exception:
+                with self._lock:
+                    self._journal = None
+                raise
+
+            db_pairs = {(user_id, tag_id) for tag_id, user_ids in by_tag.items() for user_id in user_ids}
+            with self._lock:
+                journal, self._journal = self._journal, None
+                index_pairs = self._pairs()
+                self._by_tag, self._users = by_tag, users
+                for op, args in journal:
+                    getattr(self, f'_apply_{op}')(*args)
+                self.loaded = True
+
+                # 읽는 동안 바뀐 (user, tag)는 어긋남으로 세지 않음
+                touched_users = {args[0] for op, args in journal if op == 'remove_user'}
+                touched = {(args[0], args[-1]) for op, args in journal if op != 'remove_user'}
+                def settled(pair):
+                    return pair not in touched and pair[0] not in touched_users
+                diff = {
+                    'missing': sum(1 for pair in db_pairs - index_pairs if settled(pair)),
+                    'extra': sum(1 for pair in index_pairs - db_pairs if settled(pair))
+                }
+                self._verifications += 1
+                self._last_diff = diff
+            return diff
+
+    def start_verifier(self, connection_factory, interval, stop_event=None):
+        """
+        interval초마다 verify()를 실행하는 스레드 시작 (프로세스당 하나)
+        이미 실행 중이면 그 스레드를 반환하고, fork된 워커 프로세스에서는 새로 시작
+        """
+        stop_event = stop_event or threading.Event()
+
+        def run():
+            while not stop_event.wait(interval):
+                try:
+                    with connection_factory() as connection:
+                        if connection is None:
+                            continue
+                        cursor = connection.cursor()
+                        diff = self.verify(cursor)
+                        cursor.close()
+                    if diff['missing'] or diff['extra']:
+                        print(f"🔧 관심 태그 색인 보정: 누락 {diff['missing']}건, 불필요 {diff['extra']}건")
+                except Exception as e:
+                    print(f"❌ 관심 태그 색인 검증 오류: {e}")
+
+        with self._lock:
+            if self._verifier is not None:
+                pid, thread = self._verifier
+                if pid == os.getpid() and thread.is_alive():
+                    return thread
+            thread = threading.Thread(target=run, name='interest-index-verifier', daemon=True)
+            thread.start()
+            self._verifier = (os.getpid(), thread)
+        return thread
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': self.loaded,
+                'tags': len(self._by_tag),
+                'users': len(self._users),
+                'interests': sum(len(user_ids) for user_ids in self._by_tag.values()),
+                'verifications': self._verifications,
+                'last_diff': self._last_diff
+            }
+
+
+interest_index = InterestIndex()
@@ -0,0 +1,147 @@
+"""
+요청별 최대 메모리 측정 (포스트잇 검출처럼 큰 이미지를 다루는 요청용)
+- 요청 동안 현재 RSS(/proc/self/statm)를 샘플링 스레드가 sample_interval마다 읽어 최대값과 요청 시작 대비 증가량을 기록
+  샘플 사이의 짧은 최대치는 ru_maxrss(프로세스 최대 RSS)가 이 요청 동안 올라갔으면 그 값으로 보완
+- RSS는 프로세스 전체 값이므로 다른 요청과 겹친 측정(overlapped > 0)은 그 요청들의 메모리도 포함된 상한값
+- trace=True: tracemalloc으로 Python/NumPy 할당 최대치도 측정 (OpenCV 내부 임시 버퍼는 포함되지 않음)
+  tracemalloc의 최대치는 프로세스 전체에 하나뿐이라 다른 측정이 없을 때만 초기화 → 겹친 측정은 역시 상한값
+- /proc가 없는 환경(macOS, Windows)은 ru_maxrss의 요청 전후 차이만 기록 (프로세스 시작 이후 최대치 기준)
+- gevent 모드에서는 검출이 허브를 막는 동안 샘플링도 멈추므로 ru_maxrss 보완값에 주로 의존
+"""
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows에는 resource 모듈이 없음 → RSS는 0으로 보고
+    resource = None
+
+# macOS의 ru_maxrss 단위는 바이트
+RSS_UNIT_KB = 1 / 1024 if sys.platform == 'darwin' else 1
+PAGE_KB = os.sysconf('SC_PAGE_SIZE') // 1024 if hasattr(os, 'sysconf') else 4
+
+
+def peak_rss_kb():
+    """프로세스 시작 이후 최대 RSS (KB)"""
+    if resource is None:
+        return 0
+    return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT_KB)
+
+
+def current_rss_kb():
+    """현재 RSS (KB), /proc가 없으면 None"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_KB
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryProbe:
+    def __init__(self, trace=False, sample_interval=0.005):
+        self.trace = trace
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.sample_interval = sample_interval
+        self.sampling = current_rss_kb() is not None
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._active = []  # 진행 중인 측정 기록
+        self._sampler = None
+        self._requests = 0
+        self._overlapped = 0
+        self._growth_max_kb = 0
+        self._traced_total_kb = 0
+        self._traced_max_kb = 0
+
+    def _sample_loop(self):
+        while True:
+            with self._cond:
+                while not self._active:
+                    self._cond.wait()
+            rss = current_rss_kb()
+            with self._lock:
+                for record in self._active:
+                    record['max'] = max(record['max'], rss)
+            time.sleep(self.sample_interval)
+
+    def _begin(self):
+        rss = current_rss_kb() if self.sampling else None
+        record = {'start': rss, 'max': rss, 'overlapped': 0, 'maxrss': peak_rss_kb()}
+        with self._cond:
+            if self.sampling and self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample_loop, name='memory-probe', daemon=True)
+                self._sampler.start()
+            for other in self._active:
+                other['overlapped'] += 1
+            record['overlapped'] = len(self._active)
+            alone = not self._active
+            self._active.append(record)
+            self._cond.notify()
+            if self.trace:
+                if alone:
+                    tracemalloc.reset_peak()
+                record['traced_before'] = tracemalloc.get_traced_memory()[0]
+        return record
+
+    def _end(self, record, sample):
+        maxrss = peak_rss_kb()
+        with self._lock:
+            self._active.remove(record)
+            if self.trace:
+                traced_peak = tracemalloc.get_traced_memory()[1]
+
+        if self.sampling:
+            peak = max(record['max'], current_rss_kb())
+            # 샘플 사이에 지나간 최대치: ru_maxrss가 이 요청 동안 올라갔다면 그 시점의 RSS
+            if maxrss > record['maxrss']:
+                peak = max(peak, maxrss)
+            sample['peak_rss_kb'] = peak
+            sample['rss_growth_kb'] = peak - record['start']
+        else:
+            sample['peak_rss_kb'] = maxrss
+            sample['rss_growth_kb'] = maxrss - record['maxrss']
+        sample['overlapped'] = record['overlapped']
+        if self.trace:
+            sample['traced_peak_kb'] = max(0, traced_peak - record['traced_before']) // 1024
+
+    @contextmanager
+    def measure(self):
+        """with probe.measure() as sample: ... 블록이 끝나면 sample에 측정값이 채워짐"""
+        sample = {}
+        record = self._begin()
+        try:
+            yield sample
+        finally:
+            self._end(record, sample)
+            self._record(sample)
+
+    def _record(self, sample):
+        with self._lock:
+            self._requests += 1
+            if sample['overlapped']:
+                self._overlapped += 1
+            self._growth_max_kb = max(self._growth_max_kb, sample['rss_growth_kb'])
+            if self.trace:
+                self._traced_total_kb += sample['traced_peak_kb']
+                self._traced_max_kb = max(self._traced_max_kb, sample['traced_peak_kb'])
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'requests': self._requests,
+                'overlapped_requests': self._overlapped,
+                'per_request_rss': self.sampling,
+                'process_peak_rss_kb': peak_rss_kb(),
+                'max_rss_growth_kb': self._growth_max_kb,
+                'trace': self.trace
+            }
+            if self.trace:
+                stats['avg_traced_peak_kb'] = round(self._traced_total_kb / self._requests, 1) if self._requests else 0.0
+                stats['max_traced_peak_kb'] = self._traced_max_kb
+            return stats
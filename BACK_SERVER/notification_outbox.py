@@ -0,0 +1,245 @@
+"""
+MySQL 기반 알림 outbox
+메모리 저장소(notification_store.py)와 같은 인터페이스(add, drain, wait_for, stats)를 제공하지만
+알림을 DB 테이블에 저장하므로 서버가 재시작되거나 워커가 여러 개여도 알림이 사라지지 않습니다.
+
+- publish()/add()는 호출한 스레드에서 바로 짧은 트랜잭션으로 다중 행 INSERT 후 반환
+  (메모리 버퍼를 거치지 않으므로 반환된 알림은 서버가 바로 죽어도 남음, 저장에 실패하면 예외)
+- 조회는 (recipient_email, delivered_at, id) 인덱스로 수신자별 커서(id) 이후만 읽음
+- 클라이언트가 받은 알림은 delivered_at을 기록해 확인 처리
+- 확인된 알림과 오래된 알림은 주기적으로 삭제(compaction)
+- 같은 (type, challenge_id) 알림은 조회 시 요약(digest) 하나로 합쳐 반환 (notification_store.coalesce_events)
+
+필요한 테이블:
+CREATE TABLE notification_outbox (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    recipient_email VARCHAR(255) NOT NULL,
+    payload JSON NOT NULL,
+    created_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    delivered_at DATETIME(3) NULL,
+    KEY idx_outbox_recipient (recipient_email, delivered_at, id),
+    KEY idx_outbox_created (created_at)
+);
+"""
+import json
+import threading
+import time
+
+from notification_store import coalesce_events
+
+
+class NotificationOutbox:
+    def __init__(self, connection_factory, batch_size=200,
+                 ttl=7 * 24 * 3600, delivered_retention=3600, compact_interval=300,
+                 poll_interval=2.0, fetch_limit=200):
+        self.connection_factory = connection_factory  # with connection_factory() as connection:
+        self.batch_size = batch_size  # INSERT 한 번에 넣을 최대 행 수
+        self.ttl = ttl
+        self.delivered_retention = delivered_retention
+        self.compact_interval = compact_interval
+        self.poll_interval = poll_interval  # 다른 워커가 쓴 알림을 확인하기 위한 재조회 주기
+        self.fetch_limit = fetch_limit
+
+        self._cond = threading.Condition()
+        self._flush_gen = {}  # recipient -> 이 프로세스에서 저장된 횟수 (대기 중인 롱폴링 깨우기용)
+        self._threads = []
+
+        self._stats_lock = threading.Lock()
+        self._appended = 0
+        self._insert_batches = 0
+        self._write_errors = 0
+        self._delivered = 0
+        self._compacted = 0
+        self._waiting = 0
+
+    # ───────────── 쓰기 ─────────────
+    def publish(self, user_emails, data):
+        """여러 사용자에게 같은 알림을 바로 DB에 저장"""
+        return self.publish_many([(user_emails, data)])
+
+    def publish_many(self, groups):
+        """
+        [(user_emails, data), ...]를 한 트랜잭션으로 저장 (JSON 직렬화는 알림마다 한 번, batch_size행씩 다중 행 INSERT)
+        저장에 실패하면 아무것도 저장되지 않고 예외를 그대로 던짐 → 호출한 fan-out 작업의 재시도에 맡김
+        (일부 그룹만 저장된 뒤 재시도되어 같은 알림이 두 번 가는 일이 없음)
+        """
+        rows = []
+        for user_emails, data in groups:
+            payload = json.dumps(data, ensure_ascii=False, default=str)
+            rows.extend((user_email, payload) for user_email in dict.fromkeys(user_emails))
+        if not rows:
+            return []
+        try:
+            self._write(rows)
+        except Exception:
+            with self._stats_lock:
+                self._write_errors += 1
+            raise
+
+        with self._stats_lock:
+            self._appended += len(rows)
+        with self._cond:
+            for user_email, _ in rows:
+                self._flush_gen[user_email] = self._flush_gen.get(user_email, 0) + 1
+            self._cond.notify_all()
+        return []  # event_id는 DB에 저장될 때 정해짐
+
+    def add(self, user_email, data):
+        """알림 하나를 바로 DB에 저장"""
+        self.publish([user_email], data)
+        return None
+
+    def _write(self, rows):
+        """모든 행을 한 트랜잭션으로 저장 (일부만 저장되는 경우 없음)"""
+        with self.connection_factory() as connection:
+            if connection is None:
+                raise RuntimeError('데이터베이스 연결 실패')
+            cursor = connection.cursor()
+            try:
+                for start in range(0, len(rows), self.batch_size):
+                    # executemany는 다중 행 INSERT 한 번으로 전송됨
+                    cursor.executemany(
+                        "INSERT INTO notification_outbox (recipient_email, payload) VALUES (%s, %s)",
+                        rows[start:start + self.batch_size]
+                    )
+                    with self._stats_lock:
+                        self._insert_batches += 1
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    # ───────────── 읽기 / 확인 ─────────────
+    def _fetch(self, cursor, user_email, after_id):
+        cursor.execute("""
+            SELECT id, payload
+            FROM notification_outbox
+            WHERE recipient_email = %s AND delivered_at IS NULL AND id > %s
+            ORDER BY id
+            LIMIT %s
+        """, (user_email, after_id, self.fetch_limit))
+        return [(row['id'], json.loads(row['payload'])) for row in cursor.fetchall()]
+
+    def _ack(self, cursor, user_email, up_to_id):
+        cursor.execute("""
+            UPDATE notification_outbox
+            SET delivered_at = NOW(3)
+            WHERE recipient_email = %s AND delivered_at IS NULL AND id <= %s
+        """, (user_email, up_to_id))
+        with self._stats_lock:
+            self._delivered += cursor.rowcount
+
+    def drain(self, user_email):
+        """기존 조회 API용: 아직 전달되지 않은 알림을 모두 가져오고 전달 완료로 표시 (같은 도전과제 알림은 요약)"""
+        with self.connection_factory() as connection:
+            if connection is None:
+                raise RuntimeError('데이터베이스 연결 실패')
+            cursor = connection.cursor()
+            events = self._fetch(cursor, user_email, 0)
+            if events:
+                self._ack(cursor, user_email, events[-1][0])
+            connection.commit()
+            cursor.close()
+        return [data for _, data in coalesce_events(events)]
+
+    def wait_for(self, user_email, after_id=0, timeout=0):
+        """
+        after_id 이하 알림은 전달 완료로 표시하고 그 이후 알림을 반환
+        없으면 이 프로세스의 저장 신호 또는 poll_interval마다 다시 조회하며 timeout초까지 대기
+        반환: [(event_id, data), ...] (같은 도전과제 알림은 요약 하나, event_id는 그중 가장 큰 값)
+        """
+        deadline = time.monotonic() + timeout
+        acked = after_id <= 0
+        waiting = False
+        try:
+            while True:
+                with self._cond:
+                    seen = self._flush_gen.get(user_email, 0)
+
+                with self.connection_factory() as connection:
+                    if connection is None:
+                        raise RuntimeError('데이터베이스 연결 실패')
+                    cursor = connection.cursor()
+                    if not acked:
+                        self._ack(cursor, user_email, after_id)
+                        acked = True
+                    events = self._fetch(cursor, user_email, after_id)
+                    connection.commit()
+                    cursor.close()
+
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    return coalesce_events(events)
+
+                if not waiting:
+                    waiting = True
+                    with self._stats_lock:
+                        self._waiting += 1
+                with self._cond:
+                    self._cond.wait_for(
+                        lambda: self._flush_gen.get(user_email, 0) != seen,
+                        timeout=min(remaining, self.poll_interval)
+                    )
+        finally:
+            if waiting:
+                with self._stats_lock:
+                    self._waiting -= 1
+
+    # ───────────── 정리 ─────────────
+    def compact(self, chunk=1000):
+        """전달 완료 후 delivered_retention초가 지난 알림과 ttl초가 지난 알림 삭제"""
+        removed = 0
+        with self.connection_factory() as connection:
+            if connection is None:
+                return 0
+            cursor = connection.cursor()
+            for condition, seconds in (
+                ("delivered_at IS NOT NULL AND delivered_at < NOW(3) - INTERVAL %s SECOND", self.delivered_retention),
+                ("created_at < NOW(3) - INTERVAL %s SECOND", self.ttl),
+            ):
+                while True:
+                    cursor.execute(f"DELETE FROM notification_outbox WHERE {condition} LIMIT %s", (int(seconds), chunk))
+                    connection.commit()
+                    removed += cursor.rowcount
+                    if cursor.rowcount < chunk:
+                        break
+            cursor.close()
+
+        with self._cond:
+            # 대기 중인 요청이 없는 수신자의 flush 기록은 정리 (있어도 한 번 더 조회할 뿐)
+            self._flush_gen.clear()
+        with self._stats_lock:
+            self._compacted += removed
+        return removed
+
+    def _run_compactor(self):
+        while True:
+            time.sleep(self.compact_interval)
+            try:
+                removed = self.compact()
+                if removed:
+                    print(f"🧹 알림 outbox 정리: {removed}개 삭제")
+            except Exception as e:
+                print(f"❌ 알림 outbox 정리 오류: {e}")
+
+    def start(self):
+        if self._threads:
+            return
+        thread = threading.Thread(target=self._run_compactor, name='outbox-compactor', daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'backend': 'mysql',
+                'appended': self._appended,
+                'insert_batches': self._insert_batches,
+                'avg_batch_size': round(self._appended / self._insert_batches, 2) if self._insert_batches else 0.0,
+                'write_errors': self._write_errors,
+                'delivered': self._delivered,
+                'compacted': self._compacted,
+                'waiting': self._waiting
+            }
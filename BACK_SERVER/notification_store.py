@@ -0,0 +1,353 @@
+"""
+메모리 기반 알림 저장소
+- 사용자 이메일 해시로 여러 샤드에 나누고 샤드마다 별도 Lock (요청 스레드/백그라운드 스레드 동시 접근 안전)
+- 사용자별 최대 capacity개 보관, 넘치면 가장 오래된 알림부터 버림
+- ttl초가 지난 알림은 백그라운드 sweeper가 주기적으로 삭제
+- 보관 중인 알림 수/추정 메모리 사용량 등 통계 제공
+- 알림마다 증가하는 event_id를 붙여, wait_for()로 새 알림이 올 때까지 기다렸다가 받을 수 있음 (롱폴링)
+  클라이언트가 마지막으로 받은 event_id를 보내면 그 이하 알림은 확인된 것으로 보고 삭제
+- publish()로 여러 수신자에게 보내는 알림은 내용(payload)을 한 번만 저장하고 수신자별로는 참조만 보관
+- 같은 도전과제의 같은 종류 알림은 하나로 합쳐 개수만 늘림 → 조회 시 "새 인증 N개" 요약(digest)으로 반환
+  (사용자별 메모리/응답 크기가 알림 수가 아니라 도전과제 수에 비례)
+"""
+import itertools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+# 수신자별 항목(_Entry) 하나의 대략적인 크기 (payload 제외)
+ENTRY_OVERHEAD = 200
+
+# 요약 알림 문구 (type -> (title, message))
+DIGEST_TEMPLATES = {
+    'new_submission': ('새로운 인증 사진 {count}개!', '"{challenge_title}" 도전과제에 인증 사진 {count}개가 새로 올라왔습니다.'),
+    'peer_submission': ('동료의 새 인증 {count}개!', '"{challenge_title}" 도전과제에 새로운 인증 {count}개가 올라왔습니다.'),
+}
+
+
+def estimate_size(data):
+    """알림 딕셔너리의 대략적인 메모리 사용량 (바이트)"""
+    size = sys.getsizeof(data)
+    if isinstance(data, dict):
+        for key, value in data.items():
+            size += sys.getsizeof(key) + sys.getsizeof(value)
+    return size
+
+
+def coalesce_key(data):
+    """합칠 수 있는 알림이면 (type, challenge_id), 아니면 None"""
+    if isinstance(data, dict) and data.get('type') and data.get('challenge_id') is not None:
+        return (data['type'], data['challenge_id'])
+    return None
+
+
+def make_digest(data, count):
+    """가장 최근 알림(data)을 바탕으로 count개를 합친 요약 알림 생성"""
+    if count <= 1:
+        return data
+    digest = dict(data, count=count, digest=True)
+    template = DIGEST_TEMPLATES.get(data.get('type'))
+    if template:
+        title, message = template
+        digest['title'] = title.format(count=count, **data)
+        digest['message'] = message.format(count=count, **data)
+    else:
+        digest['message'] = f"{data.get('message', '')} (외 {count - 1}건)"
+    return digest
+
+
+def coalesce_events(events):
+    """
+    [(event_id, data), ...]에서 같은 (type, challenge_id) 알림을 요약 하나로 합침
+    각 요약의 event_id는 합쳐진 알림 중 가장 큰 값이며, 결과는 event_id 순서
+    """
+    groups = {}
+    for event_id, data in events:
+        key = coalesce_key(data)
+        if key is None:
+            key = ('event', event_id)
+        group = groups.pop(key, None)
+        # 다시 넣어서 가장 최근 알림 위치로 이동
+        groups[key] = [event_id, data, group[2] + 1 if group else 1]
+    return [(event_id, make_digest(data, count)) for event_id, data, count in groups.values()]
+
+
+class _Payload:
+    """여러 수신자가 함께 참조하는 알림 내용"""
+    __slots__ = ('data', 'size', 'refs')
+
+    def __init__(self, data):
+        self.data = data
+        self.size = estimate_size(data)
+        self.refs = 0
+
+
+class _Entry:
+    """수신자별 알림 항목. 같은 (type, challenge_id) 알림이 오면 payload만 바꾸고 count 증가"""
+    __slots__ = ('event_id', 'expires_at', 'payload', 'count', 'sent_id', 'sent_count')
+
+    def __init__(self, event_id, expires_at, payload, count=1):
+        self.event_id = event_id
+        self.expires_at = expires_at
+        self.payload = payload
+        self.count = count
+        self.sent_id = None     # 롱폴링으로 마지막에 보낸 시점의 event_id
+        self.sent_count = 0     # 그때의 count (그 event_id가 확인되면 그만큼 차감)
+
+    def render(self):
+        return make_digest(self.payload.data, self.count)
+
+
+class _Shard:
+    __slots__ = ('cond', 'users')
+
+    def __init__(self):
+        self.cond = threading.Condition()  # Lock 겸 새 알림 도착 신호
+        self.users = {}  # user_email -> OrderedDict[key -> _Entry] (event_id 순서)
+
+
+class NotificationStore:
+    def __init__(self, shards=16, capacity=100, ttl=7 * 24 * 3600, sweep_interval=60):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._shards = [_Shard() for _ in range(shards)]
+        self._stats_lock = threading.Lock()
+        self._count = 0
+        self._payloads = 0
+        self._payload_bytes = 0
+        self._added = 0
+        self._coalesced = 0
+        self._drained = 0
+        self._dropped = 0
+        self._expired = 0
+        self._sweeper = None
+        # 서버가 재시작돼도 이전 event_id보다 커지도록 현재 시각(ms)부터 시작
+        self._event_ids = itertools.count(int(time.time() * 1000))
+        self._waiting = 0
+
+    def _shard(self, user_email):
+        return self._shards[hash(user_email) % len(self._shards)]
+
+    def _account(self, count=0, added=0, coalesced=0, drained=0, dropped=0, expired=0, released=()):
+        with self._stats_lock:
+            self._count += count
+            self._added += added
+            self._coalesced += coalesced
+            self._drained += drained
+            self._dropped += dropped
+            self._expired += expired
+            for payload in released:
+                payload.refs -= 1
+                if payload.refs == 0:
+                    self._payloads -= 1
+                    self._payload_bytes -= payload.size
+
+    def _retain(self, payload, refs):
+        with self._stats_lock:
+            if payload.refs == 0:
+                self._payloads += 1
+                self._payload_bytes += payload.size
+            payload.refs += refs
+
+    def publish_many(self, groups):
+        """[(user_emails, data), ...]를 차례로 publish (NotificationOutbox와 같은 인터페이스)"""
+        event_ids = []
+        for user_emails, data in groups:
+            event_ids.extend(self.publish(user_emails, data))
+        return event_ids
+
+    def publish(self, user_emails, data):
+        """
+        여러 사용자에게 같은 알림 추가 (내용은 한 번만 저장)
+        같은 (type, challenge_id) 알림이 이미 있으면 합치고, 없으면 새 항목 추가 (capacity를 넘으면 가장 오래된 항목을 버림)
+        반환: 사용자별로 부여된 event_id 리스트
+        """
+        user_emails = list(user_emails)
+        if not user_emails:
+            return []
+        payload = _Payload(data)
+        key = coalesce_key(data)
+        expires_at = time.monotonic() + self.ttl
+        self._retain(payload, len(user_emails))
+
+        event_ids = []
+        released = []
+        added = coalesced = dropped = 0
+        for user_email in user_emails:
+            shard = self._shard(user_email)
+            with shard.cond:
+                event_id = next(self._event_ids)
+                entries = shard.users.get(user_email)
+                if entries is None:
+                    entries = shard.users[user_email] = OrderedDict()
+                entry_key = key if key is not None else ('event', event_id)
+                entry = entries.pop(entry_key, None)
+                if entry is not None:
+                    # 기존 항목에 합침: 최신 내용으로 바꾸고 맨 뒤(가장 최근)로 이동
+                    released.append(entry.payload)
+                    entry.event_id = event_id
+                    entry.expires_at = expires_at
+                    entry.payload = payload
+                    entry.count += 1
+                    coalesced += 1
+                else:
+                    while len(entries) >= self.capacity:
+                        _, old = entries.popitem(last=False)
+                        released.append(old.payload)
+                        dropped += 1
+                    entry = _Entry(event_id, expires_at, payload)
+                    added += 1
+                entries[entry_key] = entry
+                # 이 샤드에서 기다리는 롱폴링 요청을 깨움
+                shard.cond.notify_all()
+            event_ids.append(event_id)
+
+        self._account(count=added - dropped, added=len(user_emails), coalesced=coalesced,
+                      dropped=dropped, released=released)
+        return event_ids
+
+    def add(self, user_email, data):
+        """알림 추가. 부여된 event_id를 반환"""
+        return self.publish([user_email], data)[0]
+
+    def drain(self, user_email):
+        """사용자의 (만료되지 않은) 알림을 모두 꺼내고 저장소에서 삭제. 합쳐진 알림은 요약으로 반환"""
+        now = time.monotonic()
+        shard = self._shard(user_email)
+        with shard.cond:
+            entries = shard.users.pop(user_email, None)
+        if not entries:
+            return []
+
+        live = [entry for entry in entries.values() if entry.expires_at > now]
+        self._account(count=-len(entries), drained=sum(entry.count for entry in live),
+                      expired=len(entries) - len(live), released=[entry.payload for entry in entries.values()])
+        return [entry.render() for entry in live]
+
+    def _collect(self, shard, user_email, after_id):
+        """
+        (shard.cond를 잡은 상태에서 호출) after_id 이하 알림은 확인된 것으로 삭제하고
+        그 이후 알림을 [(event_id, data), ...]로 반환 (삭제하지 않음 - 재연결 시 다시 받을 수 있도록)
+        """
+        entries = shard.users.get(user_email)
+        if not entries:
+            return []
+
+        now = time.monotonic()
+        acked = expired = 0
+        released = []
+        for entry_key, entry in list(entries.items()):
+            if entry.event_id <= after_id or entry.expires_at <= now:
+                del entries[entry_key]
+                released.append(entry.payload)
+                if entry.event_id <= after_id:
+                    acked += entry.count
+                else:
+                    expired += 1
+            elif entry.sent_id is not None and entry.sent_id <= after_id:
+                # 이전에 보낸 요약은 확인됨 → 그 뒤에 합쳐진 알림만 남김
+                entry.count -= entry.sent_count
+                acked += entry.sent_count
+                entry.sent_id = None
+        if not entries:
+            del shard.users[user_email]
+        if released or acked:
+            self._account(count=-len(released), drained=acked, expired=expired, released=released)
+
+        events = []
+        for entry in entries.values():
+            entry.sent_id = entry.event_id
+            entry.sent_count = entry.count
+            events.append((entry.event_id, entry.render()))
+        return events
+
+    def wait_for(self, user_email, after_id=0, timeout=0):
+        """
+        after_id 이후의 알림을 반환. 없으면 새 알림이 오거나 timeout초가 지날 때까지 대기
+        반환: [(event_id, data), ...]
+        """
+        deadline = time.monotonic() + timeout
+        shard = self._shard(user_email)
+        with shard.cond:
+            events = self._collect(shard, user_email, after_id)
+            if events or timeout <= 0:
+                return events
+
+            with self._stats_lock:
+                self._waiting += 1
+            try:
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return []
+                    shard.cond.wait(remaining)
+                    events = self._collect(shard, user_email, after_id)
+                    if events:
+                        return events
+            finally:
+                with self._stats_lock:
+                    self._waiting -= 1
+
+    def sweep(self):
+        """만료된 알림 삭제. 삭제한 개수를 반환"""
+        now = time.monotonic()
+        released = []
+        for shard in self._shards:
+            with shard.cond:
+                for user_email in list(shard.users):
+                    entries = shard.users[user_email]
+                    # 뒤에 있는(최근에 갱신된) 항목일수록 늦게 만료되므로 앞에서부터만 확인
+                    while entries:
+                        entry = next(iter(entries.values()))
+                        if entry.expires_at > now:
+                            break
+                        entries.popitem(last=False)
+                        released.append(entry.payload)
+                    if not entries:
+                        del shard.users[user_email]
+        if released:
+            self._account(count=-len(released), expired=len(released), released=released)
+        return len(released)
+
+    def start_sweeper(self, stop_event=None):
+        """sweep_interval초마다 sweep()을 실행하는 스레드 시작 (stop_event를 set()하면 종료)"""
+        if self._sweeper is not None:
+            return self._sweeper
+        stop_event = stop_event or threading.Event()
+
+        def run():
+            while not stop_event.wait(self.sweep_interval):
+                try:
+                    removed = self.sweep()
+                    if removed:
+                        print(f"🧹 만료된 알림 {removed}개 삭제")
+                except Exception as e:
+                    print(f"❌ 알림 정리 오류: {e}")
+
+        self._sweeper = threading.Thread(target=run, name='notification-sweeper', daemon=True)
+        self._sweeper.start()
+        return self._sweeper
+
+    def stats(self):
+        users = 0
+        for shard in self._shards:
+            with shard.cond:
+                users += len(shard.users)
+        with self._stats_lock:
+            return {
+                'users': users,
+                'notifications': self._count,
+                'shared_payloads': self._payloads,
+                'approx_bytes': self._count * ENTRY_OVERHEAD + self._payload_bytes,
+                'capacity_per_user': self.capacity,
+                'ttl_seconds': self.ttl,
+                'added': self._added,
+                'coalesced': self._coalesced,
+                'drained': self._drained,
+                'dropped_overflow': self._dropped,
+                'expired': self._expired,
+                'waiting': self._waiting
+            }
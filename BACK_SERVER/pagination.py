@@ -0,0 +1,55 @@
+"""
+키셋(커서) 페이지네이션 도우미
+OFFSET 대신 마지막으로 본 행의 (created_at, id)를 커서로 넘겨
+몇 번째 페이지든 같은 비용으로 다음 페이지를 조회합니다.
+커서는 클라이언트가 해석하지 않도록 base64로 감싼 불투명 문자열입니다.
+"""
+import base64
+import datetime
+import json
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class InvalidCursor(ValueError):
+    """잘못된 커서/limit 값"""
+
+
+def encode_cursor(created_at, row_id):
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """커서 문자열 -> (created_at, id)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor('유효하지 않은 커서입니다')
+
+
+def parse_limit(value):
+    if value is None or value == '':
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise InvalidCursor('limit은 정수여야 합니다')
+    if limit < 1:
+        raise InvalidCursor('limit은 1 이상이어야 합니다')
+    return min(limit, MAX_LIMIT)
+
+
+def keyset_condition(cursor, created_col='c.created_at', id_col='c.id'):
+    """
+    (created_at DESC, id DESC) 정렬 기준으로 커서 다음 행들을 고르는 WHERE 조건과 파라미터
+    커서가 없으면 조건 없음
+    """
+    if not cursor:
+        return '', ()
+    created_at, row_id = decode_cursor(cursor)
+    condition = f"({created_col} < %s OR ({created_col} = %s AND {id_col} < %s))"
+    return condition, (created_at, created_at, row_id)
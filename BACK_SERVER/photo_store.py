@@ -0,0 +1,91 @@
+"""
+내용 주소 기반(content-addressed) 사진 저장소
+- 업로드를 임시 파일에 조금씩 쓰면서 동시에 sha256 해시 계산 (파일 전체를 메모리에 올리지 않음)
+- 다 받은 뒤 해시 앞 두 글자씩으로 나눈 폴더로 이동: photos/ab/cd/<sha256>.<확장자>
+- 같은 내용의 사진은 이미 있는 파일을 그대로 사용 (재시도 업로드 등 중복 저장 방지)
+- 기존 photos/<timestamp_filename> 형태의 파일은 그대로 두며 같은 /photos/ 경로로 제공됨
+"""
+import hashlib
+import os
+import re
+import tempfile
+import threading
+
+CHUNK_SIZE = 64 * 1024
+
+# 같은 형식인데 확장자만 다른 경우 하나로 통일
+EXTENSION_ALIASES = {'jpeg': 'jpg'}
+
+# ab/cd/<sha256>.<ext> 또는 그 축소본 ab/cd/<sha256>_w<너비>.<ext>
+CONTENT_ADDRESSED = re.compile(r'^([0-9a-f]{2})/([0-9a-f]{2})/\1\2[0-9a-f]{60}(_w\d+)?\.[a-z0-9]+$')
+
+
+def is_content_addressed(relative):
+    """내용이 절대 바뀌지 않는(해시 이름) 파일인지"""
+    return CONTENT_ADDRESSED.match(relative) is not None
+
+
+class PhotoStore:
+    def __init__(self, root):
+        self.root = root
+        self.tmp_dir = os.path.join(root, '.tmp')
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+        self._stats_lock = threading.Lock()
+        self._saved = 0
+        self._deduplicated = 0
+        self._bytes_written = 0
+
+    @staticmethod
+    def relative_path(digest, ext):
+        """해시로 저장 위치 결정: ab/cd/<digest>.<ext>"""
+        return f"{digest[:2]}/{digest[2:4]}/{digest}.{ext}"
+
+    def save(self, file_storage, ext):
+        """
+        업로드 파일(werkzeug FileStorage)을 저장하고 (root 기준 상대 경로, 중복 여부)를 반환
+        """
+        ext = EXTENSION_ALIASES.get(ext.lower(), ext.lower())
+        hasher = hashlib.sha256()
+        size = 0
+
+        # 임시 파일은 같은 파일시스템(root/.tmp)에 만들어 rename이 원자적으로 되도록 함
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = file_storage.stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    hasher.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+
+            relative = self.relative_path(hasher.hexdigest(), ext)
+            final_path = os.path.join(self.root, relative)
+            if os.path.exists(final_path):
+                os.remove(tmp_path)
+                with self._stats_lock:
+                    self._deduplicated += 1
+                return relative, True
+
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            # 동시에 같은 내용이 올라와도 내용이 같으므로 덮어써도 안전
+            os.replace(tmp_path, final_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._stats_lock:
+            self._saved += 1
+            self._bytes_written += size
+        return relative, False
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'saved': self._saved,
+                'deduplicated': self._deduplicated,
+                'bytes_written': self._bytes_written
+            }
@@ -0,0 +1,537 @@
+"""
+포스트잇 검출 공용 모듈
+BACK_SERVER/server.py, app_umai.py, utils/imageProcessServer.py가 함께 사용
+(HSV 마스크, 후보 점수, 피라미드 검출, 축소 디코딩, 검출 결과 캐시)
+"""
+import io
+import hashlib
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# 기본 검출 설정 (app_umai.py 최적값)
+LOWER_YELLOW = (27, 25, 120)
+UPPER_YELLOW = (35, 255, 255)
+MIN_AREA = 8000
+MAX_AR_DIFF = 50
+MIN_SCORE = 50  # 최고점수가 이보다 낮으면 포스트잇 없음으로 처리
+
+# 피라미드 검출: 긴 변 PYRAMID_MAX_SIDE px로 줄인 이미지에서 검출 후 원본 좌표로 변환
+PYRAMID_MAX_SIDE = 1000
+PYRAMID_MODE = True
+REFINE_BBOX = True  # 원본 해상도의 ROI 안에서 BBox 경계 보정
+
+def detection_params(lower=LOWER_YELLOW, upper=UPPER_YELLOW, min_area=MIN_AREA, max_ar_diff=MAX_AR_DIFF,
+                     min_score=MIN_SCORE, pyramid=PYRAMID_MODE, refine=REFINE_BBOX):
+    """검출 함수에 넘기는 설정 dict (app_umai.py처럼 슬라이더로 값을 바꾸는 쪽에서 사용)"""
+    return {
+        'lower': tuple(lower),
+        'upper': tuple(upper),
+        'min_area': min_area,
+        'max_ar_diff': max_ar_diff,
+        'min_score': min_score,
+        'pyramid': pyramid,
+        'refine': refine
+    }
+
+DEFAULT_PARAMS = detection_params()
+
+# ---------- 작업 버퍼 재사용 ----------
+class ScratchBuffers(threading.local):
+    """
+    스레드별로 재사용하는 uint8 작업 버퍼 (HSV 이미지, 마스크, 모폴로지 결과)
+    요청한 크기 이하면 기존 버퍼의 앞부분을 잘라 쓰고, 더 크면 그때만 새로 할당
+    """
+    def __init__(self):
+        self._pool = {}
+
+    def get(self, name, shape):
+        size = int(np.prod(shape))
+        buf = self._pool.get(name)
+        if buf is None or buf.size < size:
+            buf = np.empty(size, np.uint8)
+            self._pool[name] = buf
+        return buf[:size].reshape(shape)
+
+scratch_buffers = ScratchBuffers()
+
+def scratch(buffers, name, shape):
+    """buffers가 없으면 None (OpenCV가 dst를 새로 할당)"""
+    return None if buffers is None else buffers.get(name, shape)
+
+# ---------- Adaptive HSV 마스크 ----------
+# select_hsv_low가 시도하는 (sat, val) 하한 순서와 성공 기준 픽셀 수 (원본 해상도 기준)
+# None은 기본 하한값(base_low) 그대로 사용
+HSV_FALLBACK_STEPS = (
+    [((sat, None), 2000) for sat in (None, 40, 25, 10, 5)] +        # 1단계: Saturation 하한을 단계적으로 낮춤
+    [((sat, val), 1000) for val in (30, 20, 10) for sat in (5, 3, 1)]  # 2단계: Value 하한도 낮춰보기
+)
+
+def select_hsv_low(hsv_img, base_low, base_up, scale=1.0, buffers=None):
+    """
+    select_hsv_low_reference와 같은 HSV 하한을 이미지 한 번 스캔으로 선택 → (선택된 하한, 마스크)
+    색상(H) 범위 안 픽셀의 S-V 2차원 히스토그램을 만들고 뒤쪽 누적합을 구하면
+    어떤 (sat, val) 하한에서도 inRange 픽셀 수를 바로 읽을 수 있음
+    buffers: ScratchBuffers를 주면 마스크를 새로 할당하지 않고 재사용 버퍼에 씀
+    """
+    plane = hsv_img.shape[:2]
+    pixel_scale = scale * scale
+    low_h, up_h = base_low[0], base_up[0]
+    up_s, up_v = base_up[1], base_up[2]
+    
+    # H 범위 안 픽셀만 S-V 히스토그램에 포함
+    hue_mask = cv2.inRange(hsv_img, np.array((low_h, 0, 0), np.uint8), np.array((up_h, 255, 255), np.uint8),
+                           dst=scratch(buffers, 'mask_a', plane))
+    hist = cv2.calcHist([hsv_img], [1, 2], hue_mask, [256, 256], [0, 256, 0, 256])
+    # float32 히스토그램은 칸당 2^24개까지 정확 (그 이상이면 어차피 기준 픽셀 수를 넘음)
+    hist = hist[:up_s + 1, :up_v + 1].astype(np.int64)
+    # counts[s, v] = S >= s, V >= v 인 픽셀 수 (S <= up_s, V <= up_v 범위 안)
+    counts = hist[::-1, ::-1].cumsum(axis=0).cumsum(axis=1)[::-1, ::-1]
+    
+    def count(sat, val):
+        if sat > up_s or val > up_v:
+            return 0
+        return int(counts[sat, val])
+    
+    for (sat, val), min_pixels in HSV_FALLBACK_STEPS:
+        low = (low_h, base_low[1] if sat is None else sat, base_low[2] if val is None else val)
+        if count(low[1], low[2]) > min_pixels * pixel_scale:
+            break
+    # 기준을 만족하는 조합이 없으면 마지막 조합 사용 (기존 동작과 같음)
+    
+    mask = cv2.inRange(hsv_img, np.array(low, np.uint8), np.array(base_up, np.uint8),
+                       dst=scratch(buffers, 'mask_a', plane))
+    return low, mask
+
+def select_hsv_low_reference(hsv_img, base_low, base_up, scale=1.0):
+    """
+    (기존 구현) 다양한 HSV 하한을 차례로 시도하여 (선택된 하한, 마스크) 반환
+    select_hsv_low의 결과 검증용으로 남겨둠
+    scale: 원본 대비 축소 비율 (픽셀 수 기준도 scale² 만큼 줄임)
+    """
+    low = list(base_low)
+    up  = list(base_up)
+    pixel_scale = scale * scale
+    
+    # 1단계: Saturation 하한을 단계적으로 낮춤
+    for sat in (low[1], 40, 25, 10, 5):
+        low[1] = sat
+        mask = cv2.inRange(
+            hsv_img, np.array(low, np.uint8), np.array(up, np.uint8)
+        )
+        if cv2.countNonZero(mask) > 2000 * pixel_scale:   # 2k 픽셀 이상이면 성공
+            return tuple(low), mask
+    
+    # 2단계: Value 하한도 낮춰보기
+    low = list(base_low)
+    for val in (30, 20, 10):
+        for sat in (5, 3, 1):
+            low[1] = sat
+            low[2] = val
+            mask = cv2.inRange(
+                hsv_img, np.array(low, np.uint8), np.array(up, np.uint8)
+            )
+            if cv2.countNonZero(mask) > 1000 * pixel_scale:   # 1k 픽셀 이상이면 성공
+                return tuple(low), mask
+    
+    return tuple(low), mask  # 마지막 결과 반환
+
+def adaptive_inrange(hsv_img, base_low, base_up, scale=1.0):
+    """다양한 HSV 범위를 시도하여 최적의 마스크 확보"""
+    return select_hsv_low(hsv_img, base_low, base_up, scale)[1]
+
+def adaptive_inrange_reference(hsv_img, base_low, base_up, scale=1.0):
+    """(기존 구현) HSV 범위를 하나씩 inRange로 시도하는 방식"""
+    return select_hsv_low_reference(hsv_img, base_low, base_up, scale)[1]
+
+# ---------- 마스크 정리 ----------
+def scaled_kernel(size, scale=1.0):
+    """원본 기준 커널 크기를 축소 비율에 맞춤"""
+    k = max(1, int(round(size * scale)))
+    return np.ones((k, k), np.uint8)
+
+def clean_mask(mask, scale=1.0, buffers=None):
+    """
+    노이즈 제거를 위한 모폴로지 연산
+    buffers를 주면 mask_a ↔ mask_b 두 버퍼를 번갈아 dst로 사용 (입력 mask가 mask_b 버퍼면 안 됨)
+    """
+    plane = mask.shape[:2]
+    # 작은 노이즈 제거
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, scaled_kernel(3, scale), iterations=1,
+                            dst=scratch(buffers, 'mask_b', plane))
+    # 더 강한 구멍 메우기
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, scaled_kernel(7, scale), iterations=3,
+                            dst=scratch(buffers, 'mask_a', plane))
+    # 추가: 더 큰 커널로 한 번 더 정리
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, scaled_kernel(10, scale), iterations=1,
+                            dst=scratch(buffers, 'mask_b', plane))
+    return mask
+
+# ---------- 후보 점수 계산 ----------
+def score_contours(cnts, mask, img_w, img_h, scale=1.0, params=None):
+    """
+    윤곽선마다 포스트잇 점수 계산 → (best_bbox, best_score, candidates)
+    좌표는 검출에 쓴 이미지 기준, 면적 관련 기준(min_area, 이상적 크기)은 원본 기준(면적 / scale²)
+    """
+    params = params or DEFAULT_PARAMS
+    min_area, max_ar_diff = params['min_area'], params['max_ar_diff']
+    best, best_score = None, 0
+    candidates = []
+    pixel_scale = scale * scale
+    
+    for i, c in enumerate(cnts):
+        # 기본 바운딩 박스
+        x, y, cw, ch = cv2.boundingRect(c)
+        area = cw * ch
+        full_area = area / pixel_scale  # 원본 해상도 기준 면적
+        ar_diff = abs(cw - ch) / max(cw, ch) * 100
+        
+        # 윤곽선 approximation으로 사각형성 검사
+        epsilon = 0.02 * cv2.arcLength(c, True)
+        approx = cv2.approxPolyDP(c, epsilon, True)
+        rect_score = len(approx)  # 4에 가까울수록 사각형
+        
+        # 컨벡스 헐과의 비교로 모양 검사
+        hull = cv2.convexHull(c)
+        hull_area = cv2.contourArea(hull)
+        solidity = area / hull_area if hull_area > 0 else 0
+        
+        # 이미지 중앙에서의 거리 (포스트잇은 보통 중앙 근처에 있음)
+        center_x, center_y = x + cw//2, y + ch//2
+        center_dist = np.sqrt((center_x - img_w//2)**2 + (center_y - img_h//2)**2)
+        normalized_center_dist = center_dist / np.sqrt(img_w**2 + img_h**2)
+        
+        # 마스크에서 실제 채워진 비율
+        mask_roi = mask[y:y+ch, x:x+cw]
+        fill_ratio = cv2.countNonZero(mask_roi) / (cw * ch) if cw * ch > 0 else 0
+        
+        # 종합 점수 계산 (포스트잇 특징에 맞춰 가중치 조정)
+        score = 0
+        if full_area >= min_area:
+            # 1. 기본 면적 점수 (크기가 적당해야 함)
+            ideal_area = 50000  # 대략적인 포스트잇 이상적 크기
+            area_score = max(0, 100 - abs(full_area - ideal_area) / ideal_area * 50)
+            score += area_score
+            
+            # 2. 정사각형 점수 (가장 중요한 요소)
+            square_score = max(0, 80 - ar_diff * 2)  # 가중치 증가
+            score += square_score
+            
+            # 3. 사각형 모양 점수
+            rect_shape_score = min(40, (8 - abs(rect_score - 4)) * 10)  # 가중치 증가
+            score += rect_shape_score
+            
+            # 4. 채움 비율 점수 (매우 중요)
+            fill_score = fill_ratio * 60  # 가중치 증가
+            score += fill_score
+            
+            # 5. 볼록도 점수
+            solidity_score = solidity * 25
+            score += solidity_score
+            
+            # 6. 중앙 위치 보너스 (포스트잇은 보통 중앙 근처)
+            center_score = max(0, 15 - normalized_center_dist * 30)
+            score += center_score
+            
+            # 7. 크기 비율 보너스 (이미지 대비 적당한 크기)
+            img_area = img_w * img_h
+            size_ratio = area / img_area
+            if 0.02 < size_ratio < 0.3:  # 이미지의 2%~30% 크기가 적당
+                score += 20
+        
+        candidates.append({
+            'bbox': (x, y, cw, ch),
+            'area': int(full_area),
+            'ar_diff': ar_diff,
+            'rect_score': rect_score,
+            'solidity': solidity,
+            'center_dist': normalized_center_dist,
+            'fill_ratio': fill_ratio,
+            'total_score': score,
+            'valid': full_area >= min_area and ar_diff <= max_ar_diff
+        })
+        
+        if score > best_score:
+            best_score = score
+            best = (x, y, cw, ch)
+    
+    return best, best_score, candidates
+
+def best_contour(cnts, mask, img_w, img_h, scale=1.0, params=None):
+    """
+    score_contours와 같은 최고점 윤곽선을 빠르게 선택 → (best_bbox, best_score)
+    - boundingRect 면적으로 min_area 미만(점수 0, 선택될 수 없음)을 먼저 제외
+    - 면적/정사각형/중앙/크기 비율 점수는 NumPy 배열로 한 번에 계산
+    - 사각형 모양(최대 40점)과 채움 비율(최대 60점)은 상한을 더한 점수가 현재 최고점 이상인 후보만 계산
+    점수는 score_contours와 같은 순서로 더하므로 값과 동점 처리(앞 순서 우선)까지 동일
+    """
+    if not cnts:
+        return None, 0
+    pixel_scale = scale * scale
+    
+    rects = np.array([cv2.boundingRect(c) for c in cnts], dtype=np.int64).reshape(-1, 4)
+    xs, ys, ws, hs = rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3]
+    areas = ws * hs
+    full_areas = areas / pixel_scale
+    survivors = np.flatnonzero(full_areas >= (params or DEFAULT_PARAMS)['min_area'])
+    if survivors.size == 0:
+        return None, 0
+    
+    xs, ys, ws, hs = xs[survivors], ys[survivors], ws[survivors], hs[survivors]
+    areas, full_areas = areas[survivors], full_areas[survivors]
+    
+    ideal_area = 50000
+    area_scores = np.maximum(0, 100 - np.abs(full_areas - ideal_area) / ideal_area * 50)
+    ar_diffs = np.abs(ws - hs) / np.maximum(ws, hs) * 100
+    square_scores = np.maximum(0, 80 - ar_diffs * 2)
+    center_dists = np.sqrt((xs + ws // 2 - img_w // 2) ** 2 + (ys + hs // 2 - img_h // 2) ** 2)
+    center_scores = np.maximum(0, 15 - center_dists / np.sqrt(img_w**2 + img_h**2) * 30)
+    size_ratios = areas / (img_w * img_h)
+    size_bonus = (size_ratios > 0.02) & (size_ratios < 0.3)
+    
+    # 볼록도는 상한이 없으므로 모든 후보에 대해 계산 (min_area 이상인 소수만 남은 상태)
+    solidity_scores = []
+    for k, idx in enumerate(survivors):
+        hull_area = cv2.contourArea(cv2.convexHull(cnts[idx]))
+        solidity = int(areas[k]) / hull_area if hull_area > 0 else 0
+        solidity_scores.append(solidity * 25)
+    
+    # 점수 상한: 사각형 모양 40점 + 채움 비율 60점 (부동소수 오차 여유 포함)
+    upper = area_scores + square_scores + 40 + 60 + np.array(solidity_scores) + center_scores + size_bonus * 20 + 1e-6
+    
+    best, best_idx, best_score = None, None, 0
+    for k in sorted(range(len(survivors)), key=lambda k: -upper[k]):
+        if upper[k] < best_score:
+            break
+        idx = survivors[k]
+        c = cnts[idx]
+        x, y, cw, ch = (int(v) for v in rects[idx])
+        
+        epsilon = 0.02 * cv2.arcLength(c, True)
+        rect_score = len(cv2.approxPolyDP(c, epsilon, True))
+        fill_ratio = cv2.countNonZero(mask[y:y+ch, x:x+cw]) / (cw * ch)
+        
+        # score_contours와 같은 순서로 합산
+        score = 0
+        score += float(area_scores[k])
+        score += float(square_scores[k])
+        score += min(40, (8 - abs(rect_score - 4)) * 10)
+        score += fill_ratio * 60
+        score += solidity_scores[k]
+        score += float(center_scores[k])
+        if size_bonus[k]:
+            score += 20
+        
+        if score > best_score or (best_idx is not None and score == best_score and idx < best_idx):
+            best, best_idx, best_score = (x, y, cw, ch), idx, score
+    
+    return best, best_score
+
+# ---------- 피라미드(축소 → 원본) ----------
+def to_full_bbox(bbox, scale, full_w, full_h):
+    """축소 이미지 기준 bbox를 원본 해상도 좌표로 변환"""
+    x, y, cw, ch = bbox
+    x0 = max(0, int(x / scale))
+    y0 = max(0, int(y / scale))
+    x1 = min(full_w, int(np.ceil((x + cw) / scale)))
+    y1 = min(full_h, int(np.ceil((y + ch) / scale)))
+    return (x0, y0, x1 - x0, y1 - y0)
+
+def refine_box(bbox, scale, full_w, full_h):
+    """보정에 사용할 원본 해상도 ROI 범위 (x0, y0, x1, y1)"""
+    x, y, cw, ch = bbox
+    margin = int(np.ceil(2 / scale)) + max(cw, ch) // 20  # 축소로 생긴 오차 + 여유
+    return (max(0, x - margin), max(0, y - margin),
+            min(full_w, x + cw + margin), min(full_h, y + ch + margin))
+
+def refine_bbox(rgb_full, bbox, low, up, scale):
+    """
+    원본 해상도에서 bbox 주변(ROI)만 다시 마스크/윤곽선을 구해 경계를 정밀하게 맞춤
+    실패하면 원래 bbox 반환
+    """
+    full_h, full_w = rgb_full.shape[:2]
+    x0, y0, x1, y1 = refine_box(bbox, scale, full_w, full_h)
+    return refine_bbox_roi(rgb_full[y0:y1, x0:x1], (x0, y0), bbox, low, up)
+
+def refine_bbox_roi(roi_rgb, origin, bbox, low, up):
+    """refine_bbox의 본체: roi_rgb는 원본 해상도에서 origin=(x0, y0)부터 잘라낸 영역"""
+    x0, y0 = origin
+    cw, ch = bbox[2], bbox[3]
+    
+    roi_hsv = cv2.cvtColor(roi_rgb, cv2.COLOR_RGB2HSV)
+    roi_mask = cv2.inRange(roi_hsv, np.array(low, np.uint8), np.array(up, np.uint8))
+    roi_mask = clean_mask(roi_mask)
+    cnts, _ = cv2.findContours(roi_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not cnts:
+        return bbox
+    
+    rx, ry, rw, rh = cv2.boundingRect(max(cnts, key=cv2.contourArea))
+    # 잡음 조각만 잡힌 경우(원래 bbox의 절반 미만)는 보정하지 않음
+    if rw * rh < 0.5 * cw * ch:
+        return bbox
+    return (x0 + rx, y0 + ry, rw, rh)
+
+def prepare_postit_mask(rgb, pyramid, full_size=None, color_code=cv2.COLOR_RGB2HSV, buffers=None, params=None):
+    """
+    검출용 마스크와 윤곽선 준비 → (scale, img_w, img_h, low, mask, cnts)
+    pyramid: 긴 변을 PYRAMID_MAX_SIDE로 줄인 이미지에서 처리 (좌표/면적은 scale 기준)
+    full_size: rgb가 이미 축소 디코딩된 이미지일 때 원본 (가로, 세로) - scale은 항상 원본 기준
+    color_code: 입력 색 공간 (cv2.imdecode 결과는 BGR)
+    buffers: ScratchBuffers (HSV/마스크/모폴로지 결과를 재사용 버퍼에 씀)
+    """
+    full_w, full_h = full_size or (rgb.shape[1], rgb.shape[0])
+    
+    # 피라미드 모드: 마스크/윤곽선 처리를 긴 변 PYRAMID_MAX_SIDE px 이미지에서 수행
+    scale = 1.0
+    work = rgb
+    if pyramid and max(full_w, full_h) > PYRAMID_MAX_SIDE:
+        scale = PYRAMID_MAX_SIDE / max(full_w, full_h)
+        size = (max(1, round(full_w * scale)), max(1, round(full_h * scale)))
+        if (rgb.shape[1], rgb.shape[0]) != size:
+            work = cv2.resize(rgb, size, dst=scratch(buffers, 'work', (size[1], size[0], 3)),
+                              interpolation=cv2.INTER_AREA)
+    img_h, img_w = work.shape[:2]
+    hsv = cv2.cvtColor(work, color_code, dst=scratch(buffers, 'hsv', (img_h, img_w, 3)))
+
+    params = params or DEFAULT_PARAMS
+    low, mask = select_hsv_low(hsv, params['lower'], params['upper'], scale, buffers)
+    mask = clean_mask(mask, scale, buffers)
+
+    cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return scale, img_w, img_h, low, mask, cnts
+
+def locate_postit(pil_img: Image.Image, pyramid=None, refine=None, params=None):
+    """
+    포스트잇 위치만 계산 → (원본 좌표 bbox 또는 None, 최고점수)
+    검출 결과 캐시에는 잘라낸 이미지 대신 이 값을 저장
+    params: detection_params()로 만든 검출 설정 (pyramid/refine 인자가 있으면 그 값이 우선)
+    """
+    params = params or DEFAULT_PARAMS
+    pyramid = params['pyramid'] if pyramid is None else pyramid
+    refine = params['refine'] if refine is None else refine
+    
+    rgb = np.array(pil_img)
+    full_h, full_w = rgb.shape[:2]
+    scale, img_w, img_h, low, mask, cnts = prepare_postit_mask(rgb, pyramid, params=params)
+    
+    best, best_score = best_contour(cnts, mask, img_w, img_h, scale, params)
+    if best is None or best_score < params['min_score']:
+        return None, best_score
+    
+    if scale != 1.0:
+        # 축소 이미지 좌표 → 원본 좌표
+        best = to_full_bbox(best, scale, full_w, full_h)
+        if refine:
+            best = refine_bbox(rgb, best, low, params['upper'], scale)
+    return best, best_score
+
+# ---------- 인코딩된 바이트에서 바로 검출 ----------
+# JPEG는 디코딩 단계에서 1/2, 1/4, 1/8로 줄여 읽을 수 있음 (DCT 축소, 검출용 배열은 원본 크기로 만들지 않음)
+REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+def decode_factor(full_w, full_h, pyramid):
+    """긴 변이 PYRAMID_MAX_SIDE 아래로 내려가지 않는 가장 큰 축소 디코딩 배율 (1, 2, 4, 8)"""
+    if pyramid:
+        for factor, _ in REDUCED_DECODE_FLAGS:
+            if max(full_w, full_h) / factor >= PYRAMID_MAX_SIDE:
+                return factor
+    return 1
+
+def locate_postit_bytes(image_bytes: bytes, pyramid=None, refine=None, pil_img: Image.Image = None, params=None):
+    """
+    인코딩된 이미지 바이트에서 포스트잇 위치 계산 → (원본 좌표 bbox 또는 None, 최고점수)
+    locate_postit과 결과는 같지만 검출은 축소 디코딩한 배열 + 스레드별 재사용 버퍼로 처리
+    (경계 보정은 bbox 주변만 원본 해상도로 잘라 사용)
+    원본 해상도 디코딩: 포스트잇을 찾아 경계를 보정할 때 pil_img 전체를 한 번 디코딩함 (PIL의 crop은 부분 디코딩을 하지 않음)
+    호출한 쪽이 같은 pil_img에서 ROI를 잘라내면 그 결과를 재사용하므로 요청당 최대 한 번, 포스트잇이 없으면 하지 않음
+    """
+    params = params or DEFAULT_PARAMS
+    pyramid = params['pyramid'] if pyramid is None else pyramid
+    refine = params['refine'] if refine is None else refine
+    
+    if pil_img is None:
+        pil_img = Image.open(io.BytesIO(image_bytes))  # 헤더만 읽음 (픽셀은 필요할 때 디코딩)
+    full_w, full_h = pil_img.size
+    factor = decode_factor(full_w, full_h, pyramid)
+    flags = dict(REDUCED_DECODE_FLAGS).get(factor, cv2.IMREAD_COLOR)
+    # PIL과 같은 좌표계를 쓰도록 EXIF 회전은 적용하지 않음
+    bgr = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), flags | cv2.IMREAD_IGNORE_ORIENTATION)
+    if bgr is None:
+        raise ValueError('이미지를 디코딩할 수 없습니다')
+    
+    scale, img_w, img_h, low, mask, cnts = prepare_postit_mask(
+        bgr, pyramid, (full_w, full_h), cv2.COLOR_BGR2HSV, scratch_buffers, params
+    )
+    best, best_score = best_contour(cnts, mask, img_w, img_h, scale, params)
+    del bgr, mask
+    if best is None or best_score < params['min_score']:
+        return None, best_score
+    
+    if scale != 1.0:
+        # 축소 이미지 좌표 → 원본 좌표
+        best = to_full_bbox(best, scale, full_w, full_h)
+        if refine:
+            box = refine_box(best, scale, full_w, full_h)
+            roi_rgb = np.asarray(pil_img.crop(box).convert('RGB'))
+            best = refine_bbox_roi(roi_rgb, box[:2], best, low, params['upper'])
+    return best, best_score
+
+# ---------- 검출 결과 캐시 ----------
+def detection_cache_key(image_bytes: bytes, pyramid=None, refine=None, params=None):
+    """
+    검출 결과 캐시 키: 인코딩된 이미지 바이트의 blake2b 해시 + 검출 파라미터
+    (HSV 범위, min_area, max_ar_diff, min_score, 피라미드/보정 설정이 바뀌면 다른 키)
+    """
+    params = params or DEFAULT_PARAMS
+    pyramid = params['pyramid'] if pyramid is None else pyramid
+    refine = params['refine'] if refine is None else refine
+    key = (tuple(params['lower']), tuple(params['upper']), params['min_area'], params['max_ar_diff'],
+           params['min_score'], PYRAMID_MAX_SIDE if pyramid else None, bool(refine))
+    digest = hashlib.blake2b(image_bytes, digest_size=16)
+    digest.update(repr(key).encode())
+    return digest.hexdigest()
+
+class DetectionCache:
+    """검출 결과 (bbox, score)를 보관하는 LRU 캐시 (항목 수 제한)"""
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0
+            }
+
@@ -0,0 +1,224 @@
+"""
+읽기 API 응답(직렬화된 JSON) 캐시
+- 메모리 상한(max_bytes)을 넘으면 가장 오래 사용하지 않은 항목부터 제거 (LRU)
+- 항목마다 TTL
+- 의존성 키로 명시적 무효화
+    "challenge:42"  : 42번 도전과제
+    "tag:운동"      : '운동' 태그
+    "user:a@b.com"  : 해당 사용자
+    "tag:*"         : 모든 태그 (무효화할 때는 tag:로 시작하는 키 전부,
+                      등록할 때는 tag:로 시작하는 어떤 키가 무효화되어도 함께 무효화)
+- 백엔드 교체 가능: 기본은 프로세스 메모리, 여러 워커를 띄울 때는 RedisCacheBackend
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+def split_dependency(dep):
+    """'tag:운동' -> ('tag', '운동')"""
+    namespace, _, name = dep.partition(':')
+    return namespace, name
+
+
+class CacheBackend:
+    """캐시 백엔드 인터페이스"""
+
+    def begin(self):
+        """
+        결과 계산을 시작하기 전에 호출. 반환값을 set()에 넘기면
+        계산 도중 관련 의존성이 무효화된 경우 오래된 결과를 저장하지 않습니다.
+        """
+        return None
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, deps, ttl, token=None):
+        raise NotImplementedError
+
+    def invalidate(self, *deps):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, max_bytes=32 * 1024 * 1024, max_entry_bytes=None):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes or max_bytes // 8
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, expires_at, deps)
+        self._dep_index = {}           # dep -> set(key)
+        self._bytes = 0
+
+        # 계산 도중 무효화 감지용 순번
+        self._seq = 0
+        self._namespace_seq = {}  # namespace -> 마지막으로 무효화된 순번
+        self._clear_seq = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+        self._invalidated = 0
+        self._skipped = 0
+
+    def _remove(self, key):
+        value, _, deps = self._entries.pop(key)
+        self._bytes -= len(value)
+        for dep in deps:
+            keys = self._dep_index.get(dep)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._dep_index[dep]
+
+    def begin(self):
+        with self._lock:
+            return self._seq
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            if entry[1] <= now:
+                self._remove(key)
+                self._expired += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def _is_stale(self, deps, token):
+        if token is None:
+            return False
+        if self._clear_seq > token:
+            return True
+        for dep in deps:
+            namespace, _ = split_dependency(dep)
+            if self._namespace_seq.get(namespace, 0) > token:
+                return True
+        return False
+
+    def set(self, key, value, deps, ttl, token=None):
+        size = len(value)
+        with self._lock:
+            if size > self.max_entry_bytes or self._is_stale(deps, token):
+                self._skipped += 1
+                return False
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl, tuple(deps))
+            self._bytes += size
+            for dep in deps:
+                self._dep_index.setdefault(dep, set()).add(key)
+            while self._bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+            return True
+
+    def invalidate(self, *deps):
+        removed = 0
+        with self._lock:
+            self._seq += 1
+            for dep in deps:
+                namespace, name = split_dependency(dep)
+                self._namespace_seq[namespace] = self._seq
+
+                if name == '*':
+                    targets = [d for d in self._dep_index if split_dependency(d)[0] == namespace]
+                else:
+                    targets = [dep, f"{namespace}:*"]
+
+                for target in targets:
+                    for key in list(self._dep_index.get(target, ())):
+                        if key in self._entries:
+                            self._remove(key)
+                            removed += 1
+            self._invalidated += removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._seq += 1
+            self._clear_seq = self._seq
+            self._invalidated += len(self._entries)
+            self._entries.clear()
+            self._dep_index.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'backend': 'memory',
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'expired': self._expired,
+                'invalidated': self._invalidated,
+                'skipped': self._skipped
+            }
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    여러 서버 워커가 공유하는 Redis 백엔드 (pip install redis 필요)
+    값은 SETEX로, 의존성은 dep별 SET에 키를 모아 두고 무효화 시 함께 삭제합니다.
+    메모리 상한/LRU는 Redis의 maxmemory-policy(allkeys-lru)로 설정하세요.
+    """
+
+    def __init__(self, url, prefix='qc:'):
+        import redis  # 선택 의존성
+        self._redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self._redis.get(self.prefix + key)
+
+    def set(self, key, value, deps, ttl, token=None):
+        pipe = self._redis.pipeline()
+        pipe.setex(self.prefix + key, int(max(ttl, 1)), value)
+        for dep in deps:
+            pipe.sadd(f"{self.prefix}dep:{dep}", key)
+            pipe.expire(f"{self.prefix}dep:{dep}", int(max(ttl, 1)))
+        pipe.execute()
+        return True
+
+    def invalidate(self, *deps):
+        dep_keys = set()
+        for dep in deps:
+            namespace, name = split_dependency(dep)
+            if name == '*':
+                dep_keys.update(self._redis.scan_iter(match=f"{self.prefix}dep:{namespace}:*"))
+            else:
+                dep_keys.add(f"{self.prefix}dep:{dep}")
+                dep_keys.add(f"{self.prefix}dep:{namespace}:*")
+        removed = 0
+        for dep_key in dep_keys:
+            members = self._redis.smembers(dep_key)
+            if members:
+                removed += self._redis.delete(*[self.prefix + m.decode('utf-8') for m in members])
+            self._redis.delete(dep_key)
+        return removed
+
+    def clear(self):
+        keys = list(self._redis.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self._redis.delete(*keys)
+
+    def stats(self):
+        return {'backend': 'redis'}
@@ -0,0 +1,56 @@
+"""
+리소스 묶음(family)별 데이터 버전 카운터
+쓰기 API가 bump()로 버전을 올리고, 읽기 API는 현재 버전으로 ETag를 만들어
+클라이언트가 가진 데이터가 최신이면 DB를 조회하지 않고 304를 돌려줍니다.
+
+family 예시
+- 'challenges'        : 도전과제 목록
+- 'tags'              : 태그 목록
+- 'submissions:42'    : 42번 도전과제의 제출물 목록
+
+버전은 프로세스 메모리에만 있으므로 서버가 재시작되면 0부터 다시 시작합니다.
+재시작 전 ETag와 겹치지 않도록 프로세스마다 다른 epoch 값을 ETag에 섞습니다.
+"""
+import hashlib
+import threading
+import uuid
+
+
+class ResourceVersions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._generation = 0  # bump_all()로 모든 family를 한 번에 무효화
+        self.epoch = uuid.uuid4().hex[:12]
+
+    def get(self, family):
+        with self._lock:
+            return self._versions.get(family, 0)
+
+    def bump(self, *families):
+        with self._lock:
+            for family in families:
+                self._versions[family] = self._versions.get(family, 0) + 1
+
+    def bump_all(self):
+        with self._lock:
+            self._generation += 1
+
+    def etag(self, families, variant=''):
+        """
+        families의 현재 버전과 요청 변형(쿼리스트링 등)으로 강한 ETag 값을 생성 (따옴표 제외)
+        """
+        with self._lock:
+            parts = [self.epoch, str(self._generation)]
+            parts += [f"{family}={self._versions.get(family, 0)}" for family in families]
+        parts.append(variant)
+        digest = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:20]
+        return f"v-{digest}"
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'epoch': self.epoch,
+                'generation': self._generation,
+                'families': len(self._versions)
+            }
@@ -11,98 +11,263 @@ request : 함수(엔드포인트)가 필요로 하는 입력값
 response_error : 제대로 실행되지 않았을때 반환하는 json 형태
 response_success : 제대로 실행되었을때 반환하는 json 형태
 """
-from flask import Flask, request, jsonify, send_from_directory
+import os
+
+# SERVER_MODE=gevent: 롱폴링으로 대기 중인 요청을 OS 스레드 대신 greenlet으로 처리
+# (threading, socket 등을 바꿔치기하므로 다른 모듈을 import 하기 전에 패치해야 함)
+SERVER_MODE = os.getenv('SERVER_MODE', 'threaded')
+if SERVER_MODE == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, request, jsonify, send_from_directory, g, has_request_context, make_response
+from werkzeug.security import safe_join
 from flask_cors import CORS
 import pymysql
 from pymysql import Error
 import bcrypt
 import jwt
 import datetime
+import time
 from functools import wraps
 import os
-from werkzeug.utils import secure_filename
 import base64
 import io
 from PIL import Image
 import threading  # threading 모듈 추가
-from app_umai import find_postit  # 기존 함수 그대로 사용
+from contextlib import contextmanager
+from postit_detection import locate_postit_bytes, detection_cache_key  # app_umai.py, utils/imageProcessServer.py와 공용 검출 로직
+from db_pool import ConnectionPool, PoolTimeout
+from notification_store import NotificationStore
+from notification_outbox import NotificationOutbox
+from fanout import FanoutExecutor
+from ttl_cache import TTLCache
+from memory_probe import MemoryProbe
+from hydration import attach_tags
+from pagination import InvalidCursor, encode_cursor, keyset_condition, parse_limit
+from counters import (add_submission_count, add_tag_challenge_counts, release_challenge_tag_counts,
+                      release_user_counts, ensure_reconciler)
+from resource_versions import ResourceVersions
+from query_cache import MemoryCacheBackend, RedisCacheBackend
+from photo_store import PhotoStore, is_content_addressed
+from image_derivatives import DerivativeGenerator
+from tag_index import tag_index, upsert_challenge_tags
+from interest_index import interest_index
 
 
 # 메모리 기반 알림 저장소
-notification_store = {}
-# 구조: {'user_email@example.com': [notification1, notification2, ...]}
+# 사용자별 최대 NOTIFY_CAPACITY개, NOTIFY_TTL초가 지나면 자동 삭제
+notification_store = NotificationStore(
+    shards=16,
+    capacity=int(os.getenv('NOTIFY_CAPACITY', '100')),
+    ttl=float(os.getenv('NOTIFY_TTL', str(7 * 24 * 3600))),
+    sweep_interval=float(os.getenv('NOTIFY_SWEEP_INTERVAL', '60'))
+)
+notification_store.start_sweeper()
+
+# NOTIFY_OUTBOX=mysql 이면 알림을 notification_outbox 테이블에 저장 (재시작/다중 워커에도 유지)
+# 메모리 저장소와 같은 인터페이스(add, drain, wait_for, stats)를 사용합니다
+if os.getenv('NOTIFY_OUTBOX', '') == 'mysql':
+    notification_backend = NotificationOutbox(
+        lambda: db_connection(),
+        batch_size=int(os.getenv('NOTIFY_OUTBOX_BATCH', '200')),
+        ttl=float(os.getenv('NOTIFY_TTL', str(7 * 24 * 3600))),
+        delivered_retention=float(os.getenv('NOTIFY_OUTBOX_DELIVERED_RETENTION', '3600'))
+    )
+    notification_backend.start()
+else:
+    notification_backend = notification_store
+
+# 롱폴링 설정
+# SERVER_MODE=gevent 로 실행하면 대기 중인 요청은 greenlet이라 OS 스레드를 점유하지 않습니다.
+# 기본(스레드) 모드에서는 대기 요청마다 스레드 하나를 쓰므로, 의도적으로 최대 NOTIFY_MAX_WAITERS개까지만
+# 대기시키고 나머지는 기다리지 않고 바로 응답합니다 (응답의 waited=false, 클라이언트는 잠시 후 다시 요청).
+NOTIFY_MAX_WAIT = float(os.getenv('NOTIFY_MAX_WAIT', '30'))
+NOTIFY_MAX_WAITERS = int(os.getenv('NOTIFY_MAX_WAITERS', '10000' if SERVER_MODE == 'gevent' else '64'))
+notify_waiter_slots = threading.BoundedSemaphore(NOTIFY_MAX_WAITERS)
 
 def add_notification(user_email, notification_data):
     """
     특정 사용자에게 알림 추가
     """
-    if user_email not in notification_store:
-        notification_store[user_email] = []
-    
-    notification_store[user_email].append(notification_data)
+    notification_backend.add(user_email, notification_data)
     print(f"📢 알림 추가: {user_email} -> {notification_data}")
 
+def publish_notifications(groups):
+    """
+    [(user_emails, notification_data), ...]를 한 번에 추가 (알림 내용은 한 번만 저장하고 수신자별로는 참조만 보관)
+    outbox 사용 시 한 트랜잭션으로 저장되므로, 실패해 fan-out 작업이 재시도되어도 일부 알림만 두 번 가지 않음
+    """
+    groups = [(list(user_emails), data) for user_emails, data in groups if user_emails]
+    if groups:
+        notification_backend.publish_many(groups)
+        print(f"📢 알림 추가: {len(groups)}종, {sum(len(emails) for emails, _ in groups)}명")
+
 def get_and_clear_notifications(user_email):
     """
     사용자의 알림을 가져오고 메모리에서 삭제
     """
-    notifications = notification_store.get(user_email, [])
-    if user_email in notification_store:
-        del notification_store[user_email]
+    notifications = notification_backend.drain(user_email)
+    if notifications:
         print(f"🗑️  알림 전송 후 삭제: {user_email} ({len(notifications)}개)")
     return notifications
 
-def notify_users_for_tag_challenge(challenge_id, challenge_title, tag_ids):
+def notify_users_for_tag_challenges(jobs):
     """
     태그에 관심 있는 사용자들에게 새로운 도전과제 알림을 보내는 함수
-    백그라운드 스레드에서 실행됩니다.
+    알림 fan-out 워커에서 실행되며, 비슷한 시점에 생성된 여러 도전과제(jobs)를 한 번에 처리합니다.
+    jobs: [{'challenge_id': int, 'challenge_title': str, 'tag_ids': [int, ...]}, ...]
     """
-    try:
-        print(f"🔔 태그 알림 처리 시작: 도전과제 ID={challenge_id}, 태그 IDs={tag_ids}")
-        
-        connection = get_db_connection()
+    all_tag_ids = list(dict.fromkeys(tag_id for job in jobs for tag_id in job['tag_ids']))
+    print(f"🔔 태그 알림 처리 시작: 도전과제 {len(jobs)}개, 태그 IDs={all_tag_ids}")
+    if not all_tag_ids:
+        return
+    
+    # 관심 사용자는 메모리 역색인(interest_index)에서 바로 찾음 - DB JOIN 없음
+    interest_index.ensure_loaded(db_connection)
+    if not interest_index.loaded:
+        raise RuntimeError("관심 태그 색인을 불러오지 못했습니다")
+    
+    tag_names = {tag_id: tag_index.get_name(tag_id) for tag_id in all_tag_ids}
+    unknown_ids = [tag_id for tag_id, name in tag_names.items() if name is None]
+    if unknown_ids:
+        # 태그 캐시에 아직 없는 태그(다른 워커에서 생성 등)만 이름 조회
+        with db_connection() as connection:
+            if connection is None:
+                raise RuntimeError("알림 처리 중 데이터베이스 연결 실패")
+            cursor = connection.cursor()
+            cursor.execute(
+                f"SELECT id, name FROM tags WHERE id IN ({', '.join(['%s'] * len(unknown_ids))})",
+                unknown_ids
+            )
+            for row in cursor.fetchall():
+                tag_names[row['id']] = row['name']
+                tag_index.add(row['name'], row['id'])
+            cursor.close()
+    
+    groups = []
+    for job in jobs:
+        # 한 도전과제에 관심 태그가 여러 개 걸린 사용자도 알림은 한 번만 (태그별 사용자 집합의 합집합)
+        recipients = interest_index.recipients(job['tag_ids'])
+        print(f"📋 도전과제 ID={job['challenge_id']}: 관심 있는 사용자 {len(recipients)}명")
+        
+        # 알림 문구가 같은 사용자(같은 태그로 일치)끼리 묶어 알림 내용을 공유
+        emails_by_tag = {}
+        for user in recipients.values():
+            emails_by_tag.setdefault(user['tag_id'], []).append(user['email'])
+        
+        created_at = datetime.datetime.now().isoformat()
+        for tag_id, emails in emails_by_tag.items():
+            notification_data = {
+                'type': 'new_challenge',
+                'title': f'새로운 도전과제: {job["challenge_title"]}',
+                'message': f'관심 태그 "{tag_names.get(tag_id)}"의 새로운 도전과제가 등록되었습니다!',
+                'challenge_id': job['challenge_id'],
+                'created_at': created_at
+            }
+            groups.append((emails, notification_data))
+    
+    # 배치의 모든 알림을 한 번에 저장
+    publish_notifications(groups)
+    for job in jobs:
+        print(f"🎉 태그 알림 처리 완료: 도전과제 ID={job['challenge_id']}")
+
+# 알림 fan-out 실행기 (고정 워커 + 제한된 큐)
+tag_notification_executor = FanoutExecutor(
+    notify_users_for_tag_challenges,
+    name='tag-notify',
+    workers=int(os.getenv('FANOUT_WORKERS', '2')),
+    queue_size=int(os.getenv('FANOUT_QUEUE_SIZE', '1000')),
+    batch_window=float(os.getenv('FANOUT_BATCH_WINDOW', '0.2')),
+    max_batch=int(os.getenv('FANOUT_MAX_BATCH', '50')),
+    retries=int(os.getenv('FANOUT_RETRIES', '3'))
+)
+tag_notification_executor.start()
+
+def notify_submission_participants(jobs):
+    """
+    인증 사진 제출 후(커밋 이후) 도전과제 생성자와 기존 참여자들에게 알림을 보내는 함수
+    알림 fan-out 워커에서 실행되며, 여러 제출(jobs)의 참여자를 한 번의 쿼리로 조회합니다.
+    jobs: [{'submission_id', 'challenge_id', 'challenge_title', 'creator',
+            'submitter_email', 'submitter_name', 'photo_path', 'comment', 'timestamp'}, ...]
+    """
+    challenge_ids = list(dict.fromkeys(job['challenge_id'] for job in jobs))
+    
+    # 알림을 보내기 전에 조회를 먼저 끝냄 (조회 실패로 재시도해도 알림이 중복되지 않도록)
+    with db_connection() as connection:
         if connection is None:
-            print("❌ 알림 처리 중 데이터베이스 연결 실패")
-            return
-            
+            raise RuntimeError("알림 처리 중 데이터베이스 연결 실패")
         cursor = connection.cursor()
-        
-        # 해당 태그들에 관심 있는 사용자들 조회
-        if tag_ids:
-            tag_ids_str = ', '.join(['%s'] * len(tag_ids))
-            query = f"""
-            SELECT DISTINCT u.email, u.name, t.name as tag_name
-            FROM users u
-            JOIN user_interests ui ON u.id = ui.user_id
-            JOIN tags t ON ui.tag_id = t.id
-            WHERE ui.tag_id IN ({tag_ids_str})
-            """
-            cursor.execute(query, tag_ids)
-            interested_users = cursor.fetchall()
-            
-            print(f"📋 관심 있는 사용자 {len(interested_users)}명 발견")
-            
-            # 각 사용자에게 알림 추가
-            for user in interested_users:
-                notification_data = {
-                    'type': 'new_challenge',
-                    'title': f'새로운 도전과제: {challenge_title}',
-                    'message': f'관심 태그 "{user["tag_name"]}"의 새로운 도전과제가 등록되었습니다!',
-                    'challenge_id': challenge_id,
-                    'created_at': datetime.datetime.now().isoformat()
-                }
-                add_notification(user['email'], notification_data)
-                print(f"✅ 알림 전송: {user['email']} ({user['name']})")
-        
+        cursor.execute(f"""
+            SELECT challenge_id, user_email, MIN(id) as first_submission_id
+            FROM challenge_submissions
+            WHERE challenge_id IN ({', '.join(['%s'] * len(challenge_ids))})
+            GROUP BY challenge_id, user_email
+        """, challenge_ids)
+        participants_by_challenge = {}
+        for row in cursor.fetchall():
+            participants_by_challenge.setdefault(row['challenge_id'], []).append(row)
         cursor.close()
-        connection.close()
-        print(f"🎉 태그 알림 처리 완료: 도전과제 ID={challenge_id}")
+    
+    groups = []
+    for job in jobs:
+        # 1. 도전과제 생성자에게 알림 (본인이 아닌 경우)
+        if job['creator'] != job['submitter_email']:
+            creator_notification = {
+                'type': 'new_submission',
+                'title': '새로운 인증 사진!',
+                'message': f'{job["submitter_name"]}님이 "{job["challenge_title"]}" 도전과제에 인증 사진을 올렸습니다.',
+                'challenge_id': job['challenge_id'],
+                'challenge_title': job['challenge_title'],
+                'submitter_name': job['submitter_name'],
+                'submitter_email': job['submitter_email'],
+                'photo_path': job['photo_path'],
+                'comment': job['comment'],
+                'timestamp': job['timestamp']
+            }
+            groups.append(([job['creator']], creator_notification))
         
-    except Exception as e:
-        print(f"❌ 태그 알림 처리 오류: {e}")
+        # 2. 이 제출 이전에 참여한 다른 사람들에게도 알림
+        recipients = [
+            participant for participant in participants_by_challenge.get(job['challenge_id'], [])
+            if participant['user_email'] != job['submitter_email'] and participant['first_submission_id'] < job['submission_id']
+        ]
+        
+        if recipients:
+            # 모든 참여자가 같은 알림 내용을 공유
+            participant_notification = {
+                'type': 'peer_submission',
+                'title': '동료의 새 인증!',
+                'message': f'{job["submitter_name"]}님이 "{job["challenge_title"]}" 도전과제에 새로운 인증을 올렸습니다.',
+                'challenge_id': job['challenge_id'],
+                'challenge_title': job['challenge_title'],
+                'submitter_name': job['submitter_name'],
+                'submitter_email': job['submitter_email'],
+                'photo_path': job['photo_path'],
+                'comment': job['comment'],
+                'timestamp': job['timestamp']
+            }
+            groups.append(([participant['user_email'] for participant in recipients], participant_notification))
+        print(f"📋 제출 ID={job['submission_id']}: 알릴 참여자 {len(recipients)}명")
+    
+    # 배치의 모든 알림을 한 번에 저장
+    publish_notifications(groups)
+    print(f"🎉 제출 알림 처리 완료: 제출 {len(jobs)}개")
+
+# 제출 알림 fan-out 실행기 (태그 알림과 같은 설정 사용)
+submission_notification_executor = FanoutExecutor(
+    notify_submission_participants,
+    name='submission-notify',
+    workers=int(os.getenv('FANOUT_WORKERS', '2')),
+    queue_size=int(os.getenv('FANOUT_QUEUE_SIZE', '1000')),
+    batch_window=float(os.getenv('FANOUT_BATCH_WINDOW', '0.2')),
+    max_batch=int(os.getenv('FANOUT_MAX_BATCH', '50')),
+    retries=int(os.getenv('FANOUT_RETRIES', '3'))
+)
+submission_notification_executor.start()
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Postit-Bbox', 'X-Peak-RSS', 'X-Peak-RSS-Growth', 'X-Peak-Overlapped', 'X-Peak-Traced'])  # 웹 클라이언트가 검출 응답 헤더를 읽을 수 있도록
 
 # 환경변수에서 설정값 가져오기
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', '**v61r+m=g%#D]H6k*|Xf59ym=j#TlAZ)=Hx?.c3{z+bIqAG36j..cTMAO5+VHXv')
@@ -115,6 +280,33 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD')  # 환경변수에서 가져옴 (필수)
 }
 
+# 커넥션 풀 설정 (요청마다 새로 연결하지 않고 재사용)
+DB_POOL_CONFIG = {
+    'max_size': int(os.getenv('DB_POOL_SIZE', '10')),
+    'acquire_timeout': float(os.getenv('DB_POOL_TIMEOUT', '5')),
+    'ping_interval': float(os.getenv('DB_POOL_PING_INTERVAL', '30')),
+    'recycle': float(os.getenv('DB_POOL_RECYCLE', '3600'))
+}
+
+db_pool = ConnectionPool(
+    {
+        'host': DB_CONFIG['host'],
+        'user': DB_CONFIG['user'],
+        'password': DB_CONFIG['password'],
+        'database': DB_CONFIG['database'],
+        'charset': 'utf8mb4',
+        'cursorclass': pymysql.cursors.DictCursor,
+        'autocommit': False
+    },
+    **DB_POOL_CONFIG
+)
+
+# 집계 카운터 재계산 주기 (초)
+COUNTER_RECONCILE_INTERVAL = float(os.getenv('COUNTER_RECONCILE_INTERVAL', '3600'))
+
+# 관심 태그 색인을 DB와 비교/보정하는 주기 (초)
+INTEREST_INDEX_VERIFY_INTERVAL = float(os.getenv('INTEREST_INDEX_VERIFY_INTERVAL', '600'))
+
 # 사진 업로드 설정
 UPLOAD_FOLDER = 'photos'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
@@ -126,7 +318,54 @@ if not os.path.exists(UPLOAD_FOLDER):
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# 사진 응답 캐시 설정
+# 내용 주소 기반 파일은 내용이 바뀌지 않으므로 1년, 이전 방식 파일은 PHOTO_CACHE_MAX_AGE초
+PHOTO_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+PHOTO_CACHE_MAX_AGE = int(os.getenv('PHOTO_CACHE_MAX_AGE', '86400'))
+
+# 앞단 프록시가 파일을 직접 보내도록 위임 ('' | 'x-sendfile' | 'x-accel')
+PHOTO_SENDFILE = os.getenv('PHOTO_SENDFILE', '')
+PHOTO_ACCEL_PREFIX = os.getenv('PHOTO_ACCEL_PREFIX', '/protected-photos/')
+app.config['USE_X_SENDFILE'] = PHOTO_SENDFILE == 'x-sendfile'
+
+# 업로드 사진은 photos/ab/cd/<sha256>.<확장자> 에 저장 (이전 업로드는 photos/ 바로 아래에 그대로 있음)
+photo_store = PhotoStore(UPLOAD_FOLDER)
+
+# 목록/피드용 축소본(160/480/1080px, JPEG/WebP) 생성기
+photo_derivatives = DerivativeGenerator(
+    UPLOAD_FOLDER,
+    workers=int(os.getenv('PHOTO_DERIVATIVE_WORKERS', '2')),
+    queue_size=int(os.getenv('PHOTO_DERIVATIVE_QUEUE_SIZE', '200'))
+)
+photo_derivatives.start()
+
+# 인증된 사용자 정보 캐시 (token_required가 매 요청마다 users 테이블을 조회하지 않도록)
+# 키: (user_id, token), 값: current_user 딕셔너리
+identity_cache = TTLCache(
+    maxsize=int(os.getenv('USER_CACHE_SIZE', '4096')),
+    ttl=float(os.getenv('USER_CACHE_TTL', '60'))
+)
+
+def invalidate_user_identity(user_id):
+    """
+    사용자 정보가 바뀌었을 때(삭제, 관리자 권한 변경 등) 해당 사용자의 캐시를 모두 제거
+    """
+    removed = identity_cache.delete_where(lambda key: key[0] == user_id)
+    if removed:
+        print(f"🧹 사용자 캐시 삭제: user_id={user_id} ({removed}개)")
+
+# 포스트잇 검출 결과 캐시 (재시도/미리보기 후 제출처럼 같은 사진이 다시 올라오면 검출을 건너뜀)
+# 키: 이미지 바이트 해시 + 검출 파라미터, 값: (원본 좌표 bbox 또는 None, 점수)
+detection_cache = TTLCache(
+    maxsize=int(os.getenv('DETECTION_CACHE_SIZE', '1024')),
+    ttl=float(os.getenv('DETECTION_CACHE_TTL', '3600'))
+)
+
+# 검출 요청별 최대 메모리 측정 (요청 동안 현재 RSS 샘플링, DETECTION_TRACE_MEMORY=1이면 tracemalloc으로 Python/NumPy 할당량도 측정)
+detection_memory = MemoryProbe(trace=os.getenv('DETECTION_TRACE_MEMORY', '0') == '1')
+
 # 데이터베이스 연결 함수
+# 풀에서 연결을 빌려옴. connection.close()를 호출하면 풀에 반납됩니다.
 def get_db_connection():
     try:
         # DB_PASSWORD 환경변수 체크
@@ -137,20 +376,32 @@ def get_db_connection():
             print("Linux/Mac: export DB_PASSWORD=your_mysql_password")
             return None
             
-        connection = pymysql.connect(
-            host=DB_CONFIG['host'],
-            user=DB_CONFIG['user'],
-            password=DB_CONFIG['password'],
-            database=DB_CONFIG['database'],
-            charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor,
-            autocommit=False
-        )
+        connection = db_pool.acquire()
+        
+        # 요청 처리 중 빌린 연결은 기록해 두었다가 요청이 끝나면 반드시 반납
+        if has_request_context():
+            g.setdefault('db_connections', []).append(connection)
         return connection
+    except PoolTimeout as e:
+        print(f"데이터베이스 연결 대기 시간 초과: {e}")
+        return None
     except Error as e:
         print(f"데이터베이스 연결 오류: {e}")
         return None
 
+@contextmanager
+def db_connection():
+    """
+    with db_connection() as connection: 블록 단위로 연결을 빌리고 자동 반납
+    연결에 실패하면 connection은 None
+    """
+    connection = get_db_connection()
+    try:
+        yield connection
+    finally:
+        if connection is not None:
+            connection.close()
+
 # JWT 토큰 검증 데코레이터 (수정됨)
 def token_required(f):
     @wraps(f)
@@ -165,26 +416,34 @@ def token_required(f):
                 token = token[7:]
             data = jwt.decode(token, app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
             
-            # 사용자 정보 가져오기
-            connection = get_db_connection()
-            if connection is None:
-                return jsonify({'error': '데이터베이스 연결 실패'}), 500
-                
-            cursor = connection.cursor()
-            cursor.execute("SELECT * FROM users WHERE id = %s", (data['user_id'],))
-            user = cursor.fetchone()
-            cursor.close()
-            connection.close()
+            # 캐시에 있으면 DB 조회 생략 (토큰 만료 검사는 위 decode에서 매번 수행)
+            cache_key = (data['user_id'], token)
+            current_user = identity_cache.get(cache_key)
             
-            if not user:
-                return jsonify({'error': '사용자를 찾을 수 없습니다'}), 401
+            if current_user is None:
+                # 사용자 정보 가져오기
+                with db_connection() as connection:
+                    if connection is None:
+                        return jsonify({'error': '데이터베이스 연결 실패'}), 500
+                        
+                    cursor = connection.cursor()
+                    cursor.execute("SELECT id, email, name, isAdmin FROM users WHERE id = %s", (data['user_id'],))
+                    user = cursor.fetchone()
+                    cursor.close()
                 
-            current_user = {
-                'id': user['id'],
-                'email': user['email'],
-                'name': user['name'],
-                'isAdmin': user['isAdmin']  # isAdmin 필드 추가
-            }
+                if not user:
+                    return jsonify({'error': '사용자를 찾을 수 없습니다'}), 401
+                    
+                current_user = {
+                    'id': user['id'],
+                    'email': user['email'],
+                    'name': user['name'],
+                    'isAdmin': user['isAdmin']  # isAdmin 필드 추가
+                }
+                identity_cache.set(cache_key, current_user)
+            
+            # 핸들러가 수정해도 캐시가 오염되지 않도록 복사본 전달
+            current_user = dict(current_user)
             
         except jwt.ExpiredSignatureError:
             return jsonify({'error': '토큰이 만료되었습니다'}), 401
@@ -195,6 +454,103 @@ def token_required(f):
     
     return decorated
 
+# 리소스별 데이터 버전 (쓰기 API가 올리고, 읽기 API는 ETag로 사용)
+resource_versions = ResourceVersions()
+
+# 도전과제 목록은 is_expired/days_left가 시간에 따라 바뀌므로 ETag를 이 주기(초)마다 갱신
+CHALLENGE_ETAG_WINDOW = int(os.getenv('CHALLENGE_ETAG_WINDOW', '60'))
+
+def versioned_get(*families, time_window=None):
+    """
+    ETag / If-None-Match 지원 데코레이터
+    families: family 문자열 또는 URL 인자(kwargs)를 받아 family 문자열을 돌려주는 함수
+    클라이언트의 ETag가 현재 버전과 같으면 핸들러(DB 조회)를 실행하지 않고 304 반환
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            names = [family(kwargs) if callable(family) else family for family in families]
+            variant = request.full_path
+            if time_window:
+                variant += f"|t={int(time.time() // time_window)}"
+            etag = resource_versions.etag(names, variant)
+            
+            if request.if_none_match.contains_weak(etag):
+                response = app.response_class(status=304)
+                response.set_etag(etag)
+                return response
+            
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'no-cache'
+            return response
+        
+        return decorated
+    return decorator
+
+# 읽기 API 응답 캐시
+# 여러 워커를 띄울 때는 QUERY_CACHE_BACKEND=redis, QUERY_CACHE_REDIS_URL=redis://... 로 공유 캐시 사용
+QUERY_CACHE_TTL = float(os.getenv('QUERY_CACHE_TTL', '300'))
+
+if os.getenv('QUERY_CACHE_BACKEND', 'memory') == 'redis':
+    query_cache = RedisCacheBackend(os.getenv('QUERY_CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+else:
+    query_cache = MemoryCacheBackend(max_bytes=int(os.getenv('QUERY_CACHE_MAX_BYTES', str(32 * 1024 * 1024))))
+
+def cached_response(*deps, ttl=None):
+    """
+    읽기 API 응답 캐시 데코레이터 (200 응답만 저장)
+    deps: 의존성 키 문자열 또는 URL 인자(kwargs)를 받아 의존성 키를 돌려주는 함수
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            key = request.full_path
+            cached = query_cache.get(key)
+            if cached is not None:
+                response = app.response_class(cached, status=200, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+            
+            token = query_cache.begin()
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                names = [dep(kwargs) if callable(dep) else dep for dep in deps]
+                query_cache.set(key, response.get_data(), names, ttl or QUERY_CACHE_TTL, token)
+                response.headers['X-Cache'] = 'MISS'
+            return response
+        
+        return decorated
+    return decorator
+
+def invalidate_cached(*deps):
+    """쓰기 API에서 커밋 후 호출: 관련 캐시 항목 삭제"""
+    try:
+        query_cache.invalidate(*deps)
+    except Exception as e:
+        print(f"❌ 캐시 무효화 오류: {e}")
+
+def counters_corrected(fixed):
+    """카운터 재계산으로 값이 바뀌면 보정된 수치가 바로 보이도록 목록 ETag와 응답 캐시 무효화"""
+    families, deps = [], []
+    if fixed['challenges']:
+        families.append('challenges')
+        deps.append('challenge:*')
+    if fixed['tags']:
+        families.append('tags')
+        deps.append('tag:*')
+    resource_versions.bump(*families)
+    invalidate_cached(*deps)
+
+# 집계 카운터 재계산 작업 (시작 시 1회 + COUNTER_RECONCILE_INTERVAL초마다, 프로세스당 하나)
+# __main__이 아니라 모듈 로드 시 시작해야 gunicorn 등 WSGI 서버로 실행해도 동작
+ensure_reconciler(db_connection, COUNTER_RECONCILE_INTERVAL, on_fixed=counters_corrected)
+
+# 관심 태그 색인 로드 + INTEREST_INDEX_VERIFY_INTERVAL초마다 DB와 비교 (다른 워커의 변경 반영, 프로세스당 하나)
+interest_index.ensure_loaded(db_connection)
+interest_index.start_verifier(db_connection, INTEREST_INDEX_VERIFY_INTERVAL)
+
 # 요청 로깅 함수
 def log_request():
     print(f"\n=== {request.method} {request.url} ===")
@@ -212,6 +568,12 @@ def log_request():
 def before_request():
     log_request()
 
+@app.teardown_request
+def release_db_connections(exception=None):
+    # 핸들러가 close()하지 않고 반환한 연결까지 모두 풀에 반납 (이미 반납된 연결은 무시)
+    for connection in g.pop('db_connections', []):
+        connection.close()
+
 # 회원가입
 @app.route('/api/register', methods=['POST'])
 def register_user():
@@ -387,42 +749,30 @@ def create_challenge(current_user):
             
             challenge_id = cursor.lastrowid
             
-            # 2. 태그 처리
+            # 2. 태그 처리 (태그 수와 관계없이 일괄 처리)
+            linked_tag_ids, new_tags = [], []
             if tags and len(tags) > 0:
-                for tag_name in tags:
-                    # 2-1. 태그가 이미 존재하는지 확인
-                    cursor.execute("SELECT id FROM tags WHERE name = %s", (tag_name,))
-                    tag_result = cursor.fetchone()
-                    
-                    if tag_result:
-                        # 기존 태그인 경우
-                        tag_id = tag_result['id']
-                    else:
-                        # 새 태그인 경우, 추가
-                        cursor.execute("INSERT INTO tags (name) VALUES (%s)", (tag_name,))
-                        tag_id = cursor.lastrowid
-                    
-                    # 2-2. 챌린지-태그 연결 정보 저장
-                    cursor.execute(
-                        "INSERT INTO challenge_tags (challenge_id, tag_id) VALUES (%s, %s)",
-                        (challenge_id, tag_id)
-                    )
+                # 2-1. 태그 생성/조회 및 챌린지-태그 연결 정보 저장
+                linked_tag_ids, new_tags = upsert_challenge_tags(cursor, challenge_id, tags)
+                
+                # 2-2. 태그별 도전과제 수 카운터 증가
+                add_tag_challenge_counts(cursor, linked_tag_ids, 1)
             
             # 트랜잭션 커밋
             connection.commit()
+            for tag_name, tag_id in new_tags:
+                tag_index.add(tag_name, tag_id)
+            resource_versions.bump('challenges', 'tags')
+            invalidate_cached(f"challenge:{challenge_id}", 'tag:*')
             
             # 3. 태그에 관심 있는 사용자들에게 알림 보내기 (트랜잭션 외부에서 처리)
-            if tags and len(tags) > 0:
-                # 처리된 태그 ID들 가져오기
-                tag_names_str = ', '.join(['%s'] * len(tags))
-                cursor.execute(f"SELECT id FROM tags WHERE name IN ({tag_names_str})", tags)
-                tag_ids = [row['id'] for row in cursor.fetchall()]
-                
-                # 백그라운드에서 알림 처리
-                threading.Thread(
-                    target=notify_users_for_tag_challenge,
-                    args=(challenge_id, title, tag_ids)
-                ).start()
+            if linked_tag_ids:
+                # 알림 fan-out 워커에 등록 (위에서 확인한 태그 ID를 그대로 사용)
+                tag_notification_executor.submit({
+                    'challenge_id': challenge_id,
+                    'challenge_title': title,
+                    'tag_ids': linked_tag_ids
+                })
             
             # 만기일 포맷 변환 (응답용)
             formatted_expired_date = expired_date.isoformat() if expired_date else None
@@ -444,9 +794,46 @@ def create_challenge(current_user):
         print(f"도전과제 생성 오류: {e}")
         return jsonify({'error': '도전과제 생성 중 오류가 발생했습니다'}), 500
 
+def build_challenge_dict(challenge, now):
+    """도전과제 행을 응답용 딕셔너리로 변환 (만료 여부, 남은 일수 계산 포함)"""
+    # 만료 여부 계산
+    is_expired = False
+    days_left = None
+    
+    if challenge['expired_date']:
+        is_expired = challenge['expired_date'] < now
+        if not is_expired:
+            # 남은 일수 계산
+            delta = challenge['expired_date'] - now
+            days_left = delta.days
+            if delta.seconds > 0 and days_left == 0:
+                # 24시간 미만이지만 아직 만료되지 않은 경우
+                days_left = 0
+    
+    return {
+        '_id': challenge['_id'],
+        'title': challenge['title'], 
+        'content': challenge['content'],
+        'creator': challenge['creator'],
+        'creatorName': challenge['creatorName'],
+        'created_at': challenge['created_at'],
+        'expired_date': challenge['expired_date'],  # 만기일 추가
+        'status': challenge['status'],  # 상태 추가
+        'is_expired': is_expired,  # 만료 여부 추가
+        'days_left': days_left,  # 남은 일수 추가 (만료된 경우 null)
+        'submission_count': challenge['submission_count'],  # 참여자 수
+        'tags': challenge['tags']  # 태그 정보 추가
+    }
+
 # 도전과제 목록 조회 API
+# ?limit=N 또는 ?cursor=... 가 있으면 커서 페이지네이션, 없으면 기존처럼 전체 목록 반환
 @app.route('/api/challenges', methods=['GET'])
+@versioned_get('challenges', time_window=CHALLENGE_ETAG_WINDOW)
+@cached_response('challenge:*', ttl=CHALLENGE_ETAG_WINDOW)
 def get_challenges():
+    if 'limit' in request.args or 'cursor' in request.args:
+        return get_challenges_page()
+    
     try:
         connection = get_db_connection()
         if connection is None:
@@ -457,73 +844,91 @@ def get_challenges():
         # challenges 테이블에서 기본 정보 조회 (expired_date 추가)
         query = """
         SELECT c.id as _id, c.title, c.content, c.creator, c.creator_name as creatorName, 
-               c.created_at, c.expired_date, c.status,
-               COUNT(cs.id) as submission_count
+               c.created_at, c.expired_date, c.status, c.submission_count
         FROM challenges c
-        LEFT JOIN challenge_submissions cs ON c.id = cs.challenge_id
-        GROUP BY c.id, c.title, c.content, c.creator, c.creator_name, c.created_at, c.expired_date, c.status
         ORDER BY c.created_at DESC
         """
         cursor.execute(query)
         challenges = cursor.fetchall()
         
+        # 모든 도전과제의 태그 정보를 한 번에 조회해서 붙임
+        attach_tags(cursor, challenges)
+        
+        cursor.close()
+        connection.close()
+        
         # 현재 시간 가져오기 (만료 여부 계산용)
         now = datetime.datetime.now()
         
         # 딕셔너리로 변환
-        challenge_list = []
-        for challenge in challenges:
-            # 만료 여부 계산
-            is_expired = False
-            days_left = None
-            
-            if challenge['expired_date']:
-                is_expired = challenge['expired_date'] < now
-                if not is_expired:
-                    # 남은 일수 계산
-                    delta = challenge['expired_date'] - now
-                    days_left = delta.days
-                    if delta.seconds > 0 and days_left == 0:
-                        # 24시간 미만이지만 아직 만료되지 않은 경우
-                        days_left = 0
-            
-            # 각 도전과제의 태그 정보 조회
-            tag_query = """
-            SELECT t.name
-            FROM tags t
-            JOIN challenge_tags ct ON t.id = ct.tag_id
-            WHERE ct.challenge_id = %s
-            """
-            cursor.execute(tag_query, (challenge['_id'],))
-            tag_results = cursor.fetchall()
-            tags = [tag['name'] for tag in tag_results] if tag_results else []
+        challenge_list = [build_challenge_dict(challenge, now) for challenge in challenges]
+        
+        return jsonify(challenge_list), 200
+        
+    except Exception as e:
+        print(f"도전과제 조회 오류: {e}")
+        return jsonify({'error': '도전과제 조회 중 오류가 발생했습니다'}), 500
+
+def get_challenges_page():
+    """
+    커서 기반 도전과제 목록 조회
+    (created_at, id) 인덱스를 따라 limit+1개만 읽으므로 몇 페이지를 넘기든 비용이 같습니다.
+    """
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        condition, params = keyset_condition(request.args.get('cursor'))
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        connection = get_db_connection()
+        if connection is None:
+            return jsonify({'error': '데이터베이스 연결 실패'}), 500
             
-            challenge_dict = {
-                '_id': challenge['_id'],
-                'title': challenge['title'], 
-                'content': challenge['content'],
-                'creator': challenge['creator'],
-                'creatorName': challenge['creatorName'],
-                'created_at': challenge['created_at'],
-                'expired_date': challenge['expired_date'],  # 만기일 추가
-                'status': challenge['status'],  # 상태 추가
-                'is_expired': is_expired,  # 만료 여부 추가
-                'days_left': days_left,  # 남은 일수 추가 (만료된 경우 null)
-                'submission_count': challenge['submission_count'],  # 참여자 수
-                'tags': tags  # 태그 정보 추가
-            }
-            challenge_list.append(challenge_dict)
+        cursor = connection.cursor()
+        
+        query = f"""
+        SELECT c.id as _id, c.title, c.content, c.creator, c.creator_name as creatorName, 
+               c.created_at, c.expired_date, c.status, c.submission_count
+        FROM challenges c
+        {'WHERE ' + condition if condition else ''}
+        ORDER BY c.created_at DESC, c.id DESC
+        LIMIT %s
+        """
+        cursor.execute(query, params + (limit + 1,))
+        challenges = cursor.fetchall()
+        
+        # limit보다 하나 더 읽어서 다음 페이지 존재 여부 판단
+        has_more = len(challenges) > limit
+        challenges = challenges[:limit]
+        
+        attach_tags(cursor, challenges)
         
         cursor.close()
         connection.close()
         
-        return jsonify(challenge_list), 200
+        now = datetime.datetime.now()
+        challenge_list = [build_challenge_dict(challenge, now) for challenge in challenges]
+        
+        next_cursor = None
+        if has_more:
+            last = challenges[-1]
+            next_cursor = encode_cursor(last['created_at'], last['_id'])
+        
+        return jsonify({
+            'challenges': challenge_list,
+            'count': len(challenge_list),
+            'limit': limit,
+            'next_cursor': next_cursor
+        }), 200
         
     except Exception as e:
-        print(f"도전과제 조회 오류: {e}")
+        print(f"도전과제 페이지 조회 오류: {e}")
         return jsonify({'error': '도전과제 조회 중 오류가 발생했습니다'}), 500
 
 @app.route('/api/tags', methods=['GET'])
+@versioned_get('tags')
+@cached_response('tag:*')
 def get_all_tags():
     try:
         # 정렬 및 필터링 옵션
@@ -538,11 +943,8 @@ def get_all_tags():
         
         # 기본 쿼리: 태그 목록 조회
         query = """
-        SELECT t.id, t.name, t.created_at, 
-               COUNT(DISTINCT ct.challenge_id) as challenge_count
+        SELECT t.id, t.name, t.created_at, t.challenge_count
         FROM tags t
-        LEFT JOIN challenge_tags ct ON t.id = ct.tag_id
-        GROUP BY t.id, t.name, t.created_at
         """
         
         # 정렬 기준 적용
@@ -574,6 +976,7 @@ def get_all_tags():
         return jsonify({'error': '태그 목록 조회 중 오류가 발생했습니다'}), 500
 
 @app.route('/api/tags/<tag_name>/challenges', methods=['GET'])
+@cached_response(lambda kwargs: f"tag:{kwargs['tag_name']}", 'challenge:*')
 def get_challenges_by_tag(tag_name):
     try:
         connection = get_db_connection()
@@ -583,43 +986,29 @@ def get_challenges_by_tag(tag_name):
         cursor = connection.cursor()
         
         # 1. 태그 존재 여부 확인
-        cursor.execute("SELECT id FROM tags WHERE name = %s", (tag_name,))
-        tag_result = cursor.fetchone()
+        tag_id = tag_index.lookup_id(tag_name, cursor)
         
-        if not tag_result:
+        if tag_id is None:
             return jsonify({
                 'exists': False,
                 'message': f'"{tag_name}" 태그가 존재하지 않습니다.',
                 'challenges': []
             }), 404
-            
-        tag_id = tag_result['id']
         
         # 2. 해당 태그를 가진 도전과제 조회
         query = """
         SELECT c.id as _id, c.title, c.content, c.creator, c.creator_name as creatorName, 
-               c.status, c.created_at, c.expired_date,
-               COUNT(DISTINCT cs.id) as submission_count
+               c.status, c.created_at, c.expired_date, c.submission_count
         FROM challenges c
         JOIN challenge_tags ct ON c.id = ct.challenge_id
-        LEFT JOIN challenge_submissions cs ON c.id = cs.challenge_id
         WHERE ct.tag_id = %s
-        GROUP BY c.id, c.title, c.content, c.creator, c.creator_name, c.status, c.created_at, c.expired_date
         ORDER BY c.created_at DESC
         """
         cursor.execute(query, (tag_id,))
         challenges = cursor.fetchall()
         
-        # 3. 각 도전과제의 모든 태그 정보 추가 (선택적)
-        for challenge in challenges:
-            tag_query = """
-            SELECT t.id, t.name
-            FROM tags t
-            JOIN challenge_tags ct ON t.id = ct.tag_id
-            WHERE ct.challenge_id = %s
-            """
-            cursor.execute(tag_query, (challenge['_id'],))
-            challenge['tags'] = cursor.fetchall()
+        # 3. 각 도전과제의 모든 태그 정보 추가 (한 번의 쿼리로 일괄 조회)
+        attach_tags(cursor, challenges, names_only=False)
         
         cursor.close()
         connection.close()
@@ -651,9 +1040,10 @@ def submit_to_challenge(current_user, challenge_id):
             
         cursor = connection.cursor()
         
-        # 도전과제 존재 확인
-        cursor.execute("SELECT id FROM challenges WHERE id = %s", (challenge_id,))
-        if not cursor.fetchone():
+        # 도전과제 존재 확인 (알림에 쓸 제목/생성자도 함께 조회)
+        cursor.execute("SELECT id, title, creator FROM challenges WHERE id = %s", (challenge_id,))
+        challenge = cursor.fetchone()
+        if not challenge:
             cursor.close()
             connection.close()
             return jsonify({'error': '존재하지 않는 도전과제입니다'}), 404
@@ -664,13 +1054,15 @@ def submit_to_challenge(current_user, challenge_id):
         if 'photo' in request.files:
             file = request.files['photo']
             if file and file.filename != '' and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_')
-                filename = timestamp + filename
-                
-                file_path = os.path.join(UPLOAD_FOLDER, filename)
-                file.save(file_path)
-                photo_path = f"/photos/{filename}"
+                # 내용 해시 기반 경로에 저장 (같은 사진은 한 번만 저장됨)
+                ext = file.filename.rsplit('.', 1)[1]  # allowed_file에서 허용 목록 확인됨
+                relative_path, deduplicated = photo_store.save(file, ext)
+                photo_path = f"/photos/{relative_path}"
+                if deduplicated:
+                    print(f"♻️  이미 저장된 사진 재사용: {photo_path}")
+                else:
+                    # 축소본은 백그라운드에서 미리 생성
+                    photo_derivatives.submit(relative_path)
         
         # challenge_submissions 테이블에 제출 정보 저장
         query = """
@@ -685,64 +1077,38 @@ def submit_to_challenge(current_user, challenge_id):
             comment,
             datetime.datetime.now()
         ))
-        connection.commit()
         submission_id = cursor.lastrowid
         
-        # 🔔 알림 생성 로직 추가
-        # 알림을 위해 도전과제 정보 조회
-        cursor.execute("SELECT title, creator, creator_name FROM challenges WHERE id = %s", (challenge_id,))
-        challenge = cursor.fetchone()
-        
-        # 1. 도전과제 생성자에게 알림 (본인이 아닌 경우)
-        if challenge['creator'] != current_user['email']:
-            creator_notification = {
-                'type': 'new_submission',
-                'title': '새로운 인증 사진!',
-                'message': f'{current_user["name"]}님이 "{challenge["title"]}" 도전과제에 인증 사진을 올렸습니다.',
-                'challenge_id': challenge_id,
-                'challenge_title': challenge['title'],
-                'submitter_name': current_user['name'],
-                'submitter_email': current_user['email'],
-                'photo_path': photo_path,
-                'comment': comment,
-                'timestamp': datetime.datetime.now().isoformat()
-            }
-            add_notification(challenge['creator'], creator_notification)
-        
-        # 2. 해당 도전과제에 참여한 다른 사람들에게도 알림
-        cursor.execute("""
-            SELECT DISTINCT user_email, user_name 
-            FROM challenge_submissions 
-            WHERE challenge_id = %s AND user_email != %s
-        """, (challenge_id, current_user['email']))
-        
-        other_participants = cursor.fetchall()
-        
-        for participant in other_participants:
-            participant_notification = {
-                'type': 'peer_submission',
-                'title': '동료의 새 인증!',
-                'message': f'{current_user["name"]}님이 "{challenge["title"]}" 도전과제에 새로운 인증을 올렸습니다.',
-                'challenge_id': challenge_id,
-                'challenge_title': challenge['title'],
-                'submitter_name': current_user['name'],
-                'submitter_email': current_user['email'],
-                'photo_path': photo_path,
-                'comment': comment,
-                'timestamp': datetime.datetime.now().isoformat()
-            }
-            add_notification(participant['user_email'], participant_notification)
+        # 같은 트랜잭션에서 제출물 수 카운터 증가
+        add_submission_count(cursor, challenge_id, 1)
+        connection.commit()
+        resource_versions.bump('challenges', f"submissions:{challenge_id}")
+        invalidate_cached(f"challenge:{challenge_id}", f"user:{current_user['email']}")
         
         cursor.close()
         connection.close()
         
+        # 🔔 생성자/참여자 알림은 커밋 이후 fan-out 워커에서 처리 (응답을 기다리게 하지 않음)
+        queued = submission_notification_executor.submit({
+            'submission_id': submission_id,
+            'challenge_id': challenge_id,
+            'challenge_title': challenge['title'],
+            'creator': challenge['creator'],
+            'submitter_email': current_user['email'],
+            'submitter_name': current_user['name'],
+            'photo_path': photo_path,
+            'comment': comment,
+            'timestamp': datetime.datetime.now().isoformat()
+        })
+        
         return jsonify({
             'message': '도전과제 참여가 완료되었습니다',
             'submission_id': submission_id,
             'photo_path': photo_path,
             'notifications_sent': {
-                'creator': challenge['creator'] if challenge['creator'] != current_user['email'] else None,
-                'participants': len(other_participants)
+                'creator': challenge['creator'] if queued and challenge['creator'] != current_user['email'] else None,
+                'participants': 'pending' if queued else 0,
+                'status': 'queued' if queued else 'rejected'
             }
         }), 201
         
@@ -752,6 +1118,8 @@ def submit_to_challenge(current_user, challenge_id):
 
 # 특정 도전과제의 제출물들 조회 API
 @app.route('/api/challenges/<int:challenge_id>/submissions', methods=['GET'])
+@versioned_get(lambda kwargs: f"submissions:{kwargs['challenge_id']}")
+@cached_response(lambda kwargs: f"challenge:{kwargs['challenge_id']}")
 def get_challenge_submissions(challenge_id):
     try:
         connection = get_db_connection()
@@ -828,6 +1196,8 @@ def update_challenge_status(current_user, challenge_id):
         # 상태 업데이트 (challenges 테이블에 status 컬럼이 없다면 추가 필요)
         cursor.execute("UPDATE challenges SET status = %s WHERE id = %s", (data['status'], challenge_id))
         connection.commit()
+        resource_versions.bump('challenges')
+        invalidate_cached(f"challenge:{challenge_id}")
         cursor.close()
         connection.close()
         
@@ -852,7 +1222,7 @@ def delete_verification(current_user, verification_id):
         cursor = connection.cursor()
         
         # 권한 확인 (제출자만 삭제 가능)
-        cursor.execute("SELECT user_email FROM challenge_submissions WHERE id = %s", (verification_id,))
+        cursor.execute("SELECT user_email, challenge_id FROM challenge_submissions WHERE id = %s", (verification_id,))
         result = cursor.fetchone()
         
         if not result:
@@ -867,7 +1237,10 @@ def delete_verification(current_user, verification_id):
         
         # 인증 사진 삭제
         cursor.execute("DELETE FROM challenge_submissions WHERE id = %s", (verification_id,))
+        add_submission_count(cursor, result['challenge_id'], -1)
         connection.commit()
+        resource_versions.bump('challenges', f"submissions:{result['challenge_id']}")
+        invalidate_cached(f"challenge:{result['challenge_id']}", f"user:{current_user['email']}")
         cursor.close()
         connection.close()
         
@@ -908,9 +1281,14 @@ def delete_challenge(current_user, challenge_id):
             connection.close()
             return jsonify({'error': '삭제 권한이 없습니다'}), 403
         
+        # 연결된 태그들의 도전과제 수 감소 (challenge_tags가 CASCADE로 지워지기 전에)
+        release_challenge_tag_counts(cursor, challenge_id)
+        
         # 도전과제 삭제 (CASCADE로 관련 제출물도 자동 삭제)
         cursor.execute("DELETE FROM challenges WHERE id = %s", (challenge_id,))
         connection.commit()
+        resource_versions.bump('challenges', 'tags', f"submissions:{challenge_id}")
+        invalidate_cached(f"challenge:{challenge_id}", 'tag:*')
         cursor.close()
         connection.close()
         
@@ -920,16 +1298,74 @@ def delete_challenge(current_user, challenge_id):
         print(f"도전과제 삭제 오류: {e}")
         return jsonify({'error': '도전과제 삭제 중 오류가 발생했습니다'}), 500
 
-# 사진 파일 제공 API
-@app.route('/photos/<filename>')
+def send_photo(relative, mimetype=None, immutable=False, vary_accept=False):
+    """
+    사진 파일 응답 생성
+    - 내용 주소 기반 파일: 파일 이름(해시)을 strong ETag로, 1년 immutable 캐시
+    - 이전 방식 파일: werkzeug가 만든 ETag + PHOTO_CACHE_MAX_AGE초 캐시
+    - If-None-Match / If-Modified-Since → 304, Range → 206 (conditional=True)
+    - 본문은 wsgi.file_wrapper(sendfile)로 전송, PHOTO_SENDFILE 설정 시 앞단 프록시에 위임
+    """
+    etag = os.path.basename(relative) if immutable else True
+    max_age = PHOTO_IMMUTABLE_MAX_AGE if immutable else PHOTO_CACHE_MAX_AGE
+    
+    if PHOTO_SENDFILE == 'x-accel':
+        # nginx: location /protected-photos/ { internal; alias .../photos/; }
+        if safe_join(UPLOAD_FOLDER, relative) is None or not os.path.isfile(os.path.join(UPLOAD_FOLDER, relative)):
+            return jsonify({'error': '존재하지 않는 사진입니다'}), 404
+        response = make_response('')
+        response.headers['X-Accel-Redirect'] = PHOTO_ACCEL_PREFIX + relative
+        if mimetype:
+            response.headers['Content-Type'] = mimetype
+        else:
+            del response.headers['Content-Type']  # nginx가 확장자로 결정
+        if immutable:
+            response.set_etag(etag)
+    else:
+        # PHOTO_SENDFILE=x-sendfile 이면 app.config['USE_X_SENDFILE']로 X-Sendfile 헤더만 보냄
+        response = send_from_directory(UPLOAD_FOLDER, relative, mimetype=mimetype, etag=etag,
+                                       max_age=max_age, conditional=True)
+    
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if immutable:
+        response.cache_control.immutable = True
+    if vary_accept:
+        response.vary.add('Accept')
+    return response
+
+# 사진 파일 제공 API (이전 photos/<filename> 과 해시 경로 photos/ab/cd/<hash>.<ext> 모두 지원)
+@app.route('/photos/<path:filename>')
 def uploaded_file(filename):
-    print(f"=== Photo Request ===")
-    print(f"Sending photo: {filename}")
-    print(f"Request from: {request.remote_addr}")
-    print(f"Full path: {os.path.join(UPLOAD_FOLDER, filename)}")
-    return send_from_directory(UPLOAD_FOLDER, filename)
+    # photos/ 밖을 가리키는 경로(../ 등)와 업로드 중인 임시 파일(.tmp/)은 없는 사진으로 처리
+    safe_path = safe_join(UPLOAD_FOLDER, filename)
+    if safe_path is None:
+        return jsonify({'error': '존재하지 않는 사진입니다'}), 404
+    filename = os.path.relpath(safe_path, UPLOAD_FOLDER).replace(os.sep, '/')
+    if filename == '.tmp' or filename.startswith('.tmp/'):
+        return jsonify({'error': '존재하지 않는 사진입니다'}), 404
+    
+    immutable = is_content_addressed(filename)
+    
+    # ?w=너비 요청 시 축소본 제공 (아직 없으면 원본을 주고 생성만 예약)
+    width = request.args.get('w', type=int)
+    if width:
+        variant = photo_derivatives.resolve(filename, width, request.accept_mimetypes)
+        if variant:
+            return send_photo(variant[0], mimetype=variant[1], immutable=immutable, vary_accept=True)
+        # 같은 URL이 나중에는 축소본을 가리키므로 원본 응답은 오래 캐시하지 않음
+        response = send_photo(filename, vary_accept=True)
+        if isinstance(response, tuple):
+            return response
+        response.cache_control.max_age = 0
+        response.cache_control.immutable = False
+        response.cache_control.no_cache = True
+        return response
+    
+    return send_photo(filename, immutable=immutable)
 
 @app.route('/api/users/<user_email>/challenges', methods=['GET'])
+@cached_response(lambda kwargs: f"user:{kwargs['user_email']}", 'challenge:*')
 def get_user_challenges(user_email):
     try:
         print(f"=== User Challenges Request ===")
@@ -952,6 +1388,9 @@ def get_user_challenges(user_email):
         """
         cursor.execute(query, (user_email,))
         user_challenges = cursor.fetchall()
+        
+        # 태그 정보 일괄 조회
+        attach_tags(cursor, user_challenges)
         cursor.close()
         connection.close()
         
@@ -964,31 +1403,69 @@ def get_user_challenges(user_email):
         print(f"Error in get_user_challenges: {str(e)}")
         return jsonify({"message": str(e)}), 500
 
+def read_postit_image():
+    """
+    검출 요청에서 인코딩된 이미지 바이트를 꺼냄 → (바이트, 오류 메시지)
+    - multipart/form-data의 image 파일 (base64 없이 그대로 전송)
+    - Content-Type이 image/*인 요청 본문 전체
+    - 기존 클라이언트용 JSON {"image": "base64 문자열"}
+    """
+    upload = request.files.get('image')
+    if upload is not None:
+        return upload.read(), None
+    if request.mimetype.startswith('image/'):
+        return request.get_data(cache=False), None
+
+    data = request.get_json(silent=True) or {}
+    image_base64 = data.get('image')
+    if not image_base64:
+        return None, '이미지 데이터가 필요합니다.'
+    # "data:image/jpeg;base64," 제거
+    _, _, encoded = image_base64.rpartition(',')
+    return base64.b64decode(encoded), None
+
+def wants_binary_response():
+    """?format=binary 또는 Accept 헤더가 JSON보다 image/jpeg를 우선하면 잘라낸 이미지를 JPEG 그대로 응답"""
+    if request.args.get('format') == 'binary':
+        return True
+    return request.accept_mimetypes.best_match(['application/json', 'image/jpeg']) == 'image/jpeg'
+
 @app.route('/api/detect-postit', methods=['POST'])
 @token_required
 def detect_postit_endpoint(current_user):
     """
     포스트잇 검출 API
-    app_umai.py의 find_postit 함수를 그대로 활용
+    postit_detection.py의 검출 로직(locate_postit_bytes) 사용 (app_umai.py와 같은 코드)
+    같은 이미지 + 같은 검출 파라미터의 결과는 detection_cache에서 재사용
+    요청: multipart image 파일, image/* 본문, 또는 JSON base64 (read_postit_image)
+    응답: 기본은 JSON + base64, 바이너리 모드면 image/jpeg 본문 + X-Postit-Bbox 헤더
+    모든 응답에 이 요청 동안의 최대 RSS(X-Peak-RSS, KB)와 요청 시작 대비 증가량(X-Peak-RSS-Growth),
+    측정 중 겹친 다른 검출 요청 수(X-Peak-Overlapped, 0이 아니면 RSS 값은 그 요청들을 포함한 상한값) 헤더 포함
     """
+    with detection_memory.measure() as memory:
+        response = make_response(run_postit_detection())
+    response.headers['X-Peak-RSS'] = str(memory['peak_rss_kb'])
+    response.headers['X-Peak-RSS-Growth'] = str(memory['rss_growth_kb'])
+    response.headers['X-Peak-Overlapped'] = str(memory['overlapped'])
+    if 'traced_peak_kb' in memory:
+        response.headers['X-Peak-Traced'] = str(memory['traced_peak_kb'])
+    if memory['rss_growth_kb']:
+        print(f"📈 포스트잇 검출 중 RSS 증가: +{memory['rss_growth_kb']}KB (요청 중 최대 {memory['peak_rss_kb']}KB, 겹친 요청 {memory['overlapped']}개)")
+    return response
+
+def run_postit_detection():
+    """detect_postit_endpoint 본체 → Flask 응답 (본문, 상태 코드)"""
     try:
-        data = request.get_json()
-        image_base64 = data.get('image')
-        
-        if not image_base64:
-            return jsonify({
-                'success': False,
-                'message': '이미지 데이터가 필요합니다.'
-            }), 400
+        binary = wants_binary_response()
         
-        # Base64를 PIL Image로 변환
+        # 요청 이미지 바이트 읽기 (PIL은 헤더만 읽고, 픽셀은 잘라낼 때 디코딩)
         try:
-            # "data:image/jpeg;base64," 제거
-            if ',' in image_base64:
-                image_base64 = image_base64.split(',')[1]
-            
-            # Base64 디코딩
-            image_data = base64.b64decode(image_base64)
+            image_data, error = read_postit_image()
+            if error:
+                return jsonify({
+                    'success': False,
+                    'message': error
+                }), 400
             pil_image = Image.open(io.BytesIO(image_data))
             
         except Exception as e:
@@ -997,21 +1474,39 @@ def detect_postit_endpoint(current_user):
                 'message': f'이미지 변환 오류: {str(e)}'
             }), 400
         
-        # 기존 app_umai.py의 find_postit 함수 사용
+        # 공용 검출 로직 사용 (같은 이미지는 캐시된 bbox 사용)
         try:
-            postit_roi = find_postit(pil_image)
+            cache_key = detection_cache_key(image_data)
+            located = detection_cache.get(cache_key)
+            if located is None:
+                # 검출은 바이트에서 검출 해상도까지만 축소 디코딩해서 처리
+                # 원본 해상도 디코딩은 포스트잇을 찾았을 때 pil_image에서 한 번만 (경계 보정과 아래 crop이 공유)
+                located = locate_postit_bytes(image_data, pil_img=pil_image)
+                detection_cache.set(cache_key, located)
+            bbox = located[0]
             
-            if postit_roi is None:
+            if bbox is None:
+                # 바이너리 모드는 본문이 이미지가 아니므로 상태 코드로 구분
                 return jsonify({
                     'success': False,
                     'message': '포스트잇을 찾지 못했습니다.',
                     'postit_found': False
-                })
+                }), (404 if binary else 200)
+            
+            x, y, w, h = bbox
+            postit_roi = pil_image.crop((x, y, x + w, y + h))
             
-            # 검출된 포스트잇 영역을 다시 Base64로 변환
             buffer = io.BytesIO()
             postit_roi.save(buffer, format='JPEG', quality=90)
-            postit_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+            
+            if binary:
+                response = make_response(buffer.getvalue())
+                response.headers['Content-Type'] = 'image/jpeg'
+                response.headers['X-Postit-Bbox'] = f'{x},{y},{w},{h}'
+                return response
+            
+            # 검출된 포스트잇 영역을 다시 Base64로 변환
+            postit_base64 = base64.b64encode(buffer.getbuffer()).decode('ascii')
             
             return jsonify({
                 'success': True,
@@ -1025,7 +1520,7 @@ def detect_postit_endpoint(current_user):
                 'success': False,
                 'message': f'포스트잇 검출 오류: {str(e)}',
                 'postit_found': False
-            })
+            }), (500 if binary else 200)
             
     except Exception as e:
         return jsonify({
@@ -1066,6 +1561,9 @@ def delete_user(current_user, user_id):
             
             # 2. 외래키 관계 처리 - 순서가 중요함!
             
+            # 2-0. 삭제될 제출물/도전과제만큼 카운터 감소
+            release_user_counts(cursor, user_email)
+            
             # 2-1. challenge_submissions 테이블에서 해당 유저의 제출물 삭제
             cursor.execute("DELETE FROM challenge_submissions WHERE user_email = %s", (user_email,))
             deleted_submissions = cursor.rowcount
@@ -1081,6 +1579,16 @@ def delete_user(current_user, user_id):
             # 트랜잭션 커밋
             connection.commit()
             
+            # 삭제된 사용자의 토큰이 캐시로 계속 인증되지 않도록 제거
+            invalidate_user_identity(user_id)
+            
+            # 관심 태그 색인에서도 제거 (user_interests는 ON DELETE CASCADE로 함께 삭제됨)
+            interest_index.remove_user(user_id)
+            
+            # 여러 도전과제/제출물이 함께 지워지므로 모든 ETag 무효화
+            resource_versions.bump_all()
+            query_cache.clear()
+            
             return jsonify({
                 'message': '사용자 계정이 성공적으로 삭제되었습니다',
                 'deleted_user': {
@@ -1132,6 +1640,50 @@ def get_notifications(user_email):
             'notifications': []
         }), 500
 
+# 알림 롱폴링 API
+# 새 알림이 있으면 바로, 없으면 새 알림이 오거나 wait초가 지날 때까지 기다렸다가 응답
+# 받은 마지막 event_id를 다음 요청에 last_event_id(또는 Last-Event-ID 헤더)로 보내면
+# 그 이하 알림은 확인된 것으로 삭제되고, 연결이 끊겨 받지 못한 알림은 다시 전달됩니다
+@app.route('/api/notify/<user_email>/poll', methods=['GET'])
+def poll_notifications(user_email):
+    try:
+        wait = min(max(float(request.args.get('wait', 0)), 0), NOTIFY_MAX_WAIT)
+        last_event_id = int(request.args.get('last_event_id') or request.headers.get('Last-Event-ID') or 0)
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'wait, last_event_id는 숫자여야 합니다',
+            'notifications': []
+        }), 400
+    
+    try:
+        # 대기 슬롯이 없으면 기다리지 않고 현재 알림만 반환
+        waiting = wait > 0 and notify_waiter_slots.acquire(blocking=False)
+        try:
+            events = notification_backend.wait_for(user_email, last_event_id, wait if waiting else 0)
+        finally:
+            if waiting:
+                notify_waiter_slots.release()
+        
+        notifications = [dict(data, event_id=event_id) for event_id, data in events]
+        
+        return jsonify({
+            'success': True,
+            'count': len(notifications),
+            'notifications': notifications,
+            'last_event_id': events[-1][0] if events else last_event_id,
+            'waited': bool(waiting),
+            'timestamp': datetime.datetime.now().isoformat()
+        }), 200
+        
+    except Exception as e:
+        print(f"알림 롱폴링 오류: {e}")
+        return jsonify({
+            'success': False,
+            'error': '알림 조회 중 오류가 발생했습니다',
+            'notifications': []
+        }), 500
+
 # 기본 루트
 # 기본 루트
 # 사용자 관심 태그 관리 API
@@ -1153,13 +1705,10 @@ def add_user_interest(current_user):
         cursor = connection.cursor()
         
         # 태그 존재 여부 확인
-        cursor.execute("SELECT id FROM tags WHERE name = %s", (tag_name,))
-        tag_result = cursor.fetchone()
+        tag_id = tag_index.lookup_id(tag_name, cursor)
         
-        if not tag_result:
+        if tag_id is None:
             return jsonify({'error': '존재하지 않는 태그입니다'}), 404
-            
-        tag_id = tag_result['id']
         
         # 이미 관심 태그로 등록되어 있는지 확인
         cursor.execute(
@@ -1177,6 +1726,7 @@ def add_user_interest(current_user):
             (current_user['id'], tag_id)
         )
         connection.commit()
+        interest_index.add(current_user['id'], current_user['email'], current_user['name'], tag_id)
         
         cursor.close()
         connection.close()
@@ -1204,12 +1754,10 @@ def get_user_interests(current_user):
         # 사용자의 관심 태그들 조회
         query = """
         SELECT t.id, t.name, t.created_at, ui.created_at as interest_added_at,
-               COUNT(DISTINCT ct.challenge_id) as challenge_count
+               t.challenge_count
         FROM user_interests ui
         JOIN tags t ON ui.tag_id = t.id
-        LEFT JOIN challenge_tags ct ON t.id = ct.tag_id
         WHERE ui.user_id = %s
-        GROUP BY t.id, t.name, t.created_at, ui.created_at
         ORDER BY ui.created_at DESC
         """
         cursor.execute(query, (current_user['id'],))
@@ -1254,6 +1802,7 @@ def remove_user_interest(current_user, tag_id):
             (current_user['id'], tag_id)
         )
         connection.commit()
+        interest_index.remove(current_user['id'], tag_id)
         
         cursor.close()
         connection.close()
@@ -1267,6 +1816,26 @@ def remove_user_interest(current_user, tag_id):
         print(f"관심 태그 삭제 오류: {e}")
         return jsonify({'error': '관심 태그 삭제 중 오류가 발생했습니다'}), 500
 
+# 서버 내부 상태 확인 API (커넥션 풀 등)
+@app.route('/api/status', methods=['GET'])
+def get_server_status():
+    return jsonify({
+        'db_pool': db_pool.stats(),
+        'identity_cache': identity_cache.stats(),
+        'detection_cache': detection_cache.stats(),
+        'detection_memory': detection_memory.stats(),
+        'resource_versions': resource_versions.snapshot(),
+        'query_cache': query_cache.stats(),
+        'tag_index': tag_index.stats(),
+        'interest_index': interest_index.stats(),
+        'notifications': notification_backend.stats(),
+        'tag_notification_fanout': tag_notification_executor.stats(),
+        'submission_notification_fanout': submission_notification_executor.stats(),
+        'photo_store': photo_store.stats(),
+        'photo_derivatives': photo_derivatives.stats(),
+        'timestamp': datetime.datetime.now().isoformat()
+    }), 200
+
 @app.route('/')
 def home():
     return jsonify({
@@ -1295,9 +1864,9 @@ def home():
                     "response_error": {"error": "제목과 내용을 모두 입력해주세요"}
                 },
                 "GET /api/challenges": {
-                    "description": "도전과제 목록 조회",
-                    "request": "없음",
-                    "response_success": [{"_id": "int", "title": "string", "content": "string", "creator": "string", "creatorName": "string", "created_at": "datetime", "expired_date": "datetime", "status": "string", "is_expired": "boolean", "days_left": "int|null", "submission_count": "int"}],
+                    "description": "도전과제 목록 조회 (limit/cursor가 없으면 전체 목록을 배열로 반환)",
+                    "request": "없음 (페이지네이션: ?limit=20&cursor=next_cursor값 -> {\"challenges\": [...], \"count\": \"int\", \"limit\": \"int\", \"next_cursor\": \"string|null\"})",
+                    "response_success": [{"_id": "int", "title": "string", "content": "string", "creator": "string", "creatorName": "string", "created_at": "datetime", "expired_date": "datetime", "status": "string", "is_expired": "boolean", "days_left": "int|null", "submission_count": "int", "tags": ["string"]}],
                     "response_error": {"error": "도전과제 조회 중 오류가 발생했습니다"}
                 },
                 "DELETE /api/challenges/{id}": {
@@ -1331,7 +1900,7 @@ def home():
                 "POST /api/challenges/{id}/submit": {
                     "description": "도전과제 참여/사진 제출",
                     "request": {"comment": "string", "photo": "file"},
-                    "response_success": {"message": "도전과제 참여가 완료되었습니다", "submission_id": "int", "photo_path": "string", "notifications_sent": {"creator": "string|null", "participants": "int"}},
+                    "response_success": {"message": "도전과제 참여가 완료되었습니다", "submission_id": "int", "photo_path": "string", "notifications_sent": {"creator": "string|null", "participants": "pending|0", "status": "queued|rejected"}},
                     "response_error": {"error": "존재하지 않는 도전과제입니다"}
                 },
                 "GET /api/challenges/{id}/submissions": {
@@ -1357,7 +1926,7 @@ def home():
                 "GET /api/users/{user_email}/challenges": {
                     "description": "사용자 참여 도전과제 조회",
                     "request": "없음",
-                    "response_success": [{"_id": "int", "title": "string", "content": "string", "creator": "string", "creatorName": "string", "createdAt": "datetime", "status": "string"}],
+                    "response_success": [{"_id": "int", "title": "string", "content": "string", "creator": "string", "creatorName": "string", "createdAt": "datetime", "status": "string", "tags": ["string"]}],
                     "response_error": {"message": "에러 메시지"}
                 },
                 "DELETE /api/users/{user_id}": {
@@ -1392,6 +1961,12 @@ def home():
                     "response_success": {"success": "true", "count": "int", "notifications": [{"type": "string", "title": "string", "message": "string", "challenge_id": "int", "timestamp": "string"}], "timestamp": "string"},
                     "response_error": {"success": "false", "error": "알림 조회 중 오류가 발생했습니다", "notifications": []}
                 },
+                "GET /api/notify/{user_email}/poll": {
+                    "description": "알림 롱폴링 (새 알림이 오거나 wait초가 지날 때까지 대기, 최대 NOTIFY_MAX_WAIT초)",
+                    "request": "없음 (?wait=25&last_event_id=int 또는 Last-Event-ID 헤더)",
+                    "response_success": {"success": "true", "count": "int", "notifications": [{"event_id": "int", "type": "string", "title": "string", "message": "string", "challenge_id": "int"}], "last_event_id": "int", "timestamp": "string"},
+                    "response_error": {"success": "false", "error": "알림 조회 중 오류가 발생했습니다", "notifications": []}
+                },
                 "GET /api/notify/status": {
                     "description": "전체 알림 상태 확인 (디버깅용)",
                     "request": "없음",
@@ -1405,26 +1980,37 @@ def home():
                     "response_error": {"error": "에러 메시지"}
                 }
             },
+            "서버 상태": {
+                "GET /api/status": {
+                    "description": "서버 내부 상태 확인 (커넥션 풀 통계 등)",
+                    "request": "없음",
+                    "response_success": {"db_pool": {"max_size": "int", "size": "int", "idle": "int", "in_use": "int", "waiting": "int", "created": "int", "closed": "int", "acquired": "int", "timeouts": "int", "ping_failures": "int", "recycled": "int", "avg_wait_ms": "float"}, "identity_cache": {"size": "int", "hits": "int", "misses": "int", "hit_rate": "float", "evictions": "int", "invalidations": "int"}, "timestamp": "string"},
+                    "response_error": "없음"
+                }
+            },
             "AI 기능": {
                 "POST /api/detect-postit": {
                     "description": "포스트잇 검출 API",
                     "request": {"image": "base64 string"},
+                    "request_binary": "multipart/form-data image 파일 또는 Content-Type: image/jpeg 본문",
                     "response_success": {"success": "true", "message": "포스트잇 검출 성공", "postit_found": "true", "postit_image": "base64 string"},
+                    "response_binary": "?format=binary 또는 Accept: image/jpeg → image/jpeg 본문, X-Postit-Bbox: x,y,w,h (못 찾으면 404)",
+                    "response_headers": "X-Peak-RSS (KB), X-Peak-RSS-Growth (KB), X-Peak-Overlapped, DETECTION_TRACE_MEMORY=1이면 X-Peak-Traced (KB)",
                     "response_error": {"success": "false", "message": "포스트잇을 찾지 못했습니다", "postit_found": "false"}
                 }
             },
             "파일": {
-                "GET /photos/{filename}": {
-                    "description": "업로드된 사진 조회",
-                    "request": "없음",
-                    "response_success": "파일 데이터",
+                "GET /photos/{path}": {
+                    "description": "업로드된 사진 조회 (photo_path 그대로 사용, 예: /photos/ab/cd/<sha256>.jpg)",
+                    "request": "w (선택, 쿼리 파라미터): 원하는 너비(px) → 160/480/1080 축소본 중 선택, Accept에 image/webp가 있으면 WebP",
+                    "response_success": "파일 데이터 (ETag, Cache-Control 포함 / If-None-Match → 304, Range → 206 지원)",
                     "response_error": "404 Not Found"
                 }
             }
         },
         "features": {
             "알림 시스템": "메모리 기반 실시간 알림 (새 인증 사진 업로드시 자동 발송)",
-            "포스트잇 검출": "AI 기반 이미지 처리 (app_umai.py 연동)",
+            "포스트잇 검출": "AI 기반 이미지 처리 (postit_detection.py)",
             "사용자 관리": "회원가입, 로그인, 계정 삭제, 전체 사용자 목록 조회",
             "도전과제 관리": "생성, 조회, 삭제, 상태 업데이트, 만기일 설정",
             "태그 시스템": "태그 기반 도전과제 분류 및 검색",
@@ -1436,10 +2022,13 @@ def home():
             "max_file_size": "제한 없음"
         },
         "notification_system": {
-            "storage": "메모리 기반 (서버 재시작시 초기화)",
+            "storage": "메모리 기반 (서버 재시작시 초기화, 사용자별 최대 NOTIFY_CAPACITY개, NOTIFY_TTL초 후 자동 삭제) 또는 NOTIFY_OUTBOX=mysql 설정 시 notification_outbox 테이블",
             "triggers": ["새 인증 사진 제출", "관심 태그 관련 새 도전과제"],
             "recipients": ["도전과제 생성자", "기존 참여자들", "관심 태그 설정한 사용자"],
-            "polling_endpoint": "GET /api/notify/{user_email}"
+            "polling_endpoint": "GET /api/notify/{user_email}",
+            "long_polling_endpoint": "GET /api/notify/{user_email}/poll?wait=25&last_event_id=0",
+            "digest": "같은 도전과제의 같은 종류 알림은 하나로 합쳐 count, digest: true 필드와 함께 요약 문구로 반환됩니다",
+            "interest_index": "관심 태그 사용자는 메모리 색인에서 조회하며 INTEREST_INDEX_VERIFY_INTERVAL초마다 DB와 비교해 보정합니다 (GET /api/status의 interest_index)"
         },
         "tag_system": {
             "features": ["도전과제에 태그 추가", "태그별 도전과제 조회", "인기 태그 확인"],
@@ -1449,6 +2038,20 @@ def home():
             "expired_date": "도전과제 생성 시 만기일 설정 가능 (기본값: 생성일+7일)",
             "status_info": "is_expired, days_left 필드를 통한 만료 정보 제공"
         },
+        "http_caching": {
+            "endpoints": ["GET /api/challenges", "GET /api/tags", "GET /api/challenges/{id}/submissions"],
+            "description": "응답의 ETag 헤더 값을 다음 요청의 If-None-Match 헤더로 보내면, 데이터가 바뀌지 않은 경우 본문 없이 304를 반환합니다",
+            "server_cache": "GET /api/challenges, /api/tags, /api/tags/{tag_name}/challenges, /api/users/{user_email}/challenges, /api/challenges/{id}/submissions 응답은 서버 캐시에 저장되며 (X-Cache: HIT|MISS), 관련 데이터가 바뀌면 즉시 무효화됩니다"
+        },
+        "required_database_columns": {
+            "challenges.submission_count": "ALTER TABLE challenges ADD COLUMN submission_count INT NOT NULL DEFAULT 0;",
+            "tags.challenge_count": "ALTER TABLE tags ADD COLUMN challenge_count INT NOT NULL DEFAULT 0;",
+            "tags.name (UNIQUE)": "ALTER TABLE tags ADD UNIQUE KEY uq_tags_name (name); -- 도전과제 생성 시 태그 일괄 upsert에 필요",
+            "note": "서버 시작 시와 COUNTER_RECONCILE_INTERVAL초마다 원본 테이블로부터 다시 계산됩니다"
+        },
+        "recommended_indexes": {
+            "idx_challenges_created_id": "CREATE INDEX idx_challenges_created_id ON challenges (created_at, id); -- GET /api/challenges 커서 페이지네이션용"
+        },
         "required_database_tables": {
             "user_interests": {
                 "description": "사용자 관심 태그 저장 테이블",
@@ -1460,6 +2063,17 @@ def home():
                     "UNIQUE KEY": "unique_user_tag (user_id, tag_id)"
                 },
                 "create_sql": "CREATE TABLE user_interests (id INT PRIMARY KEY AUTO_INCREMENT, user_id INT NOT NULL, tag_id INT NOT NULL, created_at DATETIME DEFAULT CURRENT_TIMESTAMP, UNIQUE KEY unique_user_tag (user_id, tag_id), FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE, FOREIGN KEY (tag_id) REFERENCES tags(id) ON DELETE CASCADE);"
+            },
+            "notification_outbox": {
+                "description": "알림 영구 저장 테이블 (NOTIFY_OUTBOX=mysql 일 때 사용)",
+                "schema": {
+                    "id": "BIGINT PRIMARY KEY AUTO_INCREMENT (롱폴링 event_id)",
+                    "recipient_email": "VARCHAR(255) NOT NULL",
+                    "payload": "JSON NOT NULL",
+                    "created_at": "DATETIME(3) DEFAULT CURRENT_TIMESTAMP(3)",
+                    "delivered_at": "DATETIME(3) NULL (전달 확인 시각)"
+                },
+                "create_sql": "CREATE TABLE notification_outbox (id BIGINT PRIMARY KEY AUTO_INCREMENT, recipient_email VARCHAR(255) NOT NULL, payload JSON NOT NULL, created_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3), delivered_at DATETIME(3) NULL, KEY idx_outbox_recipient (recipient_email, delivered_at, id), KEY idx_outbox_created (created_at));"
             }
         }
     })
@@ -1497,6 +2111,18 @@ if __name__ == '__main__':
     print(f"  DB_NAME: {DB_CONFIG['database']}")
     print(f"  DB_USER: {DB_CONFIG['user']}")
     print(f"  DB_PASSWORD: {'✅ 설정됨' if DB_CONFIG['password'] else '❌ 설정 필요'}")
+    print(f"  NOTIFY_OUTBOX: {'✅ mysql' if isinstance(notification_backend, NotificationOutbox) else '메모리 (NOTIFY_OUTBOX=mysql 로 영구 저장)'}")
+    print(f"  DB_POOL: 최대 {DB_POOL_CONFIG['max_size']}개, 대기 {DB_POOL_CONFIG['acquire_timeout']}초 (DB_POOL_SIZE, DB_POOL_TIMEOUT)")
     print(f"  JWT_SECRET_KEY: {'✅ 설정됨' if os.getenv('JWT_SECRET_KEY') else '⚠️  기본값 사용'}")
     
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # 태그 사전 로드
+    tag_index.ensure_loaded(db_connection)
+    
+    if SERVER_MODE == 'gevent':
+        # 롱폴링 대기자가 많아도 스레드가 늘지 않음
+        # (단, 포스트잇 검출 같은 CPU 작업 중에는 다른 greenlet이 기다림)
+        from gevent.pywsgi import WSGIServer
+        print("🚀 gevent 서버로 실행합니다 (롱폴링 대기 = greenlet)")
+        WSGIServer(('0.0.0.0', 5000), app).serve_forever()
+    else:
+        app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
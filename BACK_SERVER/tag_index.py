@@ -0,0 +1,160 @@
+"""
+프로세스 전역 태그 사전 (이름 <-> id)
+tags 테이블은 작고 거의 바뀌지 않으므로 서버 시작 시 한 번 읽어 메모리에 두고,
+새 태그가 만들어지면 커밋 직후 add()로 바로 반영합니다 (write-through).
+다른 워커가 만든 태그처럼 사전에 없는 이름은 lookup_id()가 DB에서 찾아 채워 넣습니다.
+
+사용 예:
+    from tag_index import tag_index
+    tag_id = tag_index.lookup_id('운동', cursor)
+"""
+import threading
+
+
+def normalize_name(name):
+    """
+    사전 키: tags.name의 collation(대소문자 구분 없음)과 맞추기 위해 casefold
+    'React'와 'react'는 DB에서 같은 행이므로 사전에서도 같은 키
+    """
+    return name.casefold()
+
+
+class TagIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_name = {}
+        self._by_id = {}
+        self.loaded = False
+        self._hits = 0
+        self._misses = 0
+
+    def load(self, cursor):
+        """tags 테이블 전체를 읽어 사전을 새로 구성"""
+        cursor.execute("SELECT id, name FROM tags")
+        rows = cursor.fetchall()
+        with self._lock:
+            self._by_name = {normalize_name(row['name']): row['id'] for row in rows}
+            self._by_id = {row['id']: row['name'] for row in rows}
+            self.loaded = True
+        return len(rows)
+
+    def ensure_loaded(self, connection_factory):
+        """아직 읽지 않았다면 한 번 읽어 둠 (with connection_factory() as connection: 형태)"""
+        if self.loaded:
+            return
+        try:
+            with connection_factory() as connection:
+                if connection is None:
+                    return
+                cursor = connection.cursor()
+                count = self.load(cursor)
+                cursor.close()
+            print(f"🏷️  태그 사전 로드 완료: {count}개")
+        except Exception as e:
+            # 로드하지 못해도 lookup_id()가 DB에서 찾아 채우므로 동작에는 문제 없음
+            print(f"❌ 태그 사전 로드 오류: {e}")
+
+    def get_id(self, name):
+        with self._lock:
+            tag_id = self._by_name.get(normalize_name(name))
+            if tag_id is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+            return tag_id
+
+    def get_name(self, tag_id):
+        with self._lock:
+            return self._by_id.get(tag_id)
+
+    def add(self, name, tag_id):
+        """
+        커밋된 태그를 사전에 반영 (롤백될 수 있는 트랜잭션 안에서는 호출하지 말 것)
+        name은 DB에 저장된 표기를 넘길 것 (id -> 이름은 처음 반영된 표기를 유지)
+        """
+        with self._lock:
+            self._by_name[normalize_name(name)] = tag_id
+            self._by_id.setdefault(tag_id, name)
+
+    def lookup_id(self, name, cursor):
+        """사전에서 찾고, 없으면 DB에서 조회해 사전에 채워 넣음. 없는 태그면 None"""
+        tag_id = self.get_id(name)
+        if tag_id is not None:
+            return tag_id
+        cursor.execute("SELECT id, name FROM tags WHERE name = %s", (name,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        # 입력 표기가 아니라 DB에 저장된 표기로 반영
+        self.add(row['name'], row['id'])
+        return row['id']
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': self.loaded,
+                'tags': len(self._by_name),
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+
+tag_index = TagIndex()
+
+
+def upsert_challenge_tags(cursor, challenge_id, names, index=tag_index):
+    """
+    도전과제에 태그들을 한 번에 연결 (태그 수와 관계없이 보통 3번의 쿼리)
+    1. 사전에 없는 태그만 다중 행 INSERT ... ON DUPLICATE KEY UPDATE (tags.name UNIQUE 필요)
+    2. 그 태그들의 id를 잠금 읽기(LOCK IN SHARE MODE)로 IN (...) 한 번에 조회
+       REPEATABLE READ의 일반 SELECT는 트랜잭션 스냅샷 이후 다른 트랜잭션이 커밋한 태그를 보지 못해
+       INSERT는 중복 키로 끝났는데 id를 못 찾는 경우가 생김 → 잠금 읽기는 최신 커밋을 읽음
+    3. challenge_tags는 executemany로 다중 행 INSERT 한 번
+    id를 끝내 찾지 못한 태그가 있으면 조용히 빠뜨리지 않고 RuntimeError
+    반환: (tag_ids, pending)
+        tag_ids : 연결된 태그 id 목록 (입력 순서, 중복 제거)
+        pending : 커밋 후 index.add()로 반영할 (name, id) 목록
+    """
+    names = list(dict.fromkeys(name for name in names if name))
+    if not names:
+        return [], []
+
+    resolved = {}
+    unknown = []
+    for name in names:
+        tag_id = index.get_id(name)
+        if tag_id is None:
+            unknown.append(name)
+        else:
+            resolved[name] = tag_id
+
+    pending = []
+    if unknown:
+        values = ', '.join(['(%s)'] * len(unknown))
+        cursor.execute(f"INSERT INTO tags (name) VALUES {values} ON DUPLICATE KEY UPDATE name = name", unknown)
+        placeholders = ', '.join(['%s'] * len(unknown))
+        cursor.execute(
+            f"SELECT id, name FROM tags WHERE name IN ({placeholders}) LOCK IN SHARE MODE",
+            unknown
+        )
+        rows = cursor.fetchall()
+        # 대소문자를 구분하지 않는 collation이면 DB에 저장된 표기가 입력과 다를 수 있음
+        found = {normalize_name(row['name']): row for row in rows}
+        for name in unknown:
+            row = found.get(normalize_name(name))
+            if row is None:
+                # casefold와 collation 규칙이 다른 경우(악센트 등)는 DB 비교에 맡김
+                cursor.execute("SELECT id, name FROM tags WHERE name = %s LOCK IN SHARE MODE", (name,))
+                row = cursor.fetchone()
+                if row is None:
+                    raise RuntimeError(f"태그 id를 확인하지 못했습니다: {name}")
+                found[normalize_name(name)] = row
+            resolved[name] = row['id']
+        pending = list(dict.fromkeys((row['name'], row['id']) for row in found.values()))
+
+    tag_ids = list(dict.fromkeys(resolved[name] for name in names))
+    cursor.executemany(
+        "INSERT INTO challenge_tags (challenge_id, tag_id) VALUES (%s, %s)",
+        [(challenge_id, tag_id) for tag_id in tag_ids]
+    )
+    return tag_ids, pending
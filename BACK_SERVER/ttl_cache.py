@@ -0,0 +1,84 @@
+"""
+프로세스 내부 TTL + LRU 캐시
+- 최대 항목 수(maxsize)를 넘으면 가장 오래 사용하지 않은 항목부터 제거
+- 항목마다 ttl초가 지나면 만료
+- 여러 요청 스레드에서 동시에 사용해도 안전 (Lock)
+- 적중/실패 횟수 통계 제공
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, maxsize=1024, ttl=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self._misses += 1
+                return default
+            value, expires_at = item
+            if expires_at <= now:
+                del self._data[key]
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if self._data.pop(key, _MISSING) is not _MISSING:
+                self._invalidations += 1
+                return True
+            return False
+
+    def delete_where(self, predicate):
+        """predicate(key)가 참인 항목을 모두 제거하고 제거한 개수를 반환"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            self._invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations
+            }
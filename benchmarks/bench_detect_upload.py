@@ -0,0 +1,132 @@
+"""
+포스트잇 검출 업로드 벤치마크: 요청 형식(multipart / image/jpeg 본문 / JSON base64) × 응답 형식(JSON / 바이너리)
+server.py /api/detect-postit 와 utils/imageProcessServer.py /detect-postit 을 Flask 테스트 클라이언트로 호출해
+초당 요청 수, 요청/응답 바이트 수(본문 기준), 측정 구간의 최대 RSS 증가량을 비교
+(네트워크 없이 같은 프로세스에서 호출하므로 전송 시간은 제외, 파싱/인코딩/검출 비용만 비교)
+
+실행:
+    python benchmarks/bench_detect_upload.py [반복 횟수] [사진 경로]
+사진을 주지 않으면 노란 정사각형을 그린 합성 JPEG(4000x3000)로 측정
+매 요청 전에 검출 결과 캐시를 비우므로 항상 검출까지 수행 (BENCH_KEEP_CACHE=1이면 캐시 유지)
+server.py는 DB 없이 호출하도록 사용자 캐시에 토큰을 미리 넣어 둠 (의존 패키지가 없으면 건너뜀)
+"""
+import base64
+import datetime
+import io
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'utils'))
+sys.path.insert(0, os.path.join(ROOT, 'BACK_SERVER'))
+import imageProcessServer as ips  # noqa: E402
+from memory_probe import MemoryProbe  # noqa: E402
+
+REPEAT = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 20
+PATHS = [arg for arg in sys.argv[1:] if not arg.isdigit()]
+KEEP_CACHE = os.getenv('BENCH_KEEP_CACHE', '0') == '1'
+
+
+def synthetic_jpeg(width=4000, height=3000):
+    """회색 잡음 배경에 노란 정사각형(긴 변의 1/5)을 그린 JPEG"""
+    rng = np.random.default_rng(0)
+    img = Image.fromarray(rng.integers(60, 140, (height, width, 3), dtype=np.uint8))
+    side = max(width, height) // 5
+    x, y = (width - side) // 2, (height - side) // 2
+    ImageDraw.Draw(img).rectangle([x, y, x + side, y + side], fill=(240, 235, 70))
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def request_kwargs(kind, data):
+    if kind == 'multipart':
+        return {'data': {'image': (io.BytesIO(data), 'photo.jpg', 'image/jpeg')},
+                'content_type': 'multipart/form-data'}
+    if kind == 'raw':
+        return {'data': data, 'content_type': 'image/jpeg'}
+    return {'json': {'image': 'data:image/jpeg;base64,' + base64.b64encode(data).decode('ascii')}}
+
+
+def ips_target():
+    ips.app.testing = True
+
+    def clear():
+        ips.detection_cache = ips.DetectionCache(ips.detection_cache.maxsize)
+
+    return 'imageProcessServer /detect-postit', ips.app.test_client(), '/detect-postit', {}, clear
+
+
+def server_target():
+    try:
+        import jwt
+        import server
+    except ImportError as e:
+        print(f"server.py 건너뜀 (의존 패키지 없음: {e})")
+        return None
+    server.app.testing = True
+    token = jwt.encode({'user_id': 1, 'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)},
+                       server.app.config['JWT_SECRET_KEY'], algorithm='HS256')
+    server.identity_cache.set((1, token), {'id': 1, 'email': 'bench@x', 'name': 'bench', 'isAdmin': 0})
+    headers = {'Authorization': f'Bearer {token}'}
+    return 'server.py /api/detect-postit', server.app.test_client(), '/api/detect-postit', headers, server.detection_cache.clear
+
+
+def run_case(client, url, headers, clear, kind, binary, data):
+    probe = MemoryProbe()
+    sent = received = 0
+    status = None
+    elapsed = 0.0
+    with probe.measure() as memory:
+        for _ in range(REPEAT):
+            if not KEEP_CACHE:
+                clear()
+            start = time.perf_counter()
+            response = client.post(url + ('?format=binary' if binary else ''), headers=headers,
+                                   **request_kwargs(kind, data))
+            body = response.get_data()
+            elapsed += time.perf_counter() - start
+            sent += int(response.request.headers.get('Content-Length', 0))
+            received += len(body)
+            status = response.status_code
+    return {
+        'rps': REPEAT / elapsed if elapsed else 0.0,
+        'sent': sent // REPEAT,
+        'received': received // REPEAT,
+        'peak_kb': memory['peak_rss_kb'],
+        'growth_kb': memory['rss_growth_kb'],
+        'status': status
+    }
+
+
+def main():
+    if PATHS:
+        with open(PATHS[0], 'rb') as f:
+            data = f.read()
+        name = os.path.basename(PATHS[0])
+    else:
+        data = synthetic_jpeg()
+        name = 'synthetic 4000x3000'
+    print(f"사진: {name} ({len(data)} bytes), 반복 {REPEAT}회, 캐시 {'유지' if KEEP_CACHE else '매번 비움'}")
+
+    targets = [ips_target(), server_target()]
+    for target in targets:
+        if target is None:
+            continue
+        title, client, url, headers, clear = target
+        print(f"\n{title}")
+        print(f"{'요청':<10}{'응답':<8}{'req/s':>9}{'요청 B':>12}{'응답 B':>12}{'최대 RSS KB':>14}{'증가 KB':>10}{'상태':>6}")
+        for kind in ('multipart', 'raw', 'json'):
+            for binary in (False, True):
+                result = run_case(client, url, headers, clear, kind, binary, data)
+                print(f"{kind:<10}{'binary' if binary else 'json':<8}{result['rps']:>9.1f}"
+                      f"{result['sent']:>12}{result['received']:>12}"
+                      f"{result['peak_kb']:>14}{result['growth_kb']:>10}{result['status']:>6}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+포스트잇 검출 벤치마크: 원본 해상도 vs 피라미드(긴 변 PYRAMID_MAX_SIDE px) vs 피라미드 + 경계 보정
+같은 사진에 대해 원본 해상도 bbox를 기준으로 IoU와 처리 시간을 비교
+(BACK_SERVER/postit_detection.py의 locate_postit / locate_postit_bytes 사용)
+
+실행:
+    python benchmarks/bench_pyramid.py [반복 횟수] [사진 경로 ...]
+사진을 주지 않으면 노란 정사각형을 그린 합성 JPEG(1200~4000px)로 측정
+bytes 열은 locate_postit_bytes(축소 디코딩 포함) 시간이고, 나머지는 이미 디코딩된 PIL 이미지 기준
+"""
+import io
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'BACK_SERVER'))
+import postit_detection as detection  # noqa: E402
+
+REPEAT = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 5
+PATHS = [arg for arg in sys.argv[1:] if not arg.isdigit()]
+
+
+def iou(a, b):
+    """두 (x, y, w, h) bbox의 IoU (하나라도 None이면 둘 다 None일 때만 1)"""
+    if a is None or b is None:
+        return 1.0 if a is b else 0.0
+    x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+    x1, y1 = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    inter = max(0, x1 - x0) * max(0, y1 - y0)
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+
+def synthetic_jpeg(width, height, seed):
+    """회색 잡음 배경에 살짝 기운 노란 정사각형(긴 변의 1/5)을 그린 JPEG"""
+    rng = np.random.default_rng(seed)
+    background = rng.integers(60, 140, (height, width, 3), dtype=np.uint8)
+    img = Image.fromarray(background)
+    side = max(width, height) // 5
+    x = int(rng.integers(0, width - side))
+    y = int(rng.integers(0, height - side))
+    ImageDraw.Draw(img).polygon(
+        [(x, y + 4), (x + side, y), (x + side + 4, y + side), (x + 2, y + side + 2)],
+        fill=(240, 235, 70)
+    )
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=90)
+    return f'synthetic {width}x{height}', buffer.getvalue()
+
+
+def samples():
+    if PATHS:
+        for path in PATHS:
+            with open(path, 'rb') as f:
+                yield os.path.basename(path), f.read()
+        return
+    for i, (w, h) in enumerate([(1200, 900), (2000, 1500), (3024, 4032), (4000, 3000)]):
+        yield synthetic_jpeg(w, h, seed=i)
+
+
+def timed(fn):
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(times)
+
+
+def main():
+    modes = [
+        ('pyramid', dict(pyramid=True, refine=False)),
+        ('pyramid+refine', dict(pyramid=True, refine=True)),
+    ]
+    print(f"반복 {REPEAT}회, 중앙값 (ms) / 원본 해상도 bbox 대비 IoU")
+    print(f"{'사진':<24}{'full':>10}" + ''.join(f"{name:>18}{'IoU':>8}" for name, _ in modes) + f"{'bytes':>10}{'IoU':>8}")
+    for name, data in samples():
+        pil_img = Image.open(io.BytesIO(data))
+        pil_img.load()
+        (full, _), full_ms = timed(lambda: detection.locate_postit(pil_img, pyramid=False, refine=False))
+        row = f"{name:<24}{full_ms:>10.1f}"
+        for _, options in modes:
+            (bbox, _), ms = timed(lambda: detection.locate_postit(pil_img, **options))
+            row += f"{ms:>18.1f}{iou(full, bbox):>8.3f}"
+        (bbox, _), ms = timed(lambda: detection.locate_postit_bytes(data))
+        row += f"{ms:>10.1f}{iou(full, bbox):>8.3f}"
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+도전과제 태그 연결 벤치마크: 태그별 SELECT/INSERT 반복(기존 방식) vs upsert_challenge_tags
+태그 1/10/50개, 모두 새 태그(사전 미적중, 가장 느린 경우)로 측정하고 매 반복 ROLLBACK 하므로 DB에 남지 않음
+
+실행 (server.py와 같은 DB 환경변수 사용):
+    DB_PASSWORD=... python benchmarks/bench_tag_upsert.py [반복 횟수]
+BENCH_CHALLENGE_ID를 주지 않으면 challenges의 첫 번째 행에 연결해 봄
+"""
+import os
+import statistics
+import sys
+import time
+import uuid
+
+import pymysql
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'BACK_SERVER'))
+from tag_index import TagIndex, upsert_challenge_tags  # noqa: E402
+
+
+def connect():
+    return pymysql.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME', 'ChallengeDB'),
+        charset='utf8mb4',
+        cursorclass=pymysql.cursors.DictCursor,
+        autocommit=False
+    )
+
+
+def link_per_tag(cursor, challenge_id, names):
+    """기존 create_challenge의 태그 처리 (태그마다 SELECT + INSERT + INSERT)"""
+    for name in names:
+        cursor.execute("SELECT id FROM tags WHERE name = %s", (name,))
+        row = cursor.fetchone()
+        if row:
+            tag_id = row['id']
+        else:
+            cursor.execute("INSERT INTO tags (name) VALUES (%s)", (name,))
+            tag_id = cursor.lastrowid
+        cursor.execute("INSERT INTO challenge_tags (challenge_id, tag_id) VALUES (%s, %s)", (challenge_id, tag_id))
+
+
+def link_upsert(cursor, challenge_id, names):
+    upsert_challenge_tags(cursor, challenge_id, names, index=TagIndex())
+
+
+def measure(connection, challenge_id, fn, count, repeat):
+    timings = []
+    for _ in range(repeat):
+        names = [f"bench-{uuid.uuid4().hex[:12]}" for _ in range(count)]
+        cursor = connection.cursor()
+        started = time.perf_counter()
+        fn(cursor, challenge_id, names)
+        timings.append((time.perf_counter() - started) * 1000)
+        connection.rollback()
+        cursor.close()
+    return statistics.median(timings), max(timings)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    connection = connect()
+    cursor = connection.cursor()
+    challenge_id = os.getenv('BENCH_CHALLENGE_ID')
+    if challenge_id is None:
+        cursor.execute("SELECT id FROM challenges ORDER BY id LIMIT 1")
+        row = cursor.fetchone()
+        if row is None:
+            sys.exit("challenges 테이블이 비어 있습니다 (BENCH_CHALLENGE_ID 지정 필요)")
+        challenge_id = row['id']
+    cursor.close()
+
+    print(f"도전과제 {challenge_id}, 반복 {repeat}회 (ms, 중앙값 / 최대)")
+    print(f"{'태그 수':>6} | {'태그별 반복':>18} | {'upsert':>18} | 배속")
+    for count in (1, 10, 50):
+        old_median, old_max = measure(connection, challenge_id, link_per_tag, count, repeat)
+        new_median, new_max = measure(connection, challenge_id, link_upsert, count, repeat)
+        print(f"{count:>6} | {old_median:8.2f} / {old_max:7.2f} | {new_median:8.2f} / {new_max:7.2f} | "
+              f"{old_median / new_median:.1f}x")
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -270,6 +270,20 @@ const notificationAPI = {
     }
   },
 
+  // 롱폴링: 새 알림이 오거나 wait초가 지날 때까지 서버가 응답을 보류
+  // 응답의 last_event_id를 다음 호출에 그대로 넘겨야 받은 알림이 확인 처리됨
+  pollNotifications: async (userEmail, lastEventId = 0, wait = 25) => {
+    try {
+      const response = await api.get(`/notify/${userEmail}/poll`, {
+        params: { wait, last_event_id: lastEventId },
+      });
+      return response.data;
+    } catch (error) {
+      console.error('서버 알림 롱폴링 오류:', error);
+      return { success: false, notifications: [], last_event_id: lastEventId };
+    }
+  },
+
   sendTestNotification: async (userEmail, notificationData) => {
     try {
       const response = await api.post(`/notify/test/${userEmail}`, notificationData);
@@ -287,6 +301,24 @@ export const ocrAPI = {
     const response = await api.post('/detect-postit', { image: imageData });
     return response.data;
   },
+
+  // base64 없이 사진 파일을 multipart로 전송, binary=true면 잘라낸 포스트잇을 JPEG(blob)로 받음
+  detectPostitFile: async (imageUri, { binary = false } = {}) => {
+    const formData = new FormData();
+    formData.append('image', {
+      uri: imageUri,
+      name: `postit-${Date.now()}.jpg`,
+      type: 'image/jpeg',
+    });
+    const response = await api.post('/detect-postit', formData, {
+      params: binary ? { format: 'binary' } : undefined,
+      responseType: binary ? 'blob' : 'json',
+    });
+    if (binary) {
+      return { image: response.data, bbox: response.headers['x-postit-bbox'] };
+    }
+    return response.data;
+  },
 };
 
 // 통합 API 객체 내보내기
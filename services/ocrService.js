@@ -686,22 +686,31 @@ const detectPostitServer = async (imageUri) => {
   try {
     console.log('백엔드 서버 포스트잇 검출 시작');
     
-    // 이미지를 base64로 변환
-    const base64Image = await imageToBase64(imageUri);
-    
     // 토큰 가져오기
     const token = await getToken();
     
+    let body;
+    const headers = { 'Authorization': `Bearer ${token}` };
+    if (Platform.OS === 'web') {
+      // 웹: 기존처럼 base64 JSON으로 전송
+      const base64Image = await imageToBase64(imageUri);
+      headers['Content-Type'] = 'application/json';
+      body = JSON.stringify({ image: base64Image });
+    } else {
+      // 모바일: base64 변환 없이 파일을 multipart로 그대로 전송 (전송량 약 25% 감소)
+      body = new FormData();
+      body.append('image', {
+        uri: imageUri,
+        name: `postit-${Date.now()}.jpg`,
+        type: 'image/jpeg',
+      });
+    }
+    
     // 백엔드 서버에 포스트잇 검출 요청
     const response = await fetch(`${BASE_URL}/api/detect-postit`, {
       method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-        'Authorization': `Bearer ${token}`
-      },
-      body: JSON.stringify({
-        image: base64Image
-      })
+      headers,
+      body
     });
     
     const result = await response.json();
@@ -22,6 +22,7 @@ class PushNotificationService {
     this.currentUserEmail = null;
     this.intervalId = null;
     this.lastNotificationCheck = 0;
+    this.pollGeneration = 0; // 롱폴링 루프 구분용 (중지/재시작 시 이전 루프 종료)
   }
 
   // 알림 권한 요청 및 초기화
@@ -429,29 +430,90 @@ class PushNotificationService {
       clearInterval(this.intervalId);
     }
 
-    // 즉시 한번 체크
+    // 즉시 한번 체크 (관심 태그 알림은 접속하지 않았던 동안의 것까지 한 번 확인)
     console.log('🔍 초기 알림 체크 실행...');
     await this.checkExpiringChallenges();
     await this.checkNewChallengesByInterests();
 
-    // 5분마다 체크 (개발 중에는 30초로 줄임)
-    const interval = 30 * 1000; // 30초 (개발용)
+    // 새 도전과제/인증 알림은 서버 롱폴링으로 바로 받음 (도전과제 전체 목록을 주기적으로 받지 않음)
+    this.runNotificationPoll(userEmail);
+
+    // 만료 임박 체크는 시간 기준이라 5분마다 확인
+    const interval = 5 * 60 * 1000;
     this.intervalId = setInterval(async () => {
-      console.log('🔍 주기적 알림 체크 실행...');
+      console.log('🔍 주기적 만료 알림 체크 실행...');
       await this.checkExpiringChallenges();
-      await this.checkNewChallengesByInterests();
     }, interval);
 
-    console.log(`✅ 알림 시스템이 시작되었습니다. (${interval/1000}초마다 체크)`);
+    console.log(`✅ 알림 시스템이 시작되었습니다. (롱폴링 + 만료 체크 ${interval/1000}초마다)`);
     return true;
   }
 
+  // 서버 알림 롱폴링 루프: 알림이 오면 서버가 바로 응답, 없으면 wait초 뒤 빈 응답 → 다시 요청
+  async runNotificationPoll(userEmail) {
+    const generation = ++this.pollGeneration;
+    const isCurrent = () => this.pollGeneration === generation && this.currentUserEmail === userEmail;
+    const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+    let lastEventId = 0;
+    let failures = 0;
+
+    console.log('📡 알림 롱폴링 시작:', userEmail);
+    while (isCurrent()) {
+      const result = await api.notification.pollNotifications(userEmail, lastEventId, 25);
+      if (!isCurrent()) break;
+
+      if (!result.success) {
+        // 서버 오류/네트워크 끊김: 1초부터 최대 30초까지 늘려가며 재시도
+        failures += 1;
+        await sleep(Math.min(30000, 1000 * 2 ** failures));
+        continue;
+      }
+      failures = 0;
+
+      for (const notification of result.notifications || []) {
+        await this.handleServerNotification(notification);
+      }
+      lastEventId = result.last_event_id ?? lastEventId;
+
+      // 서버 대기 슬롯이 가득 차 기다리지 않고 응답한 경우 바로 다시 요청하지 않음
+      if (result.waited === false && !(result.notifications || []).length) {
+        await sleep(5000);
+      }
+    }
+    console.log('📴 알림 롱폴링 종료:', userEmail);
+  }
+
+  // 서버에서 받은 알림 표시
+  async handleServerNotification(notification) {
+    // 초기 전체 체크와 같은 기록을 사용해 같은 도전과제 알림이 두 번 뜨지 않도록 함
+    const notificationId = notification.type === 'new_challenge'
+      ? `new_challenge_${notification.challenge_id}`
+      : null;
+    if (notificationId && await this.checkIfAlreadyNotified(notificationId)) {
+      return;
+    }
+
+    await this.sendNotification(
+      notification.title || '🔔 새 알림',
+      notification.message || '',
+      {
+        type: notification.type,
+        challengeId: notification.challenge_id,
+        screen: 'ChallengeDetail',
+      }
+    );
+    if (notificationId) {
+      await this.markAsNotified(notificationId);
+    }
+  }
+
   // 알림 시스템 중지
   stopNotificationSystem() {
     if (this.intervalId) {
       clearInterval(this.intervalId);
       this.intervalId = null;
     }
+    this.pollGeneration += 1; // 진행 중인 롱폴링 루프는 응답을 받는 대로 종료
     this.currentUserEmail = null;
     console.log('🛑 알림 시스템이 중지되었습니다.');
   }
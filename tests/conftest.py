@@ -0,0 +1,25 @@
+"""
+BACK_SERVER/, utils/의 모듈은 서로를 최상위 모듈로 import 하므로 (from fanout import ...) 경로에 추가
+"""
+import importlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ('BACK_SERVER', 'utils'):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# 포스트잇 검출 코드는 BACK_SERVER/postit_detection.py 한 곳에 있음 (app_umai.py, server.py, utils/imageProcessServer.py가 import)
+DETECTOR_DEPENDENCIES = ('numpy', 'cv2', 'PIL')
+
+
+@pytest.fixture
+def detector():
+    """검출 함수가 들어 있는 모듈 (의존 패키지가 없으면 건너뜀)"""
+    for dependency in DETECTOR_DEPENDENCIES:
+        pytest.importorskip(dependency)
+    return importlib.import_module('postit_detection')
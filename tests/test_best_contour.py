@@ -0,0 +1,85 @@
+"""
+best_contour(상한 가지치기)가 score_contours(모든 후보 계산)와 같은 (bbox, 점수)를 고르는지 확인
+동점일 때 앞 순서의 윤곽선을 고르는 것까지 동일해야 함
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+
+def contours(mask):
+    cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return cnts
+
+
+def assert_same(detector, mask, scale=1.0):
+    h, w = mask.shape
+    cnts = contours(mask)
+    expected, expected_score, candidates = detector.score_contours(cnts, mask, w, h, scale)
+    best, best_score = detector.best_contour(cnts, mask, w, h, scale)
+    assert (best, best_score) == (expected, expected_score)
+    return best, candidates
+
+
+def random_mask(seed, w=480, h=360):
+    rng = np.random.default_rng(seed)
+    mask = np.zeros((h, w), np.uint8)
+    for _ in range(int(rng.integers(1, 12))):
+        cx, cy = int(rng.integers(0, w)), int(rng.integers(0, h))
+        size = int(rng.integers(10, 180))
+        kind = rng.integers(3)
+        if kind == 0:
+            cv2.rectangle(mask, (cx, cy), (cx + size, cy + int(size * rng.uniform(0.5, 1.5))), 255, -1)
+        elif kind == 1:
+            box = cv2.boxPoints(((cx, cy), (size, size * rng.uniform(0.6, 1.4)), float(rng.uniform(0, 90))))
+            cv2.fillPoly(mask, [box.astype(np.int32)], 255)
+        else:
+            cv2.ellipse(mask, (cx, cy), (size // 2, int(size * rng.uniform(0.3, 0.7))), 0, 0, 360, 255, -1)
+    # 채움 비율이 달라지도록 잡음 구멍
+    holes = rng.random(mask.shape) < 0.03
+    mask[holes] = 0
+    return mask
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('scale', [1.0, 0.5])
+def test_random_masks(detector, seed, scale):
+    assert_same(detector, random_mask(seed), scale)
+
+
+def test_identical_squares_tie(detector):
+    """이미지 중앙에서 같은 거리에 있는 같은 크기 정사각형 → 점수가 정확히 같음"""
+    mask = np.zeros((400, 400), np.uint8)
+    mask[150:250, 50:150] = 255
+    mask[150:250, 250:350] = 255
+    best, candidates = assert_same(detector, mask)
+
+    scores = [cand['total_score'] for cand in candidates]
+    assert len(scores) == 2 and scores[0] == scores[1] > 0
+    assert best == candidates[0]['bbox']
+
+
+def test_tie_among_several_candidates(detector):
+    mask = np.zeros((600, 600), np.uint8)
+    mask[250:350, 100:200] = 255  # 중앙에서 같은 거리의 두 정사각형 (동점)
+    mask[250:350, 400:500] = 255
+    mask[20:60, 20:300] = 255     # 길쭉한 직사각형 (낮은 점수)
+    mask[480:520, 480:520] = 255  # MIN_AREA 미만
+    best, candidates = assert_same(detector, mask)
+    top = max(cand['total_score'] for cand in candidates)
+    assert [cand['bbox'] for cand in candidates if cand['total_score'] == top][0] == best
+
+
+def test_tie_with_scale(detector):
+    mask = np.zeros((200, 200), np.uint8)
+    mask[70:130, 20:80] = 255
+    mask[70:130, 120:180] = 255
+    assert_same(detector, mask, scale=0.5)
+
+
+def test_nothing_large_enough(detector):
+    mask = np.zeros((300, 300), np.uint8)
+    mask[10:30, 10:30] = 255
+    assert assert_same(detector, mask)[0] is None
+    assert detector.best_contour([], mask, 300, 300) == (None, 0)
@@ -0,0 +1,96 @@
+"""
+카운터 재계산: 값이 바뀐 행이 있을 때만 커밋 후 on_fixed가 호출되는지, 스레드가 stop_event로 멈추는지 확인 (가짜 연결 사용)
+"""
+import threading
+from contextlib import contextmanager
+
+import pytest
+
+from counters import ensure_reconciler, reconcile_once, start_reconciler
+
+
+class FakeCursor:
+    def __init__(self, rowcounts):
+        self._rowcounts = iter(rowcounts)
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.rowcount = next(self._rowcounts)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rowcounts, events):
+        self._rowcounts = rowcounts
+        self.events = events
+
+    def cursor(self):
+        return FakeCursor(self._rowcounts)
+
+    def commit(self):
+        self.events.append('commit')
+
+
+def factory_for(rowcounts, events):
+    @contextmanager
+    def factory():
+        yield FakeConnection(rowcounts, events)
+    return factory
+
+
+def test_on_fixed_runs_after_commit_when_rows_changed():
+    events = []
+    fixed = reconcile_once(factory_for([2, 0], events), lambda fixed: events.append(('fixed', fixed)))
+    assert fixed == {'challenges': 2, 'tags': 0}
+    assert events == ['commit', ('fixed', {'challenges': 2, 'tags': 0})]
+
+
+def test_on_fixed_not_called_when_nothing_changed():
+    events = []
+    reconcile_once(factory_for([0, 0], events), lambda fixed: events.append(('fixed', fixed)))
+    assert events == ['commit']
+
+
+def test_no_connection_skips_pass():
+    @contextmanager
+    def factory():
+        yield None
+
+    assert reconcile_once(factory, lambda fixed: pytest.fail('on_fixed 호출됨')) is None
+
+
+def test_reconciler_thread_runs_and_stops():
+    events = []
+    called = threading.Event()
+    stop = threading.Event()
+
+    def on_fixed(fixed):
+        events.append(('fixed', fixed))
+        called.set()
+
+    thread = start_reconciler(factory_for([1, 1], events), interval=3600, on_fixed=on_fixed, stop_event=stop)
+    assert called.wait(timeout=5)
+    stop.set()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert events == ['commit', ('fixed', {'challenges': 1, 'tags': 1})]
+
+
+def test_ensure_reconciler_starts_once_per_process():
+    events = []
+    stop = threading.Event()
+    factory = factory_for([0, 0] * 10, events)
+
+    first = ensure_reconciler(factory, interval=3600, stop_event=stop)
+    assert ensure_reconciler(factory, interval=3600) is first
+    stop.set()
+    first.join(timeout=5)
+
+    # 스레드가 끝났으면 다시 시작
+    again_stop = threading.Event()
+    again = ensure_reconciler(factory, interval=3600, stop_event=again_stop)
+    assert again is not first and again.is_alive()
+    again_stop.set()
+    again.join(timeout=5)
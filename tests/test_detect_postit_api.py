@@ -0,0 +1,170 @@
+"""
+포스트잇 검출 API (server.py /api/detect-postit, utils/imageProcessServer.py /detect-postit)
+multipart / image/* 본문 / 기존 JSON base64 요청, ?format=binary 응답, 검출 실패 시 404 확인
+"""
+import base64
+import datetime
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("flask")
+pytest.importorskip("flask_cors")
+Image = pytest.importorskip("PIL.Image")
+
+
+def jpeg(with_postit=True):
+    """회색 배경(800x600)에 노란 정사각형(250px)을 그린 JPEG 바이트"""
+    pixels = np.full((600, 800, 3), 110, np.uint8)
+    if with_postit:
+        pixels[180:430, 280:530] = (240, 235, 70)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format='JPEG', quality=95)
+    return buffer.getvalue()
+
+
+def request_kwargs(kind, data):
+    if kind == 'multipart':
+        return {'data': {'image': (io.BytesIO(data), 'photo.jpg', 'image/jpeg')},
+                'content_type': 'multipart/form-data'}
+    if kind == 'raw':
+        return {'data': data, 'content_type': 'image/jpeg'}
+    return {'json': {'image': 'data:image/jpeg;base64,' + base64.b64encode(data).decode('ascii')}}
+
+
+BODY_KINDS = ['multipart', 'raw', 'json']
+
+
+def assert_near_postit(size):
+    # JPEG 경계 번짐 허용
+    assert abs(size[0] - 250) <= 6 and abs(size[1] - 250) <= 6
+
+
+# ---------- utils/imageProcessServer.py ----------
+@pytest.fixture
+def ips_client():
+    import imageProcessServer
+    imageProcessServer.app.testing = True
+    return imageProcessServer.app.test_client()
+
+
+@pytest.mark.parametrize('kind', BODY_KINDS)
+def test_ips_json_response(ips_client, kind):
+    response = ips_client.post('/detect-postit', **request_kwargs(kind, jpeg()))
+    body = response.get_json()
+    assert response.status_code == 200 and body['success']
+    assert_near_postit(body['roi_size'])
+    assert Image.open(io.BytesIO(base64.b64decode(body['roi_image']))).size == tuple(body['roi_size'])
+
+
+@pytest.mark.parametrize('kind', BODY_KINDS)
+def test_ips_binary_response(ips_client, kind):
+    response = ips_client.post('/detect-postit?format=binary', **request_kwargs(kind, jpeg()))
+    assert response.status_code == 200
+    assert response.mimetype == 'image/jpeg'
+    roi = Image.open(io.BytesIO(response.data))
+    assert response.headers['X-Original-Size'] == '800,600'
+    assert response.headers['X-Roi-Size'] == '%d,%d' % roi.size
+    assert_near_postit(roi.size)
+    assert 'X-Peak-RSS' in response.headers
+
+
+def test_ips_accept_header_selects_binary(ips_client):
+    response = ips_client.post('/detect-postit', data=jpeg(), content_type='image/jpeg',
+                               headers={'Accept': 'image/jpeg'})
+    assert response.mimetype == 'image/jpeg'
+
+
+def test_ips_not_found(ips_client):
+    response = ips_client.post('/detect-postit?format=binary', data=jpeg(False), content_type='image/jpeg')
+    assert response.status_code == 404
+    assert response.get_json()['success'] is False
+
+    response = ips_client.post('/detect-postit', data=jpeg(False), content_type='image/jpeg')
+    assert response.status_code == 200 and response.get_json()['success'] is False
+
+
+def test_ips_missing_image(ips_client):
+    assert ips_client.post('/detect-postit?format=binary', json={}).status_code == 400
+
+
+@pytest.mark.parametrize('kind', BODY_KINDS)
+def test_read_request_image(kind):
+    import imageProcessServer
+    data = jpeg()
+    with imageProcessServer.app.test_request_context('/detect-postit', method='POST', **request_kwargs(kind, data)):
+        assert imageProcessServer.read_request_image() == data
+
+
+# ---------- BACK_SERVER/server.py ----------
+SERVER_DEPENDENCIES = ('pymysql', 'bcrypt', 'jwt')
+
+
+@pytest.fixture
+def server():
+    for dependency in SERVER_DEPENDENCIES:
+        pytest.importorskip(dependency)
+    import server
+    server.app.testing = True
+    return server
+
+
+@pytest.fixture
+def auth(server):
+    """DB 없이 token_required를 통과하도록 사용자 캐시에 미리 넣어 둔 토큰"""
+    import jwt
+    token = jwt.encode({'user_id': 1, 'exp': datetime.datetime.utcnow() + datetime.timedelta(hours=1)},
+                       server.app.config['JWT_SECRET_KEY'], algorithm='HS256')
+    server.identity_cache.set((1, token), {'id': 1, 'email': 'a@x', 'name': 'a', 'isAdmin': 0})
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.mark.parametrize('kind', BODY_KINDS)
+def test_server_json_response(server, auth, kind):
+    response = server.app.test_client().post('/api/detect-postit', headers=auth, **request_kwargs(kind, jpeg()))
+    body = response.get_json()
+    assert response.status_code == 200 and body['postit_found']
+    encoded = body['postit_image'].rpartition(',')[2]
+    assert_near_postit(Image.open(io.BytesIO(base64.b64decode(encoded))).size)
+
+
+@pytest.mark.parametrize('kind', BODY_KINDS)
+def test_server_binary_response(server, auth, kind):
+    response = server.app.test_client().post('/api/detect-postit?format=binary', headers=auth,
+                                             **request_kwargs(kind, jpeg()))
+    assert response.status_code == 200
+    assert response.mimetype == 'image/jpeg'
+    x, y, w, h = map(int, response.headers['X-Postit-Bbox'].split(','))
+    assert Image.open(io.BytesIO(response.data)).size == (w, h)
+    assert abs(x - 280) <= 6 and abs(y - 180) <= 6
+    assert_near_postit((w, h))
+    assert 'X-Peak-RSS' in response.headers
+    assert response.headers['X-Peak-Overlapped'] == '0'
+
+
+def test_server_not_found(server, auth):
+    client = server.app.test_client()
+    response = client.post('/api/detect-postit?format=binary', headers=auth, data=jpeg(False), content_type='image/jpeg')
+    assert response.status_code == 404
+    assert response.get_json()['postit_found'] is False
+
+    response = client.post('/api/detect-postit', headers=auth, data=jpeg(False), content_type='image/jpeg')
+    assert response.status_code == 200 and response.get_json()['postit_found'] is False
+
+
+def test_server_missing_image(server, auth):
+    response = server.app.test_client().post('/api/detect-postit', headers=auth, json={})
+    assert response.status_code == 400
+
+
+def test_server_requires_token(server):
+    assert server.app.test_client().post('/api/detect-postit', data=jpeg(), content_type='image/jpeg').status_code == 401
+
+
+@pytest.mark.parametrize('kind', BODY_KINDS)
+def test_read_postit_image(server, kind):
+    data = jpeg()
+    with server.app.test_request_context('/api/detect-postit', method='POST', **request_kwargs(kind, data)):
+        assert server.read_postit_image() == (data, None)
@@ -0,0 +1,84 @@
+"""
+select_hsv_low(히스토그램 한 번 스캔)가 select_hsv_low_reference(inRange 반복)와
+같은 (하한, 마스크)를 고르는지 확인 - HSV_FALLBACK_STEPS의 각 단계와 마지막 fallback
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+LOWER = (27, 25, 120)
+UPPER = (35, 255, 255)
+SIDE = 100  # 10000 픽셀
+
+
+def hsv_image(groups, side=SIDE):
+    """groups: [(개수, (h, s, v)), ...] 나머지는 색상 범위 밖(파란색) 픽셀"""
+    flat = np.full((side * side, 3), (100, 200, 200), np.uint8)
+    start = 0
+    for count, value in groups:
+        flat[start:start + count] = value
+        start += count
+    return flat.reshape(side, side, 3)
+
+
+def assert_same(detector, hsv, scale=1.0):
+    expected_low, expected_mask = detector.select_hsv_low_reference(hsv, LOWER, UPPER, scale)
+    low, mask = detector.select_hsv_low(hsv, LOWER, UPPER, scale)
+    assert low == expected_low
+    assert np.array_equal(mask, expected_mask)
+
+    # 재사용 버퍼에 쓰는 경우도 같은 결과
+    low, mask = detector.select_hsv_low(hsv, LOWER, UPPER, scale, detector.ScratchBuffers())
+    assert low == expected_low
+    assert np.array_equal(mask, expected_mask)
+    return low
+
+
+@pytest.mark.parametrize('pixel, expected', [
+    ((30, 200, 200), (27, 25, 120)),  # 기본 하한으로 충분
+    ((30, 25, 120), (27, 25, 120)),   # 기본 하한 경계값
+    ((30, 10, 200), (27, 10, 120)),   # 1단계 sat=10
+    ((30, 5, 200), (27, 5, 120)),     # 1단계 sat=5
+    ((30, 5, 30), (27, 5, 30)),       # 2단계 val=30, sat=5
+    ((30, 3, 30), (27, 3, 30)),       # 2단계 val=30, sat=3
+    ((30, 1, 20), (27, 1, 20)),       # 2단계 val=20, sat=1
+    ((30, 3, 10), (27, 3, 10)),       # 2단계 val=10, sat=3
+    ((30, 1, 10), (27, 1, 10)),       # 마지막 조합으로 성공
+])
+def test_each_fallback_step(detector, pixel, expected):
+    hsv = hsv_image([(2001, pixel)])
+    assert assert_same(detector, hsv) == expected
+
+
+def test_every_step_matches_reference(detector):
+    """HSV_FALLBACK_STEPS의 모든 조합에 정확히 기준+1 / 기준 개수의 픽셀을 두어 경계 확인"""
+    for (sat, val), min_pixels in detector.HSV_FALLBACK_STEPS:
+        pixel = (30, LOWER[1] if sat is None else sat, LOWER[2] if val is None else val)
+        for count in (min_pixels, min_pixels + 1):
+            assert_same(detector, hsv_image([(count, pixel)]))
+
+
+def test_final_fallback_when_nothing_passes(detector):
+    hsv = hsv_image([(50, (30, 200, 200)), (50, (30, 0, 0))])
+    assert assert_same(detector, hsv) == (27, 1, 10)
+
+
+def test_hue_outside_range_is_ignored(detector):
+    hsv = hsv_image([(5000, (26, 200, 200)), (5000, (36, 200, 200))])
+    assert assert_same(detector, hsv) == (27, 1, 10)
+
+
+@pytest.mark.parametrize('scale', [1.0, 0.5, 0.31])
+def test_scaled_thresholds(detector, scale):
+    for count in (int(2000 * scale * scale), int(2000 * scale * scale) + 1):
+        assert_same(detector, hsv_image([(count, (30, 10, 200))]), scale)
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_random_images(detector, seed):
+    rng = np.random.default_rng(seed)
+    hsv = np.empty((120, 160, 3), np.uint8)
+    hsv[..., 0] = rng.integers(20, 40, hsv.shape[:2])
+    hsv[..., 1] = rng.integers(0, 1 + int(rng.integers(2, 60)), hsv.shape[:2])
+    hsv[..., 2] = rng.integers(0, 256, hsv.shape[:2])
+    assert_same(detector, hsv, scale=float(rng.choice([1.0, 0.5, 0.25])))
@@ -0,0 +1,58 @@
+"""
+attach_tags: 한 페이지의 도전과제 수와 관계없이 태그 쿼리 수가 일정한지 확인 (DB 없이 가짜 커서 사용)
+"""
+import pytest
+
+import hydration
+from hydration import attach_tags
+
+
+class CountingCursor:
+    """execute 호출 수를 세고, IN (...) 에 들어온 id마다 태그 두 개를 돌려주는 가짜 커서"""
+    def __init__(self):
+        self.executed = 0
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.executed += 1
+        self._rows = [
+            {'challenge_id': challenge_id, 'id': challenge_id * 10 + i, 'name': f'tag{challenge_id}-{i}'}
+            for challenge_id in (params or []) for i in range(2)
+        ]
+
+    def fetchall(self):
+        return self._rows
+
+
+def make_page(size):
+    return [{'_id': challenge_id, 'title': f'challenge {challenge_id}'} for challenge_id in range(1, size + 1)]
+
+
+def count_queries(size):
+    cursor = CountingCursor()
+    attach_tags(cursor, make_page(size))
+    return cursor.executed
+
+
+@pytest.mark.parametrize('size', [1, 20, 200])
+def test_query_count_is_constant_per_page(size):
+    assert count_queries(size) == count_queries(1) == 1
+
+
+def test_empty_page_runs_no_query():
+    assert count_queries(0) == 0
+
+
+def test_query_count_grows_only_per_chunk(monkeypatch):
+    monkeypatch.setattr(hydration, 'CHUNK_SIZE', 50)
+    assert count_queries(50) == 1
+    assert count_queries(51) == 2
+
+
+def test_tags_are_attached_to_matching_challenges():
+    cursor = CountingCursor()
+    page = attach_tags(cursor, make_page(3))
+    assert page[1]['tags'] == ['tag2-0', 'tag2-1']
+
+    page = attach_tags(CountingCursor(), make_page(2), names_only=False)
+    assert page[0]['tags'] == [{'id': 10, 'name': 'tag1-0'}, {'id': 11, 'name': 'tag1-1'}]
@@ -0,0 +1,89 @@
+"""
+DerivativeGenerator: 디코딩할 수 없는 원본만 _broken에 넣고, 일시적인 오류는 다음에 재시도
+"""
+import errno
+import os
+
+import pytest
+
+pytest.importorskip("PIL")
+from PIL import Image
+
+import image_derivatives
+from image_derivatives import DerivativeGenerator
+
+
+def make_generator(tmp_path):
+    return DerivativeGenerator(str(tmp_path), workers=1, queue_size=4)
+
+
+def test_undecodable_source_is_not_retried(tmp_path):
+    (tmp_path / 'broken.jpg').write_bytes(b'not an image')
+    generator = make_generator(tmp_path)
+
+    generator._run(['broken.jpg'])
+
+    assert 'broken.jpg' in generator._broken
+    assert generator.submit('broken.jpg') is False
+    assert generator.stats()['broken'] == 1
+
+
+def test_truncated_source_is_not_retried(tmp_path):
+    Image.new('RGB', (64, 64), 'yellow').save(tmp_path / 'cut.jpg', format='JPEG')
+    data = (tmp_path / 'cut.jpg').read_bytes()
+    (tmp_path / 'cut.jpg').write_bytes(data[:len(data) // 3])
+    generator = make_generator(tmp_path)
+
+    generator._run(['cut.jpg'])
+
+    assert 'cut.jpg' in generator._broken
+
+
+@pytest.mark.parametrize('code', [errno.ENOSPC, errno.EMFILE])
+def test_transient_error_is_retried(tmp_path, monkeypatch, code):
+    Image.new('RGB', (64, 64), 'yellow').save(tmp_path / 'ok.jpg', format='JPEG')
+    generator = make_generator(tmp_path)
+
+    def fail(*args, **kwargs):
+        raise OSError(code, os.strerror(code))
+
+    monkeypatch.setattr(image_derivatives.tempfile, 'mkstemp', fail)
+    generator._run(['ok.jpg'])
+
+    assert generator._broken == set()
+    assert generator.stats()['failed'] == 1
+
+    monkeypatch.undo()
+    generator._run(['ok.jpg'])
+    assert os.path.exists(tmp_path / 'ok_w160.webp')
+
+
+def test_unreadable_file_is_retried(tmp_path, monkeypatch):
+    Image.new('RGB', (64, 64), 'yellow').save(tmp_path / 'ok.jpg', format='JPEG')
+    generator = make_generator(tmp_path)
+    real_open = open
+
+    def fail_open(path, *args, **kwargs):
+        if str(path).endswith('ok.jpg'):
+            raise OSError(errno.EMFILE, os.strerror(errno.EMFILE))
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr('builtins.open', fail_open)
+    generator._run(['ok.jpg'])
+
+    assert generator._broken == set()
+
+
+@pytest.mark.parametrize('relative', ['../outside.jpg', 'a/../../outside.jpg', 'link/outside.jpg'])
+def test_paths_outside_root_are_rejected(tmp_path, relative):
+    root = tmp_path / 'photos'
+    root.mkdir()
+    Image.new('RGB', (64, 64), 'yellow').save(tmp_path / 'outside.jpg', format='JPEG')
+    os.symlink(tmp_path, root / 'link')
+    generator = DerivativeGenerator(str(root), workers=1, queue_size=4)
+
+    assert generator.resolve(relative, 160, [('image/webp', 1)]) is None
+    assert generator.submit(relative) is False
+    with pytest.raises(ValueError):
+        generator.generate(relative)
+    assert not any(name.startswith('outside_w') for name in os.listdir(tmp_path))
@@ -0,0 +1,113 @@
+"""
+InterestIndex.verify(): DB를 읽는 동안 들어온 add/remove가 교체로 사라지지 않는지 확인
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from interest_index import InterestIndex
+
+
+class HookCursor:
+    """fetchall() 직전에 on_read를 호출해 '읽는 도중' 들어온 변경을 흉내냄"""
+
+    def __init__(self, rows, on_read=None):
+        self.rows = rows
+        self.on_read = on_read
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchall(self):
+        if self.on_read:
+            self.on_read()
+        return list(self.rows)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return HookCursor(self.rows)
+
+
+def row(user_id, tag_id):
+    return {'user_id': user_id, 'tag_id': tag_id, 'email': f'u{user_id}@x', 'name': f'u{user_id}'}
+
+
+def test_verify_counts_and_fixes_drift():
+    index = InterestIndex()
+    index.load(HookCursor([row(1, 10)]))
+    index.add(2, 'u2@x', 'u2', 20)  # DB에는 없는 항목
+
+    diff = index.verify(HookCursor([row(1, 10), row(3, 30)]))
+
+    assert diff == {'missing': 1, 'extra': 1}
+    assert set(index.recipients([10, 20, 30])) == {'u1@x', 'u3@x'}
+
+
+def test_add_during_read_survives_swap():
+    index = InterestIndex()
+    index.load(HookCursor([row(1, 10)]))
+    # 읽기 결과에는 아직 반영되지 않은 커밋
+    cursor = HookCursor([row(1, 10)], on_read=lambda: index.add(2, 'u2@x', 'u2', 10))
+
+    diff = index.verify(cursor)
+
+    assert set(index.recipients([10])) == {'u1@x', 'u2@x'}
+    assert diff == {'missing': 0, 'extra': 0}
+
+
+def test_remove_during_read_survives_swap():
+    index = InterestIndex()
+    index.load(HookCursor([row(1, 10), row(2, 10)]))
+    cursor = HookCursor([row(1, 10), row(2, 10)], on_read=lambda: index.remove(2, 10))
+
+    diff = index.verify(cursor)
+
+    assert set(index.recipients([10])) == {'u1@x'}
+    assert diff == {'missing': 0, 'extra': 0}
+
+
+def test_remove_user_during_read_survives_swap():
+    index = InterestIndex()
+    index.load(HookCursor([row(1, 10), row(1, 20), row(2, 20)]))
+    cursor = HookCursor([row(1, 10), row(1, 20), row(2, 20)], on_read=lambda: index.remove_user(1))
+
+    diff = index.verify(cursor)
+
+    assert set(index.recipients([10, 20])) == {'u2@x'}
+    assert diff == {'missing': 0, 'extra': 0}
+
+
+def test_mutations_after_verify_are_not_journaled():
+    index = InterestIndex()
+    index.verify(HookCursor([row(1, 10)]))
+    index.add(2, 'u2@x', 'u2', 10)
+    assert index._journal is None
+    assert set(index.recipients([10])) == {'u1@x', 'u2@x'}
+
+
+def test_verifier_thread_runs_once_per_process():
+    index = InterestIndex()
+
+    @contextmanager
+    def factory():
+        yield FakeConnection([row(1, 10)])
+
+    stop = threading.Event()
+    thread = index.start_verifier(factory, interval=0.01, stop_event=stop)
+    assert index.start_verifier(factory, interval=0.01) is thread
+
+    deadline = time.monotonic() + 5
+    while index.stats()['verifications'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    thread.join(timeout=5)
+
+    assert index.stats()['verifications'] >= 1
+    assert set(index.recipients([10])) == {'u1@x'}
@@ -0,0 +1,78 @@
+"""
+MemoryProbe: 요청별 RSS 증가량이 프로세스 최대치(ru_maxrss)와 무관하게 측정되는지, 겹친 측정을 표시하는지 확인
+"""
+import time
+import tracemalloc
+
+import pytest
+
+import memory_probe
+from memory_probe import MemoryProbe
+
+MB = 1024 * 1024
+
+needs_proc = pytest.mark.skipif(memory_probe.current_rss_kb() is None, reason='/proc/self/statm 없음')
+
+
+def allocate(size, hold=0.05):
+    """0이 아닌 값으로 채워야 실제로 RSS에 잡힘, 샘플링 스레드가 읽을 수 있도록 잠시 유지"""
+    data = b'\x01' * size
+    time.sleep(hold)
+    return data
+
+
+@needs_proc
+def test_growth_is_per_request():
+    probe = MemoryProbe(sample_interval=0.001)
+    with probe.measure() as first:
+        data = allocate(64 * MB)
+        del data
+    # 이미 프로세스 최대치가 올라간 뒤에도 다음 요청의 증가량이 잡혀야 함
+    with probe.measure() as second:
+        data = allocate(32 * MB)
+        del data
+
+    assert first['rss_growth_kb'] >= 48 * 1024
+    assert second['rss_growth_kb'] >= 24 * 1024
+    assert second['overlapped'] == 0
+    assert probe.stats()['requests'] == 2
+
+
+@needs_proc
+def test_idle_request_reports_small_growth():
+    probe = MemoryProbe()
+    with probe.measure() as sample:
+        pass
+    assert sample['rss_growth_kb'] < 8 * 1024
+
+
+def test_overlapping_measurements_are_flagged():
+    probe = MemoryProbe()
+    with probe.measure() as outer:
+        with probe.measure() as inner:
+            pass
+    with probe.measure() as alone:
+        pass
+
+    assert inner['overlapped'] == 1
+    assert outer['overlapped'] == 1
+    assert alone['overlapped'] == 0
+    assert probe.stats()['overlapped_requests'] == 2
+
+
+@pytest.fixture
+def tracing():
+    """MemoryProbe(trace=True)가 켠 tracemalloc을 테스트가 끝나면 끔 (원래 켜져 있었다면 그대로 둠)"""
+    was_tracing = tracemalloc.is_tracing()
+    yield
+    if not was_tracing:
+        tracemalloc.stop()
+
+
+def test_trace_reports_python_allocations(tracing):
+    probe = MemoryProbe(trace=True)
+    with probe.measure() as sample:
+        data = allocate(8 * MB)
+        del data
+    assert sample['traced_peak_kb'] >= 7 * 1024
+    assert probe.stats()['max_traced_peak_kb'] >= 7 * 1024
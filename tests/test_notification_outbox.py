@@ -0,0 +1,85 @@
+"""
+NotificationOutbox: publish는 메모리 버퍼 없이 바로 한 트랜잭션으로 저장하고, 실패하면 아무것도 남기지 않고 예외
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from notification_outbox import NotificationOutbox
+
+
+class FakeDB:
+    def __init__(self, fail_on_batch=None):
+        self.rows = []           # 커밋된 행
+        self.fail_on_batch = fail_on_batch
+        self.batches = 0
+        self.rollbacks = 0
+
+    @contextmanager
+    def connect(self):
+        yield FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+        self.pending = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.db.rows.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.db.rollbacks += 1
+        self.pending = []
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def executemany(self, sql, rows):
+        db = self.connection.db
+        db.batches += 1
+        if db.fail_on_batch == db.batches:
+            raise RuntimeError('Data too long for column payload')
+        self.connection.pending.extend(rows)
+
+    def close(self):
+        pass
+
+
+def test_publish_is_written_before_returning():
+    db = FakeDB()
+    outbox = NotificationOutbox(db.connect)
+    outbox.publish(['a@x.com', 'b@x.com', 'a@x.com'], {'type': 'new_challenge', 'challenge_id': 1})
+    assert [email for email, _ in db.rows] == ['a@x.com', 'b@x.com']
+    assert outbox.stats()['appended'] == 2
+
+
+def test_publish_many_is_all_or_nothing():
+    db = FakeDB(fail_on_batch=2)
+    outbox = NotificationOutbox(db.connect, batch_size=2)
+    groups = [(['a@x.com', 'b@x.com'], {'type': 'x'}), (['c@x.com'], {'type': 'y'})]
+    with pytest.raises(RuntimeError):
+        outbox.publish_many(groups)
+    # 첫 배치는 INSERT 되었지만 커밋되지 않음 → 재시도해도 중복 없음
+    assert db.rows == []
+    assert db.rollbacks == 1
+    assert outbox.stats()['write_errors'] == 1
+
+    db.fail_on_batch = None
+    outbox.publish_many(groups)
+    assert [email for email, _ in db.rows] == ['a@x.com', 'b@x.com', 'c@x.com']
+
+
+def test_missing_connection_raises():
+    @contextmanager
+    def no_connection():
+        yield None
+
+    with pytest.raises(RuntimeError):
+        NotificationOutbox(no_connection).add('a@x.com', {'type': 'x'})
@@ -0,0 +1,262 @@
+"""
+NotificationStore: 알림 합치기(요약), 롱폴링 부분 확인(sent_id/sent_count), capacity, TTL/sweeper,
+롱폴링 대기/깨우기, 샤드 분산 확인
+"""
+import threading
+import time
+import types
+
+import pytest
+
+import notification_store
+from notification_store import NotificationStore, coalesce_events
+
+
+class FakeClock:
+    """notification_store 모듈의 time 대신 사용 (monotonic을 직접 움직임)"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(notification_store, 'time', types.SimpleNamespace(
+        monotonic=fake.monotonic, time=fake.time, sleep=time.sleep))
+    return fake
+
+
+def submission(challenge_id=1, title='매일 달리기', **extra):
+    return dict({'type': 'new_submission', 'challenge_id': challenge_id, 'challenge_title': title,
+                 'title': '새로운 인증 사진!', 'message': '새 인증'}, **extra)
+
+
+# ---------- 합치기 ----------
+def test_coalesces_same_challenge_into_digest():
+    store = NotificationStore(shards=1)
+    for i in range(3):
+        store.add('a@x', submission(photo=i))
+
+    assert store.stats()['notifications'] == 1
+    assert store.stats()['coalesced'] == 2
+    [digest] = store.drain('a@x')
+    assert digest['count'] == 3 and digest['digest'] is True
+    assert digest['title'] == '새로운 인증 사진 3개!'
+    assert digest['message'] == '"매일 달리기" 도전과제에 인증 사진 3개가 새로 올라왔습니다.'
+    assert digest['photo'] == 2  # 가장 최근 알림 기준
+    assert store.stats()['drained'] == 3
+    assert store.stats()['shared_payloads'] == 0
+
+
+def test_different_challenges_and_plain_notifications_are_kept_apart():
+    store = NotificationStore(shards=1)
+    store.add('a@x', submission(1))
+    store.add('a@x', submission(2))
+    store.add('a@x', {'type': 'notice', 'message': '공지'})
+    store.add('a@x', {'type': 'notice', 'message': '공지'})
+
+    rendered = store.drain('a@x')
+    assert len(rendered) == 4
+    assert all('digest' not in data for data in rendered)
+
+
+def test_digest_without_template_appends_count():
+    store = NotificationStore(shards=1)
+    store.add('a@x', {'type': 'challenge_update', 'challenge_id': 7, 'message': '수정됨'})
+    store.add('a@x', {'type': 'challenge_update', 'challenge_id': 7, 'message': '수정됨'})
+    assert store.drain('a@x')[0]['message'] == '수정됨 (외 1건)'
+
+
+def test_publish_shares_payload_between_recipients():
+    store = NotificationStore(shards=4)
+    store.publish(['a@x', 'b@x', 'c@x'], submission())
+    stats = store.stats()
+    assert stats['notifications'] == 3 and stats['shared_payloads'] == 1
+    for user in ('a@x', 'b@x', 'c@x'):
+        assert store.drain(user)[0]['challenge_id'] == 1
+    assert store.stats()['shared_payloads'] == 0
+
+
+def test_coalesce_events_keeps_latest_event_id_order():
+    events = [(1, submission(1)), (2, {'message': 'x'}), (3, submission(1)), (4, submission(2))]
+    result = coalesce_events(events)
+    assert [event_id for event_id, _ in result] == [2, 3, 4]
+    assert result[1][1]['count'] == 2
+
+
+# ---------- 롱폴링 부분 확인 ----------
+def test_ack_of_grown_digest_clears_only_sent_part():
+    store = NotificationStore(shards=1)
+    store.add('a@x', submission())
+    store.add('a@x', submission())
+
+    [(sent_id, digest)] = store.wait_for('a@x', 0)
+    assert digest['count'] == 2
+
+    # 보낸 뒤에 같은 도전과제 알림이 하나 더 합쳐짐
+    newer_id = store.add('a@x', submission())
+    assert newer_id > sent_id
+
+    # 클라이언트는 sent_id까지만 확인 → 보낸 2개만 차감, 나중 1개는 남음
+    [(event_id, data)] = store.wait_for('a@x', sent_id)
+    assert event_id == newer_id
+    assert 'digest' not in data
+    assert store.stats()['drained'] == 2
+
+    assert store.wait_for('a@x', newer_id) == []
+    stats = store.stats()
+    assert stats['drained'] == 3 and stats['notifications'] == 0 and stats['users'] == 0
+
+
+def test_unacked_events_are_resent_on_reconnect():
+    store = NotificationStore(shards=1)
+    event_id = store.add('a@x', submission())
+    assert store.wait_for('a@x', 0) == store.wait_for('a@x', 0)
+    assert store.wait_for('a@x', 0)[0][0] == event_id
+    assert store.stats()['notifications'] == 1
+
+
+def test_ack_removes_everything_up_to_after_id():
+    store = NotificationStore(shards=1)
+    first = store.add('a@x', submission(1))
+    second = store.add('a@x', submission(2))
+    events = store.wait_for('a@x', first)
+    assert [event_id for event_id, _ in events] == [second]
+
+
+# ---------- capacity ----------
+def test_oldest_entries_are_dropped_at_capacity():
+    store = NotificationStore(shards=1, capacity=3)
+    for i in range(5):
+        store.add('a@x', {'message': f'm{i}'})
+
+    assert [data['message'] for data in store.drain('a@x')] == ['m2', 'm3', 'm4']
+    assert store.stats()['dropped_overflow'] == 2
+
+
+def test_coalescing_at_capacity_does_not_drop():
+    store = NotificationStore(shards=1, capacity=2)
+    store.add('a@x', submission(1))
+    store.add('a@x', submission(2))
+    store.add('a@x', submission(1))
+
+    assert store.stats()['dropped_overflow'] == 0
+    assert [data['challenge_id'] for data in store.drain('a@x')] == [2, 1]
+
+
+# ---------- TTL ----------
+def test_sweep_expires_entries_by_ttl(clock):
+    store = NotificationStore(shards=2, ttl=60)
+    store.add('a@x', {'message': 'old'})
+    clock.now += 30
+    store.add('a@x', {'message': 'new'})
+    store.add('b@x', {'message': 'old-b'})
+
+    clock.now += 31  # 첫 번째 알림만 만료
+    assert store.sweep() == 1
+    assert store.stats()['expired'] == 1
+
+    clock.now += 30
+    assert store.sweep() == 2
+    stats = store.stats()
+    assert stats['users'] == 0 and stats['notifications'] == 0 and stats['shared_payloads'] == 0
+
+
+def test_expired_entries_are_not_returned(clock):
+    store = NotificationStore(shards=1, ttl=10)
+    store.add('a@x', {'message': 'x'})
+    clock.now += 11
+    assert store.wait_for('a@x', 0) == []
+    assert store.drain('a@x') == []
+    assert store.stats()['expired'] == 1
+
+
+def test_sweeper_thread_expires_and_stops():
+    store = NotificationStore(shards=1, ttl=0.01, sweep_interval=0.01)
+    store.add('a@x', {'message': 'x'})
+    stop = threading.Event()
+    thread = store.start_sweeper(stop_event=stop)
+
+    deadline = time.monotonic() + 5
+    while store.stats()['expired'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    thread.join(timeout=5)
+
+    assert store.stats()['expired'] == 1
+    assert not thread.is_alive()
+
+
+# ---------- 롱폴링 대기 ----------
+def test_wait_for_wakes_on_publish():
+    store = NotificationStore(shards=1)
+    result = {}
+
+    def poll():
+        start = time.monotonic()
+        result['events'] = store.wait_for('a@x', 0, timeout=5)
+        result['elapsed'] = time.monotonic() - start
+
+    waiter = threading.Thread(target=poll)
+    waiter.start()
+    deadline = time.monotonic() + 5
+    while store.stats()['waiting'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    event_id = store.add('a@x', {'message': 'hi'})
+    waiter.join(timeout=5)
+
+    assert result['events'] == [(event_id, {'message': 'hi'})]
+    assert result['elapsed'] < 4
+    assert store.stats()['waiting'] == 0
+
+
+def test_wait_for_times_out_and_ignores_other_users():
+    store = NotificationStore(shards=1)  # 같은 샤드의 다른 사용자 알림에 깨어나도 다시 대기
+    timer = threading.Timer(0.02, store.add, ('b@x', {'message': 'not yours'}))
+    timer.start()
+    start = time.monotonic()
+    assert store.wait_for('a@x', 0, timeout=0.1) == []
+    assert time.monotonic() - start >= 0.1
+    timer.join()
+
+
+# ---------- 샤드 ----------
+def test_users_are_spread_over_shards():
+    store = NotificationStore(shards=8)
+    users = [f'user{i}@x' for i in range(200)]
+    for user in users:
+        store.add(user, {'message': user})
+
+    used = [len(shard.users) for shard in store._shards]
+    assert sum(used) == 200
+    assert sum(1 for count in used if count) > 1
+    assert all(store._shard(user) is store._shard(user) for user in users)
+
+
+def test_concurrent_publishers_keep_counts_consistent():
+    store = NotificationStore(shards=4, capacity=1000)
+    users = [f'user{i}@x' for i in range(16)]
+
+    def publish(worker):
+        for i in range(100):
+            store.publish(users, submission(challenge_id=(worker * 100 + i) % 50))
+
+    workers = [threading.Thread(target=publish, args=(w,)) for w in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    stats = store.stats()
+    assert stats['added'] == 4 * 100 * len(users)
+    assert stats['notifications'] == 50 * len(users)
+    total = sum(data.get('count', 1) for user in users for data in store.drain(user))
+    assert total == 4 * 100 * len(users)
+    assert store.stats()['shared_payloads'] == 0
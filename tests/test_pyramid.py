@@ -0,0 +1,75 @@
+"""
+피라미드 검출(+경계 보정)이 원본 해상도 검출과 같은 포스트잇을 찾는지 IoU로 확인
+처리 시간 비교는 benchmarks/bench_pyramid.py
+"""
+import io
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+Image = pytest.importorskip("PIL.Image")
+from PIL import ImageDraw
+
+import postit_detection as detection
+
+
+def iou(a, b):
+    x0, y0 = max(a[0], b[0]), max(a[1], b[1])
+    x1, y1 = min(a[0] + a[2], b[0] + b[2]), min(a[1] + a[3], b[1] + b[3])
+    inter = max(0, x1 - x0) * max(0, y1 - y0)
+    return inter / (a[2] * a[3] + b[2] * b[3] - inter)
+
+
+def synthetic(width, height, seed):
+    rng = np.random.default_rng(seed)
+    img = Image.fromarray(rng.integers(60, 140, (height, width, 3), dtype=np.uint8))
+    side = max(width, height) // 5
+    x = int(rng.integers(0, width - side))
+    y = int(rng.integers(0, height - side))
+    ImageDraw.Draw(img).polygon(
+        [(x, y + 4), (x + side, y), (x + side + 4, y + side), (x + 2, y + side + 2)],
+        fill=(240, 235, 70)
+    )
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=90)
+    data = buffer.getvalue()
+    return data, Image.open(io.BytesIO(data))
+
+
+@pytest.mark.parametrize('size', [(2000, 1500), (3024, 4032), (4000, 3000)])
+def test_pyramid_matches_full_resolution(size):
+    data, pil_img = synthetic(*size, seed=sum(size))
+    full, _ = detection.locate_postit(pil_img, pyramid=False, refine=False)
+    assert full is not None
+
+    coarse, _ = detection.locate_postit(pil_img, pyramid=True, refine=False)
+    refined, _ = detection.locate_postit(pil_img, pyramid=True, refine=True)
+    from_bytes, _ = detection.locate_postit_bytes(data)
+
+    assert iou(full, coarse) >= 0.95
+    assert iou(full, refined) >= 0.98
+    assert iou(full, from_bytes) >= 0.98
+
+
+def test_small_image_skips_pyramid():
+    data, pil_img = synthetic(900, 700, seed=1)
+    assert detection.locate_postit(pil_img, pyramid=True)[0] == detection.locate_postit(pil_img, pyramid=False)[0]
+
+
+def test_min_score_rejects_in_both_paths():
+    data, pil_img = synthetic(2000, 1500, seed=3)
+    strict = detection.detection_params(min_score=1000)
+
+    bbox, score = detection.locate_postit(pil_img, params=strict)
+    assert bbox is None and 0 < score < 1000
+    assert detection.locate_postit_bytes(data, params=strict)[0] is None
+    assert detection.locate_postit_bytes(data)[0] is not None
+
+
+def test_cache_key_depends_on_params():
+    data, _ = synthetic(900, 700, seed=1)
+    key = detection.detection_cache_key(data)
+    assert key == detection.detection_cache_key(data, params=detection.detection_params())
+    assert key != detection.detection_cache_key(data, params=detection.detection_params(min_score=60))
+    assert key != detection.detection_cache_key(data, params=detection.detection_params(min_area=9000))
@@ -0,0 +1,44 @@
+"""
+TagIndex: tags.name collation처럼 대소문자를 구분하지 않고 찾는지 확인
+"""
+from tag_index import TagIndex
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+
+def test_lookup_ignores_case():
+    index = TagIndex()
+    index.load(FakeCursor([{'id': 1, 'name': 'React'}]))
+    assert index.get_id('react') == 1
+    assert index.get_id('REACT') == 1
+
+
+def test_add_with_other_spelling_keeps_stored_name():
+    index = TagIndex()
+    index.add('React', 1)
+    index.add('react', 1)
+    assert index.get_name(1) == 'React'
+    assert index.stats()['tags'] == 1
+
+
+def test_lookup_miss_caches_database_spelling():
+    index = TagIndex()
+    cursor = FakeCursor([{'id': 7, 'name': 'React'}])
+    assert index.lookup_id('react', cursor) == 7
+    assert index.get_name(7) == 'React'
+    # 두 번째 조회는 DB를 다시 읽지 않음
+    assert index.lookup_id('REACT', cursor) == 7
+    assert len(cursor.executed) == 1
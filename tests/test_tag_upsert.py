@@ -0,0 +1,66 @@
+"""
+upsert_challenge_tags: 새 태그 id를 잠금 읽기로 확인하고, 끝내 못 찾으면 조용히 빠뜨리지 않는지 확인
+"""
+import pytest
+
+from tag_index import TagIndex, upsert_challenge_tags
+
+
+class ScriptedCursor:
+    """tags 테이블을 dict로 흉내: SELECT ... IN 결과는 visible(스냅샷)에 있는 행만"""
+    def __init__(self, visible, committed=None):
+        self.visible = visible            # name -> id (일반 SELECT가 볼 수 있는 행)
+        self.committed = committed or {}  # 잠금 읽기만 볼 수 있는 최신 커밋 행
+        self.statements = []
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self.statements.append(sql)
+        if sql.startswith('SELECT'):
+            table = dict(self.visible)
+            if 'LOCK IN SHARE MODE' in sql:
+                table.update(self.committed)
+            wanted = {name.casefold() for name in params}
+            self._rows = [{'id': tag_id, 'name': name} for name, tag_id in table.items()
+                          if name.casefold() in wanted]
+
+    def executemany(self, sql, rows):
+        self.statements.append(sql)
+        self.links = list(rows)
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+
+def test_tag_committed_after_snapshot_is_still_linked():
+    # 다른 트랜잭션이 스냅샷 이후 '운동'을 커밋 → INSERT는 중복 키, 일반 SELECT로는 보이지 않음
+    cursor = ScriptedCursor(visible={}, committed={'운동': 5})
+    tag_ids, pending = upsert_challenge_tags(cursor, 1, ['운동'], index=TagIndex())
+    assert tag_ids == [5]
+    assert cursor.links == [(1, 5)]
+    assert pending == [('운동', 5)]
+    assert 'LOCK IN SHARE MODE' in cursor.statements[1]
+
+
+def test_unresolved_tag_raises_instead_of_dropping():
+    cursor = ScriptedCursor(visible={'독서': 2})
+    with pytest.raises(RuntimeError):
+        upsert_challenge_tags(cursor, 1, ['독서', '운동'], index=TagIndex())
+
+
+def test_stored_spelling_is_used_for_case_variants():
+    index = TagIndex()
+    cursor = ScriptedCursor(visible={'React': 3})
+    tag_ids, pending = upsert_challenge_tags(cursor, 1, ['react', 'REACT'], index=index)
+    assert tag_ids == [3]
+    assert pending == [('React', 3)]
+
+
+@pytest.mark.parametrize('count', [1, 10, 50])
+def test_statement_count_does_not_grow_with_tags(count):
+    cursor = ScriptedCursor(visible={f'tag{i}': i for i in range(count)})
+    upsert_challenge_tags(cursor, 1, [f'tag{i}' for i in range(count)], index=TagIndex())
+    assert len(cursor.statements) == 3
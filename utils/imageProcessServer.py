@@ -1,207 +1,190 @@
 """
 포스트잇 검출 전용 이미지 처리 서버
-app_umai.py의 find_postit 함수를 활용
+검출 로직은 BACK_SERVER/postit_detection.py (app_umai.py, server.py와 공용)
 """
 import os
 import io
 import json
 import cv2
 import base64
+import sys
+import threading
 import numpy as np
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, make_response
 from flask_cors import CORS
+
+try:
+    import resource
+except ImportError:  # Windows에는 resource 모듈이 없음 → RSS는 0으로 보고
+    resource = None
 from PIL import Image
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Original-Size', 'X-Roi-Size', 'X-Peak-RSS', 'X-Peak-RSS-Growth'])
+
+# 포스트잇 검출 (BACK_SERVER/postit_detection.py, server.py/app_umai.py와 같은 모듈)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'BACK_SERVER'))
+from postit_detection import (  # noqa: E402
+    MIN_SCORE, PYRAMID_MODE, REFINE_BBOX, UPPER_YELLOW, DetectionCache, detection_cache_key,
+    locate_postit, locate_postit_bytes, prepare_postit_mask, refine_bbox, score_contours, to_full_bbox,
+)
 
-# app_umai.py에서 가져온 설정값들
-LOWER_YELLOW = (27, 25, 120)  # app_umai.py 최적값
-UPPER_YELLOW = (35, 255, 255)
-MIN_AREA = 8000
-MAX_AR_DIFF = 50
+def find_postit(pil_img: Image.Image, debug=False, pyramid=None, refine=None):
+    """
+    노란 포스트잇 ROI 반환, debug=True면 (roi, mask, bbox_img)
+    pyramid: 긴 변을 PYRAMID_MAX_SIDE로 줄인 이미지에서 검출 후 원본 좌표로 변환 (기본값 PYRAMID_MODE)
+    refine: 피라미드 모드에서 원본 해상도의 ROI 안에서 경계를 다시 맞춤 (기본값 REFINE_BBOX)
+    """
+    if not debug:
+        # 디버그 출력이 필요 없으면 후보별 상세 정보 없이 최고점만 계산
+        best, _ = locate_postit(pil_img, pyramid, refine)
+        return pil_img.crop((best[0], best[1], best[0] + best[2], best[1] + best[3])) if best else None
+    
+    pyramid = PYRAMID_MODE if pyramid is None else pyramid
+    refine = REFINE_BBOX if refine is None else refine
+    
+    rgb = np.array(pil_img)
+    full_h, full_w = rgb.shape[:2]
+    scale, img_w, img_h, low, mask, cnts = prepare_postit_mask(rgb, pyramid)
+    if not cnts:
+        return None, mask, None
 
-def adaptive_inrange(hsv_img, base_low, base_up):
-    """다양한 HSV 범위를 시도하여 최적의 마스크 확보"""
-    low = list(base_low)
-    up  = list(base_up)
+    best, best_score, candidates = score_contours(cnts, mask, img_w, img_h, scale)
     
-    # 1단계: Saturation 하한을 단계적으로 낮춤
-    for sat in (low[1], 40, 25, 10, 5):
-        low[1] = sat
-        mask = cv2.inRange(
-            hsv_img, np.array(low, np.uint8), np.array(up, np.uint8)
-        )
-        if cv2.countNonZero(mask) > 2000:   # 2k 픽셀 이상이면 성공
-            return mask
+    if scale != 1.0:
+        # 축소 이미지 좌표 → 원본 좌표
+        for cand in candidates:
+            cand['bbox'] = to_full_bbox(cand['bbox'], scale, full_w, full_h)
+        if best is not None:
+            best = to_full_bbox(best, scale, full_w, full_h)
+            if refine and best_score >= MIN_SCORE:
+                best = refine_bbox(rgb, best, low, UPPER_YELLOW, scale)
+    if best_score < MIN_SCORE:  # 최소 점수 기준 (locate_postit과 같은 판정)
+        best = None
     
-    # 2단계: Value 하한도 낮춰보기
-    low = list(base_low)
-    for val in (30, 20, 10):
-        for sat in (5, 3, 1):
-            low[1] = sat
-            low[2] = val
-            mask = cv2.inRange(
-                hsv_img, np.array(low, np.uint8), np.array(up, np.uint8)
-            )
-            if cv2.countNonZero(mask) > 1000:   # 1k 픽셀 이상이면 성공
-                return mask
+    # 디버그 정보와 함께 반환
+    bbox_img = np.array(pil_img.copy())
+    for i, cand in enumerate(candidates):
+        x, y, cw, ch = cand['bbox']
+        color = (0, 255, 0) if cand == best else (255, 0, 0)
+        cv2.rectangle(bbox_img, (x, y), (x + cw, y + ch), color, 3)
+        cv2.putText(bbox_img, f"{i}: {cand['total_score']:.1f}", 
+                   (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
     
-    return mask  # 마지막 결과 반환
+    return (
+        pil_img.crop((best[0], best[1], best[0] + best[2], best[1] + best[3])) if best else None,
+        mask,
+        Image.fromarray(bbox_img)
+    )
 
-def find_postit(pil_img: Image.Image, debug=False):
-    """노란 포스트잇 ROI 반환 (app_umai.py에서 가져온 함수)"""
-    bgr = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
-    hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV)
+# 같은 사진으로 재시도/미리보기 후 제출 시 다시 검출하지 않도록 결과(bbox, score) 보관
+detection_cache = DetectionCache(int(os.getenv('DETECTION_CACHE_SIZE', '1024')))
 
-    mask = adaptive_inrange(hsv, LOWER_YELLOW, UPPER_YELLOW)
+def read_request_image():
+    """
+    요청에서 인코딩된 이미지 바이트를 꺼냄 (없으면 None)
+    multipart image 파일 → image/* 본문 → JSON base64 순서로 확인
+    """
+    upload = request.files.get('image')
+    if upload is not None:
+        return upload.read()
+    if request.mimetype.startswith('image/'):
+        return request.get_data(cache=False)
+    data = request.get_json(silent=True) or {}
+    image_base64 = data.get('image')
+    if not image_base64:
+        return None
+    return base64.b64decode(image_base64.rpartition(',')[2])
 
-    # 노이즈 제거를 위한 모폴로지 연산
-    kernel = np.ones((3, 3), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=1)
-    kernel = np.ones((7, 7), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=3)
-    
-    # 추가: 더 큰 커널로 한 번 더 정리
-    kernel_large = np.ones((10, 10), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel_large, iterations=1)
+def wants_binary_response():
+    """?format=binary 또는 Accept 헤더가 image/jpeg를 우선하면 ROI를 JPEG 그대로 응답"""
+    if request.args.get('format') == 'binary':
+        return True
+    return request.accept_mimetypes.best_match(['application/json', 'image/jpeg']) == 'image/jpeg'
 
-    cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    if not cnts:
-        return (None, mask, None) if debug else None
+# ---------- 프로세스 최대 메모리 측정 ----------
+def peak_rss_kb():
+    """
+    프로세스 시작 이후 최대 RSS (KB, macOS의 ru_maxrss는 바이트 단위)
+    요청별 값이 아니라 프로세스 전체의 최대치이므로, 요청 전후 차이는 이 요청(또는 동시에 처리된 요청)이
+    최대치를 끌어올린 양일 뿐 이미 더 큰 요청을 처리한 뒤에는 0으로 나옴
+    """
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
 
-    best, best_score = None, 0
-    candidates = []
-    
-    for i, c in enumerate(cnts):
-        # 기본 바운딩 박스
-        x, y, cw, ch = cv2.boundingRect(c)
-        area = cw * ch
-        ar_diff = abs(cw - ch) / max(cw, ch) * 100
-        
-        # 윤곽선 approximation으로 사각형성 검사
-        epsilon = 0.02 * cv2.arcLength(c, True)
-        approx = cv2.approxPolyDP(c, epsilon, True)
-        rect_score = len(approx)
-        
-        # 컨벡스 헐과의 비교로 모양 검사
-        hull = cv2.convexHull(c)
-        hull_area = cv2.contourArea(hull)
-        solidity = area / hull_area if hull_area > 0 else 0
-        
-        # 이미지 중앙에서의 거리
-        img_h, img_w = pil_img.size[1], pil_img.size[0]
-        center_x, center_y = x + cw//2, y + ch//2
-        center_dist = np.sqrt((center_x - img_w//2)**2 + (center_y - img_h//2)**2)
-        normalized_center_dist = center_dist / np.sqrt(img_w**2 + img_h**2)
-        
-        # 마스크에서 실제 채워진 비율
-        mask_roi = mask[y:y+ch, x:x+cw]
-        fill_ratio = cv2.countNonZero(mask_roi) / (cw * ch) if cw * ch > 0 else 0
-        
-        # 종합 점수 계산
-        score = 0
-        if area >= MIN_AREA:
-            # 1. 기본 면적 점수
-            ideal_area = 50000
-            area_score = max(0, 100 - abs(area - ideal_area) / ideal_area * 50)
-            score += area_score
-            
-            # 2. 정사각형 점수
-            square_score = max(0, 80 - ar_diff * 2)
-            score += square_score
-            
-            # 3. 사각형 모양 점수
-            rect_shape_score = min(40, (8 - abs(rect_score - 4)) * 10)
-            score += rect_shape_score
-            
-            # 4. 채움 비율 점수
-            fill_score = fill_ratio * 60
-            score += fill_score
-            
-            # 5. 볼록도 점수
-            solidity_score = solidity * 25
-            score += solidity_score
-            
-            # 6. 중앙 위치 보너스
-            center_score = max(0, 15 - normalized_center_dist * 30)
-            score += center_score
-            
-            # 7. 크기 비율 보너스
-            img_area = img_w * img_h
-            size_ratio = area / img_area
-            if 0.02 < size_ratio < 0.3:
-                score += 20
-        
-        candidates.append({
-            'bbox': (x, y, cw, ch),
-            'area': area,
-            'ar_diff': ar_diff,
-            'rect_score': rect_score,
-            'solidity': solidity,
-            'center_dist': normalized_center_dist,
-            'fill_ratio': fill_ratio,
-            'total_score': score,
-            'valid': area >= MIN_AREA and ar_diff <= MAX_AR_DIFF
-        })
-        
-        if score > best_score:
-            best_score = score
-            best = (x, y, cw, ch)
-    
-    if debug:
-        # 디버그 정보와 함께 반환
-        bbox_img = np.array(pil_img.copy())
-        for i, cand in enumerate(candidates):
-            x, y, cw, ch = cand['bbox']
-            color = (0, 255, 0) if cand == best else (255, 0, 0)
-            cv2.rectangle(bbox_img, (x, y), (x + cw, y + ch), color, 3)
-            cv2.putText(bbox_img, f"{i}: {cand['total_score']:.1f}", 
-                       (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-        
-        return (
-            pil_img.crop((best[0], best[1], best[0] + best[2], best[1] + best[3])) if best else None,
-            mask,
-            Image.fromarray(bbox_img)
-        )
-    
-    return pil_img.crop((best[0], best[1], best[0] + best[2], best[1] + best[3])) if best else None
+memory_stats = {'requests': 0, 'max_rss_growth_kb': 0}
+memory_lock = threading.Lock()
 
 @app.route('/detect-postit', methods=['POST'])
 def detect_postit():
-    """포스트잇 검출 API"""
+    """
+    포스트잇 검출 API
+    요청: multipart image 파일, image/* 본문, 또는 JSON {"image": base64}
+    응답: 기본은 JSON + base64, 바이너리 모드면 image/jpeg 본문 + X-Original-Size/X-Roi-Size 헤더
+    모든 응답에 프로세스 최대 RSS(X-Peak-RSS, KB)와 이 요청 동안 그 최대치가 늘어난 양(X-Peak-RSS-Growth) 헤더 포함
+    (둘 다 프로세스 단위 값, 요청별 측정은 BACK_SERVER/memory_probe.py 참고)
+    """
+    before = peak_rss_kb()
+    response = make_response(run_detection())
+    peak = peak_rss_kb()
+    with memory_lock:
+        memory_stats['requests'] += 1
+        memory_stats['max_rss_growth_kb'] = max(memory_stats['max_rss_growth_kb'], peak - before)
+    response.headers['X-Peak-RSS'] = str(peak)
+    response.headers['X-Peak-RSS-Growth'] = str(peak - before)
+    print(f"프로세스 최대 RSS: {peak}KB (+{peak - before}KB)")
+    return response
+
+def run_detection():
+    """detect_postit 본체 → Flask 응답 (본문, 상태 코드)"""
     try:
-        data = request.get_json()
-        image_base64 = data.get('image')
-        
-        if not image_base64:
-            return jsonify({
-                'success': False,
-                'message': '이미지 데이터가 없습니다'
-            })
+        binary = wants_binary_response()
         
-        # Base64를 PIL Image로 변환
+        # 요청 이미지를 PIL Image로 변환
         try:
-            image_data = base64.b64decode(image_base64)
+            image_data = read_request_image()
+            if image_data is None:
+                return jsonify({
+                    'success': False,
+                    'message': '이미지 데이터가 없습니다'
+                }), (400 if binary else 200)
             pil_img = Image.open(io.BytesIO(image_data))
             print(f"이미지 크기: {pil_img.size}")
         except Exception as e:
             return jsonify({
                 'success': False,
                 'message': f'이미지 디코딩 오류: {str(e)}'
-            })
+            }), (400 if binary else 200)
         
-        # 포스트잇 검출
-        postit_roi = find_postit(pil_img, debug=False)
+        # 포스트잇 검출 (같은 이미지는 캐시된 bbox 사용)
+        cache_key = detection_cache_key(image_data)
+        located = detection_cache.get(cache_key)
+        if located is None:
+            located = locate_postit_bytes(image_data, pil_img=pil_img)
+            detection_cache.set(cache_key, located)
+        else:
+            print("검출 결과 캐시 사용")
+        best = located[0]
+        postit_roi = pil_img.crop((best[0], best[1], best[0] + best[2], best[1] + best[3])) if best else None
         
         if postit_roi is not None:
-            # ROI를 base64로 인코딩해서 반환
             buffer = io.BytesIO()
             postit_roi.save(buffer, format='JPEG', quality=90)
-            roi_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
             
             print(f"포스트잇 검출 성공! ROI 크기: {postit_roi.size}")
             
+            if binary:
+                response = make_response(buffer.getvalue())
+                response.headers['Content-Type'] = 'image/jpeg'
+                response.headers['X-Original-Size'] = '%d,%d' % pil_img.size
+                response.headers['X-Roi-Size'] = '%d,%d' % postit_roi.size
+                return response
+            
+            # ROI를 base64로 인코딩해서 반환
+            roi_base64 = base64.b64encode(buffer.getbuffer()).decode('ascii')
+            
             return jsonify({
                 'success': True,
                 'roi_image': roi_base64,
@@ -213,7 +196,7 @@ def detect_postit():
             return jsonify({
                 'success': False,
                 'message': '포스트잇을 찾을 수 없습니다'
-            })
+            }), (404 if binary else 200)
             
     except Exception as e:
         print(f"서버 오류: {str(e)}")
@@ -227,12 +210,14 @@ def health_check():
     """서버 상태 확인"""
     return jsonify({
         'status': 'ok',
-        'message': '포스트잇 검출 서버가 정상 작동 중입니다'
+        'message': '포스트잇 검출 서버가 정상 작동 중입니다',
+        'detection_cache': detection_cache.stats(),
+        'memory': dict(memory_stats, peak_rss_kb=peak_rss_kb())
     })
 
 if __name__ == '__main__':
     print("포스트잇 검출 서버 시작...")
     print("사용 가능한 엔드포인트:")
-    print("  POST /detect-postit - 포스트잇 검출")
+    print("  POST /detect-postit - 포스트잇 검출 (JSON base64, multipart image, image/jpeg 본문, ?format=binary)")
     print("  GET  /health        - 서버 상태 확인")
     app.run(host='127.0.0.1', port=5001, debug=True) 
\ No newline at end of file